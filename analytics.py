@@ -0,0 +1,509 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+ROUND_DETAIL_COLUMNS = ['CourseName', 'LayoutName', '+/-', 'RoundRating', 'StartDate']
+SCORE_TYPES = ['Aces', 'Eagles', 'Birdies', 'Pars', 'Bogeys', 'DoubleBogeysOrWorse']
+
+
+def player_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Return only the player rows of a scorecard frame (drops the 'Par' rows)."""
+    return df[df['PlayerName'] != 'Par']
+
+
+def dataset_summary(df: pd.DataFrame) -> dict:
+    """Headline counts for a dataset: rounds, players (excluding 'Par'), courses and date range."""
+    return {
+        'total_rounds': len(df),
+        'players': df['PlayerName'].nunique() - 1,  # Exclude 'Par'
+        'courses': df['CourseName'].nunique(),
+        'date_range': f"{df['StartDate'].min()[:10]} to {df['StartDate'].max()[:10]}",
+    }
+
+
+def estimate_round_ratings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fill blank RoundRating values from a per-layout fit of rating against +/-.
+
+    For every (course, layout) a least-squares line, rating = a + b * (+/-), is
+    fitted over its rated player rounds from grouped sums in one pass. A layout
+    whose rated rounds all have the same score uses the slope pooled over all
+    layouts with its own intercept. Rounds on layouts without rated rounds, or
+    whose estimate rounds to zero or below, stay blank. Estimates are rounded like UDisc ratings and flagged in a boolean
+    RatingEstimated column, which keeps the flags of a frame estimated before.
+    Returns a new frame; `df` is not modified.
+    """
+    is_player = df['PlayerName'] != 'Par'
+    relative = pd.to_numeric(df['+/-'], errors='coerce')
+    rating = pd.to_numeric(df['RoundRating'], errors='coerce')
+    rated = is_player & rating.notna() & relative.notna()
+
+    x, y = relative.where(rated), rating.where(rated)
+    sums = pd.DataFrame({'n': rated.astype(float), 'x': x, 'y': y, 'xx': x * x, 'xy': x * y}).groupby(
+        [df['CourseName'], df['LayoutName']]
+    ).sum()
+    sums = sums[sums['n'] > 0]
+    sxx = sums['xx'] - sums['x'] ** 2 / sums['n']
+    sxy = sums['xy'] - sums['x'] * sums['y'] / sums['n']
+    # Same-score layouts contribute nothing to the pooled slope
+    pooled_slope = sxy.sum() / sxx.sum() if sxx.sum() > 0 else np.nan
+    slope = (sxy / sxx).where(sxx > 0, pooled_slope)
+    intercept = (sums['y'] - slope * sums['x']) / sums['n']
+
+    layouts = pd.MultiIndex.from_arrays([df['CourseName'], df['LayoutName']])
+    estimate = (intercept.reindex(layouts).to_numpy() + slope.reindex(layouts).to_numpy() * relative.to_numpy()).round()
+    # A zero rating marks an incomplete round in the exports, so estimates must stay above it
+    estimated = (is_player & rating.isna()).to_numpy() & (estimate > 0)
+
+    flagged = estimated
+    if 'RatingEstimated' in df.columns:
+        flagged = flagged | df['RatingEstimated'].fillna(False).astype(bool).to_numpy()
+    return df.assign(RoundRating=rating.mask(estimated, estimate), RatingEstimated=flagged)
+
+
+def player_overall_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarize every player's rounds in a single grouped pass.
+
+    Returns one row per player (indexed by player name) with the metrics shown in
+    the Player Statistics page: total rounds, average score and rating, best and
+    worst round scores, plus the course, layout, rating and date of those rounds.
+    """
+    rounds = player_rows(df)
+    grouped = rounds.groupby('PlayerName', sort=False)
+
+    summary = grouped.agg(
+        TotalRounds=('+/-', 'size'),
+        AvgScore=('+/-', 'mean'),
+        AvgRating=('RoundRating', 'mean'),
+        BestRound=('+/-', 'min'),
+        WorstRound=('+/-', 'max'),
+    )
+
+    # idxmin/idxmax return the first matching row, like the page's `.iloc[0]` lookup
+    for prefix, index_labels in (('Best', grouped['+/-'].idxmin()), ('Worst', grouped['+/-'].idxmax())):
+        # Players without any +/- (blank in the export) get no details
+        index_labels = index_labels.dropna()
+        details = rounds.loc[index_labels.values, ROUND_DETAIL_COLUMNS]
+        details.index = index_labels.index
+        details.columns = [f'{prefix}{column}' for column in ['Course', 'Layout', 'Score', 'Rating', 'Date']]
+        summary = summary.join(details)
+
+    summary['BestDate'] = summary['BestDate'].str[:10]
+    summary['WorstDate'] = summary['WorstDate'].str[:10]
+    return summary
+
+
+def layout_records(df: pd.DataFrame, player: str) -> pd.DataFrame:
+    """
+    A player's best, worst and theoretical best round per (course, layout).
+
+    Same frame as `db.query_layout_records`, for datasets that are not saved or are
+    filtered by date: the lowest and highest totals (ties to the first round),
+    and the sum of the best score per hole, ignoring aces and zero scores.
+    """
+    layout = ['CourseName', 'LayoutName']
+    rounds = df[df['PlayerName'] == player]
+    holes = hole_columns(rounds)
+    hole_scores = rounds[holes].where(rounds[holes] > 1)
+    theoretical = hole_scores.groupby([rounds[c] for c in layout]).min().sum(axis=1, min_count=1)
+
+    rounds = rounds.dropna(subset=['Total'])
+    grouped = rounds.groupby(layout)
+    records = pd.DataFrame(index=grouped.size().index)
+    for prefix, index_labels in (('best', grouped['Total'].idxmin()), ('worst', grouped['Total'].idxmax())):
+        details = rounds.loc[index_labels.values, ['Total', '+/-', 'RoundRating', 'StartDate']]
+        details.index = index_labels.index
+        details.columns = [f'{prefix}_{column}' for column in ['total', 'plus_minus', 'rating', 'date']]
+        records = records.join(details)
+    records['theoretical_best'] = theoretical.reindex(records.index)
+    return records.rename_axis(['course', 'layout']).reset_index()
+
+
+def course_performance_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the per-course performance table for every player at once.
+
+    The result is indexed by (PlayerName, CourseName) and uses the same columns as
+    the Course Performance table, sorted by rounds played within each player.
+    """
+    rounds = player_rows(df)
+    course_stats = rounds.groupby(['PlayerName', 'CourseName'], sort=False).agg({
+        '+/-': ['count', 'mean', 'min'],
+        'RoundRating': 'mean'
+    }).round(2)
+
+    course_stats.columns = ['Rounds Played', 'Avg Score', 'Best Score', 'Avg Rating']
+    return course_stats.sort_values(['PlayerName', 'Rounds Played'], ascending=[True, False], kind='stable')
+
+
+def course_difficulty_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Rounds, average, best and worst score per (player, course, layout)."""
+    rounds = player_rows(df)
+    return rounds.groupby(['PlayerName', 'CourseName', 'LayoutName']).agg(
+        Rounds=('CourseName', 'size'),
+        Avg_Score=('+/-', 'mean'),
+        Best_Score=('+/-', 'min'),
+        Worst_Score=('+/-', 'max')
+    ).reset_index()
+
+
+def course_layouts(df: pd.DataFrame) -> List[Tuple[str, str]]:
+    """All (course, layout) pairs that have at least one player round."""
+    pairs = player_rows(df)[['CourseName', 'LayoutName']].drop_duplicates()
+    return list(pairs.itertuples(index=False, name=None))
+
+
+def hole_columns(df: pd.DataFrame) -> List[str]:
+    """Hole columns that hold at least one score, in hole order."""
+    holes = [c for c in df.columns if c.startswith('Hole') and df[c].notna().any()]
+    return sorted(holes, key=lambda c: int(c[4:]))
+
+
+def layout_pars(df: pd.DataFrame, course: str, layout: str) -> pd.Series:
+    """Par per hole column for a course layout, taken from its first 'Par' row."""
+    par_rows = df[(df['PlayerName'] == 'Par') & (df['CourseName'] == course) & (df['LayoutName'] == layout)]
+    if par_rows.empty:
+        raise ValueError(f"No par data found for course '{course}' and layout '{layout}'")
+    pars = par_rows.iloc[0]
+    return pars[[c for c in pars.index if c.startswith('Hole')]].dropna().astype(int)
+
+
+def hole_statistics(df: pd.DataFrame, course: str, layout: str) -> pd.DataFrame:
+    """
+    Per-hole statistics for every player on one course layout.
+
+    Returns one row per (PlayerName, Hole) with the par, number of rounds, average
+    and best score, under-par percentage and the score-type counts used by the
+    Hole Breakdown page. Holes without a recorded par are treated as par 3.
+    """
+    layout_df = df[(df['CourseName'] == course) & (df['LayoutName'] == layout)]
+    rounds = player_rows(layout_df)
+    holes = hole_columns(rounds)
+    pars = layout_pars(df, course, layout)
+
+    scores = rounds.melt(id_vars=['PlayerName'], value_vars=holes, var_name='HoleName', value_name='Score')
+    scores = scores.dropna(subset=['Score'])
+    scores['Hole'] = scores['HoleName'].str[4:].astype(int)
+    scores['Par'] = scores['HoleName'].map(pars).fillna(3).astype(int)
+
+    score, par = scores['Score'], scores['Par']
+    # Same precedence as UdiscStats.append_scores_to_df: an ace is never counted as an eagle
+    score_type = np.select(
+        [score == 1, score == par - 2, score == par - 1, score == par, score == par + 1, score > par + 1],
+        SCORE_TYPES,
+        default='',
+    )
+    counts = pd.get_dummies(pd.Categorical(score_type, categories=SCORE_TYPES)).astype(int)
+    counts.index = scores.index
+    scores = scores.join(counts)
+    scores['UnderPar'] = (score < par).astype(int)
+
+    stats = scores.groupby(['PlayerName', 'Hole'], sort=True).agg(
+        Par=('Par', 'first'),
+        Rounds=('Score', 'size'),
+        Avg=('Score', 'mean'),
+        Best=('Score', 'min'),
+        UnderPar=('UnderPar', 'sum'),
+        **{name: (name, 'sum') for name in SCORE_TYPES},
+    ).reset_index()
+    stats['UnderParPct'] = stats['UnderPar'] / stats['Rounds'] * 100
+    return stats
+
+
+def relative_to_par_matrix(hole_stats: pd.DataFrame, holes: List[int] = None) -> pd.DataFrame:
+    """
+    Average score relative to par as a (Hole x PlayerName) float matrix.
+
+    Built with one pivot of a `hole_statistics` frame; holes a player never
+    scored are NaN. `holes` fixes the row order and fills in missing holes.
+    """
+    relative = hole_stats.assign(Relative=hole_stats['Avg'] - hole_stats['Par'])
+    matrix = relative.pivot_table(index='Hole', columns='PlayerName', values='Relative', aggfunc='mean', sort=True)
+    if holes is not None:
+        matrix = matrix.reindex(holes)
+    return matrix.astype(float)
+
+
+PLAYER_ORDERS = ['Selection', 'Average', 'Similarity']
+
+
+def order_players(matrix: pd.DataFrame, order: str, players: List[str] = None) -> List[str]:
+    """
+    Column order for a `relative_to_par_matrix`.
+
+    'Selection' keeps `players` (or the matrix order), 'Average' sorts by the
+    mean over holes (best first) and 'Similarity' sorts by each player's score on
+    the first principal component of their hole profiles, so players who are
+    strong and weak on the same holes end up next to each other.
+    """
+    columns = [player for player in (players or matrix.columns) if player in matrix.columns]
+    if order == 'Average':
+        return matrix[columns].mean().sort_values(kind='stable').index.tolist()
+    if order != 'Similarity' or len(columns) < 3:
+        return columns
+
+    # Unplayed holes count as the hole's field average
+    profiles = matrix[columns].T
+    profiles = profiles.fillna(profiles.mean()).fillna(0.0).to_numpy()
+    centered = profiles - profiles.mean(axis=0)
+    u, singular_values, _ = np.linalg.svd(centered, full_matrices=False)
+    component = u[:, 0] * singular_values[0]
+    # The sign of a singular vector is arbitrary; put the better-scoring end first
+    if np.dot(component, profiles.mean(axis=1) - profiles.mean()) < 0:
+        component = -component
+    return [columns[i] for i in np.argsort(component, kind='stable')]
+
+
+def hole_histograms(df: pd.DataFrame, course: str, layout: str) -> pd.DataFrame:
+    """
+    Exact score histograms per (PlayerName, Hole, Month) for one course layout.
+
+    Hole scores are small integers, so a histogram is a lossless, mergeable
+    sketch: rows can be summed across players or months (see `merge_histograms`)
+    and summarized with `histogram_summary` without going back to the rounds.
+    Columns are score values and cells are counts; Month is 'YYYY-MM'.
+    """
+    layout_df = df[(df['CourseName'] == course) & (df['LayoutName'] == layout)]
+    rounds = player_rows(layout_df).assign(Month=lambda rows: rows['StartDate'].str[:7])
+    holes = hole_columns(rounds)
+
+    scores = rounds.melt(
+        id_vars=['PlayerName', 'Month'], value_vars=holes, var_name='HoleName', value_name='Score'
+    ).dropna(subset=['Score'])
+    scores['Hole'] = scores['HoleName'].str[4:].astype(int)
+    scores['Score'] = scores['Score'].astype(int)
+    return scores.groupby(['PlayerName', 'Hole', 'Month', 'Score']).size().unstack('Score', fill_value=0)
+
+
+def merge_histograms(histograms: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """Sum histograms over every index level not in `by` (e.g. months or players)."""
+    return histograms.groupby(level=by).sum()
+
+
+def histogram_summary(histograms: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rounds, mean, median, 90th percentile and variance of each histogram row.
+
+    Percentiles are the smallest score whose cumulative share reaches the
+    percentile (numpy's 'inverted_cdf'), so they are always actual scores.
+    Variance is the sample variance, like pandas' `var`.
+    """
+    values = histograms.columns.to_numpy(dtype=float)
+    counts = histograms.to_numpy(dtype=float)
+    rounds = counts.sum(axis=1)
+    mean = counts @ values / rounds
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (counts @ values ** 2 - rounds * mean ** 2) / (rounds - 1)
+
+    cumulative = counts.cumsum(axis=1)
+
+    def percentile(q):
+        return values[(cumulative >= q * rounds[:, None]).argmax(axis=1)]
+
+    return pd.DataFrame({
+        'Rounds': rounds.astype(int),
+        'Mean': mean,
+        'Median': percentile(0.5),
+        'P90': percentile(0.9),
+        'Variance': np.where(rounds > 1, variance, np.nan),
+    }, index=histograms.index)
+
+
+def simulate_rounds(histograms: pd.DataFrame, players: List[str], holes: List[int],
+                    simulations: int = 10000, seed: int = 0) -> pd.DataFrame:
+    """
+    Monte Carlo round totals drawn from each player's per-hole score histograms.
+
+    `histograms` is indexed by (PlayerName, Hole) with score values as columns,
+    e.g. `merge_histograms(hole_histograms(...), ['PlayerName', 'Hole'])`. Every
+    hole score is drawn independently from the player's empirical distribution
+    on that hole; holes a player never scored use all players' distribution.
+    Returns a (simulations x players) frame of totals. All draws for a player
+    are one (simulations x holes) array, sampled by inverse CDF.
+    """
+    rng = np.random.default_rng(seed)
+    values = histograms.columns.to_numpy(dtype=float)
+    field = histograms.groupby(level='Hole').sum().reindex(holes, fill_value=0).to_numpy(dtype=float)
+
+    totals = {}
+    for player in players:
+        counts = histograms.xs(player, level='PlayerName').reindex(holes, fill_value=0).to_numpy(dtype=float)
+        counts = np.where(counts.sum(axis=1, keepdims=True) > 0, counts, field)
+        cdf = counts.cumsum(axis=1) / counts.sum(axis=1, keepdims=True)
+        draws = rng.random((simulations, len(holes)))
+        # Index of the first score whose cumulative share exceeds the draw
+        picks = (draws[:, :, None] >= cdf[None, :, :-1]).sum(axis=2)
+        totals[player] = values[picks].sum(axis=1)
+    return pd.DataFrame(totals)
+
+
+def simulation_summary(totals: pd.DataFrame, par_total: float) -> pd.DataFrame:
+    """
+    Expected score, percentile range and win probability of each simulated player.
+
+    Scores are relative to `par_total`. A simulated round tied for the lowest
+    total counts as a shared win, so win probabilities add up to 100%.
+    """
+    scores = totals.to_numpy()
+    best = scores.min(axis=1, keepdims=True)
+    winners = scores == best
+    wins = (winners / winners.sum(axis=1, keepdims=True)).mean(axis=0)
+    relative = scores - par_total
+    return pd.DataFrame({
+        'Expected': relative.mean(axis=0),
+        'P10': np.percentile(relative, 10, axis=0),
+        'Median': np.percentile(relative, 50, axis=0),
+        'P90': np.percentile(relative, 90, axis=0),
+        'WinPct': wins * 100,
+    }, index=totals.columns)
+
+
+def pairwise_win_probabilities(totals: pd.DataFrame) -> pd.DataFrame:
+    """Chance (in %) that the row player beats the column player, ties counted as half."""
+    scores = totals.to_numpy()
+    beats = (scores[:, :, None] < scores[:, None, :]).mean(axis=0)
+    ties = (scores[:, :, None] == scores[:, None, :]).mean(axis=0)
+    matrix = pd.DataFrame((beats + ties / 2) * 100, index=totals.columns, columns=totals.columns)
+    return matrix.mask(np.eye(len(matrix), dtype=bool))
+
+
+ROUND_KEY = ['CourseName', 'LayoutName', 'StartDate']
+
+
+def shared_rounds(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Every ordered pair of players who played the same round, in one self-join.
+
+    Rounds are matched on course, layout and StartDate. Each pair appears twice
+    (once from each player's side) with the columns Player, Opponent, the round
+    key, Total, OpponentTotal and one stroke differential (player minus opponent)
+    per hole column. Rounds with a single player are dropped before the join,
+    so its size is the number of pairs, not players x rows.
+    """
+    rounds = player_rows(df).drop_duplicates(ROUND_KEY + ['PlayerName'])
+    holes = hole_columns(rounds)
+    round_ids = rounds.groupby(ROUND_KEY, sort=False).ngroup().to_numpy()
+    rounds = rounds[np.bincount(round_ids)[round_ids] > 1]
+    round_ids = rounds.groupby(ROUND_KEY, sort=False).ngroup().to_numpy()
+
+    rows = pd.DataFrame({'Round': round_ids, 'Row': np.arange(len(rounds))})
+    pairs = rows.merge(rows, on='Round', suffixes=('', 'Opponent'))
+    pairs = pairs[pairs['Row'] != pairs['RowOpponent']]
+    player, opponent = pairs['Row'].to_numpy(), pairs['RowOpponent'].to_numpy()
+
+    names = rounds['PlayerName'].to_numpy()
+    totals = rounds['Total'].to_numpy(dtype=float)
+    scores = rounds[holes].to_numpy(dtype=float)
+    shared = pd.DataFrame({
+        'Player': names[player],
+        'Opponent': names[opponent],
+        **{column: rounds[column].to_numpy()[player] for column in ROUND_KEY},
+        'Total': totals[player],
+        'OpponentTotal': totals[opponent],
+    })
+    differentials = pd.DataFrame(scores[player] - scores[opponent], columns=holes)
+    return pd.concat([shared, differentials], axis=1)
+
+
+def head_to_head(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Win/loss/tie record of every player against every opponent they played with.
+
+    Indexed by (Player, Opponent) with Rounds, Wins, Losses, Ties, WinPct (ties
+    count as half a win) and AvgDiff, the average total strokes relative to the
+    opponent (negative is better). Rounds without a total on either side are skipped.
+    """
+    pairs = shared_rounds(df)
+    pairs = pairs[pairs['Total'].notna() & pairs['OpponentTotal'].notna()]
+    difference = pairs['Total'] - pairs['OpponentTotal']
+    records = pairs.assign(
+        Difference=difference,
+        Win=(difference < 0).astype(int),
+        Loss=(difference > 0).astype(int),
+        Tie=(difference == 0).astype(int),
+    ).groupby(['Player', 'Opponent']).agg(
+        Rounds=('Difference', 'size'),
+        Wins=('Win', 'sum'),
+        Losses=('Loss', 'sum'),
+        Ties=('Tie', 'sum'),
+        AvgDiff=('Difference', 'mean'),
+    )
+    records['WinPct'] = (records['Wins'] + records['Ties'] / 2) / records['Rounds'] * 100
+    return records
+
+
+def head_to_head_holes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Average stroke differential per hole for every pair of players on every layout.
+
+    Indexed by (Player, Opponent, CourseName, LayoutName) with a Rounds column and
+    one column per hole number; negative values mean the player scores better.
+    """
+    pairs = shared_rounds(df)
+    holes = [column for column in pairs.columns if column.startswith('Hole')]
+    grouped = pairs.groupby(['Player', 'Opponent', 'CourseName', 'LayoutName'])
+    differentials = grouped[holes].mean()
+    differentials.columns = [int(column[4:]) for column in holes]
+    differentials.insert(0, 'Rounds', grouped.size())
+    return differentials
+
+
+COMPARISON_VIEWS = ['Average', 'Last Round', 'Best Per Hole', 'Best Round']
+
+
+def comparison_vectors(df: pd.DataFrame, players: List[str], course: str, layout: str,
+                       pars: pd.Series) -> pd.DataFrame:
+    """
+    Compute the Plot Stats vectors for several players in one grouped pass.
+
+    Returns a tidy frame with one row per (View, PlayerName, Hole) and the columns
+    Score, Par, RelativeToPar (rounded to 2 decimals) and Total, where View is one
+    of COMPARISON_VIEWS. Holes a player never scored are left out, like the
+    per-player filtering in UdiscStats. Semantics match UdiscStats:
+    'Last Round' is the player's first row in the data, 'Best Per Hole' ignores
+    aces and zero scores, 'Best Round' is the round with the lowest Total.
+    """
+    layout_df = df[
+        (df['CourseName'] == course) & (df['LayoutName'] == layout) & (df['PlayerName'].isin(players))
+    ]
+    holes = hole_columns(layout_df)
+    scores = layout_df[holes]
+    grouped = layout_df.groupby('PlayerName', sort=False)
+
+    last_round = grouped.head(1).set_index('PlayerName')[holes]
+    best_per_hole = scores.where(scores > 1).groupby(layout_df['PlayerName'], sort=False).min()
+    best_round = layout_df.loc[grouped['Total'].idxmin().dropna().values].set_index('PlayerName')[holes]
+
+    views = {
+        'Average': grouped[holes].mean(),
+        'Last Round': last_round,
+        'Best Per Hole': best_per_hole,
+        'Best Round': best_round,
+    }
+    totals = {
+        'Average': grouped['Total'].mean(),
+        'Last Round': last_round.sum(axis=1),
+        'Best Per Hole': best_per_hole.sum(axis=1),
+        'Best Round': grouped['Total'].min(),
+    }
+
+    tidy = pd.concat(views, names=['View', 'PlayerName']).melt(
+        ignore_index=False, var_name='HoleName', value_name='Score'
+    ).reset_index()
+
+    played = scores.notna().groupby(layout_df['PlayerName'], sort=False).any()
+    played = played.melt(ignore_index=False, var_name='HoleName', value_name='Played').reset_index()
+    tidy = tidy.merge(played, on=['PlayerName', 'HoleName'])
+    tidy = tidy[tidy['Played']].drop(columns='Played')
+
+    par_vector = pd.Series(pars).reindex(holes).astype(float)
+    tidy['Hole'] = tidy['HoleName'].str[4:].astype(int)
+    tidy['Par'] = tidy['HoleName'].map(par_vector)
+    tidy['RelativeToPar'] = (tidy['Score'] - tidy['Par']).round(2)
+    tidy['Total'] = pd.concat(totals, names=['View', 'PlayerName']).reindex(
+        pd.MultiIndex.from_frame(tidy[['View', 'PlayerName']])
+    ).values
+    return tidy.sort_values(['View', 'PlayerName', 'Hole'], kind='stable').reset_index(drop=True)
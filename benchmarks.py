@@ -0,0 +1,335 @@
+"""Timing, stress and load harnesses for the app: headless page runs, concurrent uploads and sessions."""
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent
+HOME_PAGE = APP_DIR / "main.py"
+PAGES_DIR = APP_DIR / "pages"
+
+# Session state a page needs from the home page, as after switching pages in the browser
+_SHARED_SESSION_KEYS = [
+    "df", "uploaded_file_name", "last_saved_upload_id", "source_upload_ids",
+    "dataset_hash", "dataset_summary", "time_index",
+]
+
+# Runs the home page once in a fresh interpreter; the harness import is not timed
+_COLD_START_SCRIPT = """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+AppTest.from_file({page!r}, default_timeout=120).run()
+print(time.perf_counter() - start)
+"""
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def cold_start_times(runs: int = 5) -> List[float]:
+    """Seconds for the first run of the home page, each in a new Python process."""
+    script = _COLD_START_SCRIPT.format(page=str(HOME_PAGE))
+    # The app's modules are imported from APP_DIR; data/ stays relative to the current directory
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(APP_DIR), os.environ.get("PYTHONPATH")])))
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return times
+
+
+def rerun_times(reruns: int = 20, upload_id: Optional[int] = None) -> List[float]:
+    """Seconds per home page rerun with a dataset loaded (the latest upload by default)."""
+    from streamlit.testing.v1 import AppTest
+
+    from analytics import dataset_summary
+    from db import list_uploads, load_upload_df
+    from result_cache import dataset_fingerprint
+
+    app = AppTest.from_file(str(HOME_PAGE), default_timeout=120)
+    if upload_id is None:
+        uploads = list_uploads()
+        upload_id = uploads[0].id if uploads else None
+    if upload_id is not None:
+        df = load_upload_df(upload_id)
+        app.session_state.df = df
+        app.session_state.uploaded_file_name = f"upload {upload_id}"
+        app.session_state.dataset_hash = dataset_fingerprint(df)
+        app.session_state.dataset_summary = dataset_summary(df)
+    app.run()
+
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_startup(runs: int = 5, reruns: int = 20, upload_id: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """Cold start and rerun latency of the home page."""
+    return {
+        "cold_start": _summarize(cold_start_times(runs)),
+        "rerun": _summarize(rerun_times(reruns, upload_id)),
+    }
+
+
+def _stress_uploader(data_dir: str, df: pd.DataFrame, worker: int, uploads: int, seed: int) -> List[float]:
+    """Save `uploads` variants of `df` from one process; returns the seconds per save."""
+    os.chdir(data_dir)
+    from db import save_upload
+
+    rng = random.Random(seed + worker)
+    times = []
+    for i in range(uploads):
+        # Every other upload is shared by all workers, to race on the same file hash
+        if i % 2 == 0:
+            variant = df.iloc[: len(df) - i]
+        else:
+            variant = df.drop(index=rng.sample(list(df.index), k=max(1, len(df) // 20)))
+        csv_bytes = variant.to_csv(index=False).encode("utf-8")
+        start = time.perf_counter()
+        save_upload(f"stress_{worker % 3}.csv", csv_bytes, variant)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _check_store(data_dir: str) -> List[str]:
+    """Problems found in a data directory: unreadable Parquet or blobs, hash mismatches."""
+    os.chdir(data_dir)
+    from blob_store import compute_sha256, read_blob
+    from db import list_uploads
+
+    problems = []
+    for record in list_uploads():
+        try:
+            df = pd.read_parquet(record.parquet_path)
+            if len(df) != record.num_rows:
+                problems.append(f"upload {record.id}: {len(df)} rows stored, {record.num_rows} recorded")
+            if compute_sha256(read_blob(record.file_hash)) != record.file_hash:
+                problems.append(f"upload {record.id}: blob contents do not match its hash")
+        except Exception as error:  # Any failure to read back counts as corruption
+            problems.append(f"upload {record.id}: {error}")
+    return problems
+
+
+def stress_uploads(
+    df: pd.DataFrame, uploaders: int = 8, uploads_each: int = 10, seed: int = 0
+) -> Dict[str, object]:
+    """Run concurrent uploader processes against a scratch data directory.
+
+    Half of the uploads are identical across workers and half are unique, so
+    both the dedup upsert and parallel inserts are exercised. Every stored upload
+    is read back afterwards to check for partial or corrupt files.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory(prefix="udisc_stress_") as data_dir:
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=uploaders, mp_context=context) as executor:
+            futures = [
+                executor.submit(_stress_uploader, data_dir, df, worker, uploads_each, seed)
+                for worker in range(uploaders)
+            ]
+            latencies = [latency for future in futures for latency in future.result()]
+        elapsed = time.perf_counter() - start
+
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            problems = executor.submit(_check_store, data_dir).result()
+
+    return {
+        "uploads": len(latencies),
+        "seconds": elapsed,
+        "uploads_per_second": len(latencies) / elapsed,
+        "latency": _summarize(latencies),
+        "problems": problems,
+    }
+
+
+def _rss_bytes() -> int:
+    """Resident memory of this process (peak resident memory where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Timings:
+    """Latency samples per step of one simulated session."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def run(self, step: str, app) -> None:
+        """Run (or rerun) an AppTest script and record how long it took."""
+        start = time.perf_counter()
+        app.run()
+        self.samples[step].append(time.perf_counter() - start)
+        if app.exception:
+            raise RuntimeError(f"{step}: {app.exception[0].value}")
+
+    def record(self, step: str, elapsed: float) -> None:
+        self.samples[step].append(elapsed)
+
+
+def _export_variant(csv_bytes: bytes, rng: random.Random) -> bytes:
+    """The UDisc export with about 5% of its player rounds removed; Par rows are kept."""
+    raw = pd.read_csv(io.BytesIO(csv_bytes), dtype=str, keep_default_na=False)
+    rounds = list(raw.index[raw["PlayerName"] != "Par"])
+    return raw.drop(index=rng.sample(rounds, k=max(1, len(rounds) // 20))).to_csv(index=False).encode("utf-8")
+
+
+def _upload(csv_bytes: bytes, filename: str):
+    """Validate, clean and save a UDisc export, as the home page's uploader does."""
+    from cleaning import clean_udisc_data
+    from db import save_upload
+    from validation import read_validated_csv
+
+    df, report = read_validated_csv(csv_bytes)
+    return save_upload(filename, csv_bytes, clean_udisc_data(df), validation_report=report.to_dict())
+
+
+def _browse_pages(home, rng: random.Random, timings: _Timings) -> None:
+    """Open every analysis page with the home page's dataset and change its selections."""
+    from streamlit.testing.v1 import AppTest
+
+    df = home.session_state["df"]
+    players = [player for player in df["PlayerName"].unique() if player != "Par"]
+    for page in ("player_stats", "course_difficulty", "head_to_head", "analyze_course"):
+        app = AppTest.from_file(str(PAGES_DIR / f"{page}.py"), default_timeout=120)
+        for key in _SHARED_SESSION_KEYS:
+            if key in home.session_state:
+                app.session_state[key] = home.session_state[key]
+        timings.run(page, app)
+
+        if page == "analyze_course":
+            app.multiselect[0].set_value(rng.sample(players, k=min(len(players), rng.randint(1, 3))))
+            timings.run(page, app)
+            if app.selectbox and len(app.selectbox[0].options) > 1:
+                app.selectbox[0].set_value(rng.choice(app.selectbox[0].options))
+                timings.run(page, app)
+            views = [radio for radio in app.radio if radio.key == "course_breakdown_view"]
+            if views:
+                for view in rng.sample(views[0].options, k=3):
+                    [radio for radio in app.radio if radio.key == "course_breakdown_view"][0].set_value(view)
+                    timings.run(page, app)
+        elif app.selectbox:
+            app.selectbox[0].set_value(rng.choice(app.selectbox[0].options))
+            timings.run(page, app)
+
+
+def _simulated_session(data_dir: str, source: bytes, session: int, seed: int) -> Dict[str, object]:
+    """One user: upload a file, load it from the saved datasets, then visit every page.
+
+    Runs in a worker process; returns the step latencies, the worker's memory
+    before and after, and the error that ended the session, if any.
+    """
+    os.chdir(data_dir)
+    from streamlit.testing.v1 import AppTest
+
+    from warmup import shutdown_pool
+
+    timings = _Timings()
+    rss_before = _rss_bytes()
+    error = None
+    try:
+        rng = random.Random(seed + session)
+        variant = _export_variant(source, rng)
+        start = time.perf_counter()
+        record = _upload(variant, f"load_test_{session}.csv")
+        timings.record("upload", time.perf_counter() - start)
+
+        home = AppTest.from_file(str(HOME_PAGE), default_timeout=120)
+        timings.run("home", home)
+        selector = home.selectbox(key="saved_upload_selector")
+        selector.set_value(next(option for option in selector.options if f"ID {record.id}:" in option))
+        timings.run("home", home)
+        next(button for button in home.button if button.label == "📥 Load Dataset").click()
+        timings.run("load_saved", home)
+
+        _browse_pages(home, rng, timings)
+    except Exception as exception:  # A failed session is reported, not fatal to the run
+        error = f"session {session}: {exception}"
+    rss_after = _rss_bytes()
+
+    # Background precomputation started by the session writes into the data directory
+    for thread in threading.enumerate():
+        if thread.name.startswith("warmup-"):
+            thread.join()
+    # Its worker processes would otherwise keep this worker from exiting
+    shutdown_pool()
+    return {"samples": dict(timings.samples), "rss_before": rss_before, "rss_after": rss_after, "error": error}
+
+
+def load_test(
+    csv_bytes: bytes, sessions: int = 8, concurrency: int = 4, seed: int = 0
+) -> Dict[str, object]:
+    """Drive simulated user sessions through the app concurrently in a scratch data directory.
+
+    Every session uploads a variant of the UDisc export `csv_bytes` (the original
+    bytes of a saved upload), loads it from the saved datasets
+    on the home page and opens each analysis page with random player, course,
+    layout and view selections, all as headless AppTest script runs. AppTest
+    is not thread-safe, so concurrent sessions run in `concurrency` worker
+    processes sharing one data directory, like the multi-worker mode; each
+    worker keeps its module caches across the sessions it serves. Reports
+    latency percentiles per step, throughput and per-worker memory growth.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory(prefix="udisc_load_") as data_dir:
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=concurrency, mp_context=context) as executor:
+            results = list(executor.map(
+                _simulated_session, [data_dir] * sessions, [csv_bytes] * sessions, range(sessions), [seed] * sessions
+            ))
+        elapsed = time.perf_counter() - start
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        for step, step_samples in result["samples"].items():
+            samples[step].extend(step_samples)
+    runs = sum(len(step_samples) for step_samples in samples.values())
+    errors = [result["error"] for result in results if result["error"]]
+    growth = [result["rss_after"] - result["rss_before"] for result in results]
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "sessions_per_second": (sessions - len(errors)) / elapsed,
+        "script_runs_per_second": runs / elapsed,
+        "latency": {step: _summarize(step_samples) for step, step_samples in sorted(samples.items())},
+        "peak_worker_rss_mb": max(result["rss_after"] for result in results) / 2 ** 20,
+        "median_session_growth_mb": statistics.median(growth) / 2 ** 20,
+        "errors": errors,
+    }
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+import zstandard
+
+from atomic_io import atomic_write
+
+# Content-addressed storage for the original bytes of uploaded CSV files
+BLOBS_DIR = Path("data/blobs")
+
+# Blob file layout: MAGIC | base hash (64 hex chars, zeros when stored in full) | zstd frame
+_MAGIC = b"UDZ1"
+_NO_BASE = "0" * 64
+_HEADER_SIZE = len(_MAGIC) + 64
+
+COMPRESSION_LEVEL = 19
+# Longest chain of deltas allowed before a blob is stored in full again
+MAX_DELTA_CHAIN = 8
+_MAX_WINDOW_LOG = 27
+
+
+def compute_sha256(data: bytes) -> str:
+    """Return the SHA-256 hash (hex) of the provided bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_path(blob_hash: str) -> Path:
+    return BLOBS_DIR / blob_hash[:2] / f"{blob_hash}.zst"
+
+
+def blob_exists(blob_hash: str) -> bool:
+    return blob_path(blob_hash).exists()
+
+
+def _read_header(path: Path) -> Optional[str]:
+    """Return the base hash recorded in a blob file header (None for full blobs)."""
+    with open(path, "rb") as blob_file:
+        header = blob_file.read(_HEADER_SIZE)
+    if not header.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a blob file")
+    base_hash = header[len(_MAGIC):].decode("ascii")
+    return None if base_hash == _NO_BASE else base_hash
+
+
+def get_base_hash(blob_hash: str) -> Optional[str]:
+    """Return the hash of the blob this one is a delta against, if any."""
+    return _read_header(blob_path(blob_hash))
+
+
+def chain_depth(blob_hash: str) -> int:
+    """Number of deltas that must be applied to reconstruct the blob."""
+    depth = 0
+    base_hash = get_base_hash(blob_hash)
+    while base_hash is not None:
+        depth += 1
+        base_hash = get_base_hash(base_hash)
+    return depth
+
+
+def _window_log(*sizes: int) -> int:
+    return max(zstandard.WINDOWLOG_MIN, min(_MAX_WINDOW_LOG, sum(sizes).bit_length()))
+
+
+def _raw_dictionary(base_bytes: bytes) -> zstandard.ZstdCompressionDict:
+    return zstandard.ZstdCompressionDict(base_bytes, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+def write_blob(data: bytes, base_hash: Optional[str] = None) -> str:
+    """Store bytes compressed with zstd and return their SHA-256 hash.
+
+    - Blobs are content-addressed, so storing the same bytes twice is a no-op.
+    - When `base_hash` names an existing blob, the data is compressed using that
+      blob's contents as a raw dictionary, so only the new bytes take up space.
+    - Falls back to a full copy when the base is missing or its chain is too long.
+    """
+    blob_hash = compute_sha256(data)
+    path = blob_path(blob_hash)
+    if path.exists():
+        return blob_hash
+
+    if base_hash is not None and (
+        base_hash == blob_hash
+        or not blob_exists(base_hash)
+        or chain_depth(base_hash) >= MAX_DELTA_CHAIN
+    ):
+        base_hash = None
+
+    if base_hash is None:
+        compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    else:
+        base_bytes = read_blob(base_hash)
+        params = zstandard.ZstdCompressionParameters.from_level(
+            COMPRESSION_LEVEL,
+            window_log=_window_log(len(base_bytes), len(data)),
+            enable_ldm=True,
+        )
+        compressor = zstandard.ZstdCompressor(
+            dict_data=_raw_dictionary(base_bytes), compression_params=params
+        )
+
+    header = _MAGIC + (base_hash or _NO_BASE).encode("ascii")
+    # Concurrent writers of the same blob produce identical bytes; the last rename wins
+    with atomic_write(path) as tmp_path:
+        tmp_path.write_bytes(header + compressor.compress(data))
+    return blob_hash
+
+
+def read_blob(blob_hash: str) -> bytes:
+    """Return the original bytes of a stored blob, applying deltas as needed."""
+    path = blob_path(blob_hash)
+    if not path.exists():
+        raise FileNotFoundError(f"Blob {blob_hash} not found at {path}")
+
+    payload = path.read_bytes()
+    if not payload.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a blob file")
+    base_hash = payload[len(_MAGIC):_HEADER_SIZE].decode("ascii")
+    frame = payload[_HEADER_SIZE:]
+
+    if base_hash == _NO_BASE:
+        decompressor = zstandard.ZstdDecompressor()
+    else:
+        decompressor = zstandard.ZstdDecompressor(
+            dict_data=_raw_dictionary(read_blob(base_hash)),
+            max_window_size=1 << _MAX_WINDOW_LOG,
+        )
+    data = decompressor.decompress(frame)
+    if compute_sha256(data) != blob_hash:
+        raise ValueError(f"Blob {blob_hash} failed its integrity check")
+    return data
+
+
+def collect_garbage(referenced_hashes: Iterable[str]) -> int:
+    """Delete blobs that are neither referenced nor needed as a delta base.
+
+    Returns the number of bytes freed.
+    """
+    keep = set()
+    for blob_hash in referenced_hashes:
+        while blob_hash is not None and blob_hash not in keep and blob_exists(blob_hash):
+            keep.add(blob_hash)
+            blob_hash = get_base_hash(blob_hash)
+
+    freed = 0
+    for path in BLOBS_DIR.glob("*/*.zst"):
+        if path.stem not in keep:
+            freed += path.stat().st_size
+            path.unlink()
+            if not any(path.parent.iterdir()):
+                path.parent.rmdir()
+    return freed
@@ -0,0 +1,31 @@
+"""Cleaning applied to every UDisc export before it is saved or analyzed."""
+import pandas as pd
+
+from analytics import estimate_round_ratings
+
+
+def clean_udisc_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean and standardize UDisc CSV data."""
+    # Remove rows with all zeros in score columns (incomplete rounds); the
+    # RatingEstimated flag of an already cleaned frame is not a score (False == 0)
+    scores = df.iloc[:, 3:].drop(columns='RatingEstimated', errors='ignore')
+    df = df.loc[~(scores == 0).any(axis=1)]
+
+    # Standardize course names
+    course_name_mapping = {
+        'Indian Riffle Park/Kettering': 'Indian Riffle Disc Golf Course',
+        'Belmont Park': 'Belmont Park Disc Golf Course',
+        'Karohl Park': 'Karohl Park Disc Golf Course',
+        'Sycamore Trails Park': 'Reazin Family DGC @ Sycamore Trails Park',
+    }
+    df['CourseName'] = df['CourseName'].replace(course_name_mapping)
+
+    # Standardize layout names
+    layout_name_mapping = {
+        '2018 Redesign': 'Main 18 Hole Layout',
+        'Belmont': 'Short Tees with Long 16'
+    }
+    df['LayoutName'] = df['LayoutName'].replace(layout_name_mapping)
+    
+    # Blank ratings are estimated once here, so every page sees complete ratings
+    return estimate_round_ratings(df)
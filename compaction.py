@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pandas as pd
+
+from blob_store import collect_garbage
+from db import (
+    UploadRecord,
+    delete_upload,
+    list_uploads,
+    load_upload_df,
+    save_compacted_dataset,
+)
+from udisc_stats import ROUND_KEY_COLUMNS
+
+# Default retention policy for superseded uploads
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_KEEP_LATEST = 3
+
+
+@dataclass
+class CompactionResult:
+    canonical: Optional[UploadRecord] = None
+    removed_upload_ids: List[int] = field(default_factory=list)
+    freed_bytes: int = 0
+
+
+def _order_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep metadata columns first and hole columns in numeric order."""
+    holes = sorted((c for c in df.columns if c.startswith('Hole')), key=lambda c: int(c[4:]))
+    others = [c for c in df.columns if not c.startswith('Hole')]
+    return df[others + holes]
+
+
+def merge_uploads(records: List[UploadRecord]) -> pd.DataFrame:
+    """Union several uploads, keeping the newest copy of every round.
+
+    `records` must be ordered newest first, as returned by `list_uploads`.
+    """
+    frames = [load_upload_df(record.id) for record in records]
+    merged = pd.concat(frames, ignore_index=True, sort=False)
+    merged = merged.drop_duplicates(subset=ROUND_KEY_COLUMNS, keep='first')
+    merged = merged.dropna(how='all', axis=1).reset_index(drop=True)
+    return _order_columns(merged)
+
+
+def compact_uploads(
+    retention_days: int = DEFAULT_RETENTION_DAYS,
+    keep_latest: int = DEFAULT_KEEP_LATEST,
+    dry_run: bool = False,
+) -> CompactionResult:
+    """Merge saved uploads into one canonical dataset and prune stale ones.
+
+    - The previous canonical dataset and every upload saved since are merged
+      into a new canonical dataset with the newest copy of each round. It is
+      published in one transaction that marks the merged uploads as superseded
+      and removes the previous canonical dataset (see `save_compacted_dataset`).
+    - Superseded uploads are deleted once they are older than `retention_days`,
+      except for the `keep_latest` most recent regular uploads.
+    - Original CSV blobs that no remaining upload references are removed.
+    """
+    result = CompactionResult()
+    uploads = list_uploads()
+    if not uploads:
+        return result
+
+    # Superseded uploads are already part of the current canonical dataset, and
+    # uploads whose Parquet file is missing have nothing left to merge
+    mergeable = [record for record in uploads if record.superseded_by is None and record.parquet_path.exists()]
+    if len(mergeable) == 1 and mergeable[0].kind == "compacted":
+        result.canonical = mergeable[0]
+    elif mergeable and dry_run:
+        result.removed_upload_ids.extend(record.id for record in mergeable if record.kind == "compacted")
+    elif mergeable:
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        result.canonical, retired_ids, freed = save_compacted_dataset(
+            f"compacted-{stamp}", merge_uploads(mergeable), [record.id for record in mergeable]
+        )
+        result.removed_upload_ids.extend(retired_ids)
+        result.freed_bytes += freed
+        uploads = list_uploads()
+
+    # A dry run reports the uploads this compaction would have superseded as well
+    superseded = {record.id for record in uploads if record.superseded_by is not None}
+    if dry_run:
+        superseded.update(record.id for record in mergeable if record.kind == "upload")
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    # `uploads` is newest first, so the slice keeps the most recent regular uploads
+    recent_ids = {record.id for record in [r for r in uploads if r.kind == "upload"][:keep_latest]}
+
+    for record in uploads:
+        if record.kind == "compacted" or record.id in recent_ids:
+            continue
+        if record.id not in superseded and record.parquet_path.exists():
+            continue
+        if datetime.fromisoformat(record.uploaded_at) > cutoff:
+            continue
+        result.removed_upload_ids.append(record.id)
+        if not dry_run:
+            result.freed_bytes += delete_upload(record.id)
+
+    if not dry_run:
+        remaining = [record.file_hash for record in list_uploads()]
+        result.freed_bytes += collect_garbage(remaining)
+
+    return result
@@ -0,0 +1,79 @@
+"""Date window selection shared by the analysis pages."""
+import pandas as pd
+import streamlit as st
+
+from db import uploads_exist
+from udisc_stats import TimeIndex
+
+
+def get_time_index(df: pd.DataFrame) -> TimeIndex:
+    """The session's time index for `df`, built once per dataset."""
+    dataset_hash = st.session_state.get('dataset_hash')
+    cached = st.session_state.get('time_index')
+    if dataset_hash is not None and cached is not None and cached[0] == dataset_hash:
+        return cached[1]
+    time_index = TimeIndex(df)
+    if dataset_hash is not None:
+        st.session_state.time_index = (dataset_hash, time_index)
+    return time_index
+
+
+def select_date_window(df: pd.DataFrame) -> pd.DataFrame:
+    """Show a date range picker in the sidebar and return the rounds inside it.
+
+    The chosen window is remembered for the rest of the run, so
+    `active_dataset_hash` and `active_upload_ids` describe the windowed data.
+    """
+    st.session_state.active_date_window = None
+    time_index = get_time_index(df)
+    first, last = time_index.bounds()
+    if first is None:
+        return df
+
+    selection = st.sidebar.date_input(
+        "📅 Date range",
+        value=(first, last),
+        min_value=first,
+        max_value=last,
+        key="date_window",
+        help="Only rounds started within this range are analyzed"
+    )
+    # While the user is picking the second date only one value is returned
+    if len(selection) != 2 or tuple(selection) == (first, last):
+        return df
+
+    start, end = selection
+    st.session_state.active_date_window = (start, end)
+    st.sidebar.caption(f"Showing rounds from {start:%b %d, %Y} to {end:%b %d, %Y}")
+    return time_index.window(df, start, end)
+
+
+def active_dataset_hash():
+    """Dataset hash for result caching, distinct for every date window."""
+    dataset_hash = st.session_state.get('dataset_hash')
+    window = st.session_state.get('active_date_window')
+    if dataset_hash is None or window is None:
+        return dataset_hash
+    return f"{dataset_hash}-{window[0]:%Y%m%d}-{window[1]:%Y%m%d}"
+
+
+def saved_upload_ids():
+    """Saved uploads the session's dataset was built from, or None.
+
+    None as well when compaction has removed one of them since the dataset was
+    loaded; the session's frame is still complete, so pages use the pandas path.
+    """
+    upload_ids = st.session_state.get('source_upload_ids')
+    if not upload_ids or not uploads_exist(upload_ids):
+        return None
+    return upload_ids
+
+
+def active_upload_ids():
+    """Saved uploads backing the data, or None when a date window narrows it.
+
+    The SQL engine reads whole uploads, so windowed data uses the pandas path.
+    """
+    if st.session_state.get('active_date_window') is not None:
+        return None
+    return saved_upload_ids()
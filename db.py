@@ -1,20 +1,37 @@
 from __future__ import annotations
 
+import functools
 import hashlib
+import json
 import os
+import random
 import sqlite3
+import time
 from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
+from atomic_io import atomic_write
+from blob_store import blob_exists, read_blob, write_blob
+from parquet_pages import PARQUET_ROW_GROUP_ROWS
+
 # Constants for storage locations
 DB_PATH = Path("data/app.db")
 UPLOADS_DIR = Path("data/uploads")
 
+# How long a connection waits for another writer's lock, and how often a write
+# that still finds the database locked is retried (with jittered backoff)
+BUSY_TIMEOUT_SECONDS = 30
+WRITE_RETRIES = 5
+
+# Database file whose schema has been created/migrated by this process
+_initialized_db_path: Optional[Path] = None
+
 
 def _ensure_storage_locations_exist() -> None:
     """Create the database directory and uploads directory if missing."""
@@ -26,7 +43,7 @@ def _ensure_storage_locations_exist() -> None:
 def _connect() -> Iterable[sqlite3.Connection]:
     """Context manager to open a SQLite connection with sensible defaults."""
     _ensure_storage_locations_exist()
-    connection = sqlite3.connect(DB_PATH)
+    connection = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_SECONDS)
     try:
         connection.execute("PRAGMA journal_mode=WAL;")
         connection.row_factory = sqlite3.Row
@@ -36,8 +53,40 @@ def _connect() -> Iterable[sqlite3.Connection]:
         connection.close()
 
 
-def initialize_database() -> None:
-    """Create required tables if they do not exist."""
+def _retry_when_locked(func):
+    """Retry a database write that fails because another writer holds the lock."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(WRITE_RETRIES):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as error:
+                if "locked" not in str(error) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * 2 ** attempt * (1 + random.random()))
+    return wrapper
+
+
+def _write_parquet(df: pd.DataFrame, path: Path, **kwargs) -> None:
+    """Write a Parquet file atomically, so readers never load a partial file.
+
+    Small row groups let previews read one page without decoding the whole file.
+    """
+    kwargs.setdefault('row_group_size', PARQUET_ROW_GROUP_ROWS)
+    with atomic_write(path) as tmp_path:
+        df.to_parquet(tmp_path, **kwargs)
+
+
+def initialize_database(force: bool = False) -> None:
+    """Create required tables if they do not exist.
+
+    The schema is only checked once per process (and database path); later calls
+    return immediately unless `force` is set or the database file was removed.
+    """
+    global _initialized_db_path
+    if not force and _initialized_db_path == DB_PATH and DB_PATH.exists():
+        return
+
     _ensure_storage_locations_exist()
     with _connect() as connection:
         connection.execute(
@@ -52,6 +101,176 @@ def initialize_database() -> None:
             );
             """
         )
+        _ensure_column(connection, "uploads", "uploaded_at_ts", "INTEGER")
+        _ensure_column(connection, "uploads", "kind", "TEXT NOT NULL DEFAULT 'upload'")
+        # JSON report from validation.read_validated_csv (NULL for older and compacted uploads)
+        _ensure_column(connection, "uploads", "validation_report", "TEXT")
+        # The pinned upload is loaded automatically when a new session starts
+        _ensure_column(connection, "uploads", "pinned", "INTEGER NOT NULL DEFAULT 0")
+        # Compacted dataset that contains every round of this upload (set by compaction)
+        _ensure_column(connection, "uploads", "superseded_by", "INTEGER")
+        # Backfill epoch timestamps for rows created before the column existed
+        connection.execute(
+            """
+            UPDATE uploads
+            SET uploaded_at_ts = CAST(strftime('%s', uploaded_at) AS INTEGER)
+            WHERE uploaded_at_ts IS NULL
+            """
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_uploads_uploaded_at_ts ON uploads (uploaded_at_ts DESC, id DESC)"
+        )
+        # Normalized scorecards: one row per player round and one per hole played
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rounds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                upload_id INTEGER NOT NULL,
+                player TEXT NOT NULL,
+                course TEXT NOT NULL,
+                layout TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                total INTEGER,
+                plus_minus INTEGER,
+                rating REAL
+            );
+            """
+        )
+        # Set for ratings estimated at ingest (analytics.estimate_round_ratings)
+        _ensure_column(connection, "rounds", "rating_estimated", "INTEGER")
+        # Fingerprint of the round's values (see _round_versions)
+        _ensure_column(connection, "rounds", "version", "INTEGER")
+        # Rounds were stored once per key, overwritten by every later upload, before
+        # they were versioned; those tables are rebuilt from the saved uploads
+        reindex = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_rounds_player_course_layout'"
+        ).fetchone() is not None and connection.execute("SELECT 1 FROM rounds LIMIT 1").fetchone() is not None
+        connection.execute("DROP INDEX IF EXISTS idx_rounds_player_course_layout")
+        # Serves both (player, course, layout) lookups and round-level dedup
+        connection.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_rounds_player_course_layout_version
+            ON rounds (player, course, layout, start_date, version)
+            """
+        )
+        # Which saved uploads contain each round; a round shared by cumulative exports
+        # is stored once in `rounds` and listed here once per upload. A re-export that
+        # changes a round's values adds a new version, so earlier uploads keep theirs
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS upload_rounds (
+                upload_id INTEGER NOT NULL,
+                round_id INTEGER NOT NULL REFERENCES rounds (id),
+                PRIMARY KEY (upload_id, round_id)
+            ) WITHOUT ROWID;
+            """
+        )
+        # Databases indexed before the table existed: each round's latest upload until `reindex_rounds`
+        connection.execute(
+            """
+            INSERT INTO upload_rounds (upload_id, round_id)
+            SELECT upload_id, id FROM rounds
+            WHERE NOT EXISTS (SELECT 1 FROM upload_rounds)
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hole_scores (
+                round_id INTEGER NOT NULL REFERENCES rounds (id),
+                hole INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                par INTEGER,
+                PRIMARY KEY (round_id, hole)
+            ) WITHOUT ROWID;
+            """
+        )
+        # Aces, eagles and birdies of every round, denormalized for per-player lookups
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS score_events (
+                round_id INTEGER NOT NULL REFERENCES rounds (id),
+                hole INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                player TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                PRIMARY KEY (round_id, hole)
+            ) WITHOUT ROWID;
+            """
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_score_events_player_kind ON score_events (player, kind, start_date)"
+        )
+        # Runs of two or more consecutive under-par holes, run-length encoded per round
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS under_par_streaks (
+                round_id INTEGER NOT NULL REFERENCES rounds (id),
+                start_hole INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                player TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                PRIMARY KEY (round_id, start_hole)
+            ) WITHOUT ROWID;
+            """
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_streaks_player_length ON under_par_streaks (player, length DESC, start_date)"
+        )
+        # Records were kept across all uploads before they were kept per upload
+        record_columns = {row["name"] for row in connection.execute("PRAGMA table_info(round_records)")}
+        rebuild_records = bool(record_columns) and "upload_id" not in record_columns
+        if rebuild_records:
+            connection.execute("DROP TABLE round_records")
+            connection.execute("DROP TABLE hole_bests")
+        # Per (upload, player, course, layout) records, built by ingest_rounds
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS round_records (
+                upload_id INTEGER NOT NULL,
+                player TEXT NOT NULL,
+                course TEXT NOT NULL,
+                layout TEXT NOT NULL,
+                best_round_id INTEGER,
+                best_total INTEGER,
+                best_plus_minus INTEGER,
+                best_rating REAL,
+                best_date TEXT,
+                worst_round_id INTEGER,
+                worst_total INTEGER,
+                worst_plus_minus INTEGER,
+                worst_rating REAL,
+                worst_date TEXT,
+                theoretical_best INTEGER,
+                PRIMARY KEY (player, upload_id, course, layout)
+            ) WITHOUT ROWID;
+            """
+        )
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS hole_bests (
+                upload_id INTEGER NOT NULL,
+                player TEXT NOT NULL,
+                course TEXT NOT NULL,
+                layout TEXT NOT NULL,
+                hole INTEGER NOT NULL,
+                best_score INTEGER NOT NULL,
+                PRIMARY KEY (player, upload_id, course, layout, hole)
+            ) WITHOUT ROWID;
+            """
+        )
+        if rebuild_records:
+            for row in connection.execute("SELECT DISTINCT upload_id FROM upload_rounds").fetchall():
+                _update_records(connection, row["upload_id"])
+    _initialized_db_path = DB_PATH
+    if reindex:
+        reindex_rounds()
+
+
+def _ensure_column(connection: sqlite3.Connection, table: str, column: str, definition: str) -> None:
+    """Add a column to an existing table if it is missing (lightweight migration)."""
+    existing = {row["name"] for row in connection.execute(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
 
 def _compute_sha256(file_bytes: bytes) -> str:
@@ -69,6 +288,10 @@ class UploadRecord:
     uploaded_at: str
     num_rows: int
     num_cols: int
+    kind: str = "upload"
+    validation_report: Optional[dict] = None
+    pinned: bool = False
+    superseded_by: Optional[int] = None
 
     @property
     def parquet_path(self) -> Path:
@@ -76,6 +299,7 @@ class UploadRecord:
 
     @property
     def csv_path(self) -> Path:
+        """Legacy location of the original CSV bytes (now kept in the blob store)."""
         return UPLOADS_DIR / f"{self.id}.csv"
 
 
@@ -87,6 +311,10 @@ def _row_to_upload_record(row: sqlite3.Row) -> UploadRecord:
         uploaded_at=row["uploaded_at"],
         num_rows=row["num_rows"],
         num_cols=row["num_cols"],
+        kind=row["kind"],
+        validation_report=json.loads(row["validation_report"]) if row["validation_report"] else None,
+        pinned=bool(row["pinned"]),
+        superseded_by=row["superseded_by"],
     )
 
 
@@ -95,7 +323,7 @@ def list_uploads() -> List[UploadRecord]:
     initialize_database()
     with _connect() as connection:
         rows = connection.execute(
-            "SELECT * FROM uploads ORDER BY datetime(uploaded_at) DESC"
+            "SELECT * FROM uploads ORDER BY uploaded_at_ts DESC, id DESC"
         ).fetchall()
     return [_row_to_upload_record(row) for row in rows]
 
@@ -110,12 +338,99 @@ def get_upload(upload_id: int) -> Optional[UploadRecord]:
     return _row_to_upload_record(row) if row else None
 
 
-def save_upload(filename: str, file_bytes: bytes, cleaned_df: pd.DataFrame) -> UploadRecord:
+def uploads_exist(upload_ids: Sequence[int]) -> bool:
+    """True when every id still names a saved upload (compaction may have removed some)."""
+    ids = set(upload_ids)
+    if not ids:
+        return False
+    initialize_database()
+    with _connect() as connection:
+        found = connection.execute(
+            f"SELECT count(*) FROM uploads WHERE id IN ({', '.join('?' * len(ids))})", tuple(ids)
+        ).fetchone()[0]
+    return found == len(ids)
+
+
+def get_default_upload() -> Optional[UploadRecord]:
+    """The upload new sessions start with: the pinned one, else the most recent."""
+    initialize_database()
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT * FROM uploads ORDER BY pinned DESC, uploaded_at_ts DESC, id DESC LIMIT 1"
+        ).fetchone()
+    return _row_to_upload_record(row) if row else None
+
+
+@_retry_when_locked
+def pin_upload(upload_id: Optional[int]) -> None:
+    """Make `upload_id` the default dataset for new sessions (None unpins)."""
+    initialize_database()
+    with _connect() as connection:
+        connection.execute("UPDATE uploads SET pinned = (id IS ?)", (upload_id,))
+
+
+def _previous_upload_hash(connection: sqlite3.Connection, filename: str) -> Optional[str]:
+    """Hash of the most recent upload with the same filename (the delta base)."""
+    row = connection.execute(
+        "SELECT file_hash FROM uploads WHERE filename = ? AND kind = 'upload' ORDER BY id DESC LIMIT 1",
+        (filename,),
+    ).fetchone()
+    return row["file_hash"] if row else None
+
+
+def _get_or_insert_upload(
+    connection: sqlite3.Connection,
+    filename: str,
+    file_hash: str,
+    df: pd.DataFrame,
+    kind: str = "upload",
+    validation_report: Optional[dict] = None,
+) -> Tuple[UploadRecord, bool]:
+    """Return the upload row for `file_hash` and whether it was created by this call.
+
+    Uses a single upsert, so concurrent writers of the same file end up with one row.
+    """
+    now = datetime.now(timezone.utc)
+    cursor = connection.execute(
+        """
+        INSERT INTO uploads (filename, file_hash, uploaded_at, uploaded_at_ts, num_rows, num_cols, kind, validation_report)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (file_hash) DO NOTHING
+        """,
+        (
+            filename,
+            file_hash,
+            now.isoformat(),
+            int(now.timestamp()),
+            int(df.shape[0]),
+            int(df.shape[1]),
+            kind,
+            json.dumps(validation_report) if validation_report is not None else None,
+        ),
+    )
+    row = connection.execute(
+        "SELECT * FROM uploads WHERE file_hash = ?",
+        (file_hash,),
+    ).fetchone()
+    return _row_to_upload_record(row), cursor.rowcount == 1
+
+
+@_retry_when_locked
+def save_upload(
+    filename: str,
+    file_bytes: bytes,
+    cleaned_df: pd.DataFrame,
+    use_delta: bool = True,
+    validation_report: Optional[dict] = None,
+) -> UploadRecord:
     """Persist an uploaded file and its cleaned DataFrame.
 
     - Deduplicates by SHA-256 of the original bytes.
     - Saves cleaned DataFrame to Parquet under `data/uploads/<id>.parquet`.
-    - Also writes the original CSV bytes to `data/uploads/<id>.csv` for reference.
+    - Stores the original CSV bytes zstd-compressed in the content-addressed blob
+      store. With `use_delta`, they are compressed against the previous export
+      with the same filename, since UDisc exports are cumulative.
+    - Keeps `validation_report` (see validation.py) as JSON on a new record.
     - Returns the corresponding UploadRecord.
     """
     if not isinstance(cleaned_df, pd.DataFrame):
@@ -124,49 +439,721 @@ def save_upload(filename: str, file_bytes: bytes, cleaned_df: pd.DataFrame) -> U
     initialize_database()
 
     file_hash = _compute_sha256(file_bytes)
-    uploaded_at = datetime.now(timezone.utc).isoformat()
+    # Build the staging rows outside the write lock unless the file is already stored
+    with _connect() as connection:
+        known = connection.execute(
+            "SELECT 1 FROM uploads WHERE file_hash = ?", (file_hash,)
+        ).fetchone() is not None
+    staged = None if known else stage_rounds(cleaned_df)
 
-    # Try to find an existing record by hash (dedupe)
+    # BEGIN IMMEDIATE takes the write lock up front, so concurrent uploaders queue
+    # on the busy timeout instead of failing when upgrading a read transaction
     with _connect() as connection:
-        existing = connection.execute(
-            "SELECT * FROM uploads WHERE file_hash = ?",
-            (file_hash,),
-        ).fetchone()
-        if existing is None:
-            cursor = connection.execute(
-                """
-                INSERT INTO uploads (filename, file_hash, uploaded_at, num_rows, num_cols)
-                VALUES (?, ?, ?, ?, ?)
+        connection.execute("BEGIN IMMEDIATE")
+        base_hash = _previous_upload_hash(connection, filename) if use_delta else None
+        record, created = _get_or_insert_upload(
+            connection, filename, file_hash, cleaned_df, validation_report=validation_report
+        )
+        if created:
+            ingest_rounds(connection, record.id, cleaned_df, staged)
+            # Written before the commit, so a visible upload always has its Parquet file
+            _write_parquet(cleaned_df, record.parquet_path)
+
+    # Restore files missing for uploads saved before a crash (idempotent writes)
+    if not record.parquet_path.exists():
+        _write_parquet(cleaned_df, record.parquet_path)
+    if not blob_exists(record.file_hash):
+        write_blob(file_bytes, base_hash=base_hash)
+
+    return record
+
+
+def _none_for_nan(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype(object).where(df.notna(), None)
+
+
+# Streaks shorter than this are not stored (single birdies are already events)
+MIN_STREAK_LENGTH = 2
+
+StagedRounds = Tuple[List[tuple], List[tuple], List[tuple], List[tuple]]
+
+
+def _score_events(hole_scores: pd.DataFrame) -> pd.DataFrame:
+    """Aces, eagles (or better) and birdies among the hole scores, in one vectorized pass."""
+    score, par = hole_scores['Score'], hole_scores['Par']
+    kind = np.select([score == 1, score <= par - 2, score == par - 1], ['ace', 'eagle', 'birdie'], default='')
+    return hole_scores[kind != ''].assign(Kind=kind[kind != ''])
+
+
+def _under_par_streaks(hole_scores: pd.DataFrame, key_columns: List[str]) -> pd.DataFrame:
+    """Run-length encode consecutive under-par holes per round.
+
+    Returns one row per run of at least MIN_STREAK_LENGTH holes with its first hole and length.
+    """
+    ordered = hole_scores.sort_values(key_columns + ['Hole'], kind='stable')
+    round_ids = ordered.groupby(key_columns, sort=False).ngroup().to_numpy()
+    holes = ordered['Hole'].to_numpy()
+    under = (ordered['Score'] < ordered['Par']).to_numpy()
+
+    # A run starts at an under-par hole that does not continue one on the previous hole
+    continues = np.zeros(len(ordered), dtype=bool)
+    continues[1:] = under[:-1] & (round_ids[1:] == round_ids[:-1]) & (holes[1:] == holes[:-1] + 1)
+    starts = under & ~continues
+    run_ids = np.cumsum(starts)[under] - 1
+    lengths = np.bincount(run_ids)
+
+    runs = ordered[starts].assign(Length=lengths)
+    return runs[runs['Length'] >= MIN_STREAK_LENGTH]
+
+
+def _round_versions(rounds: pd.DataFrame, hole_scores: pd.DataFrame, round_columns: List[str]) -> np.ndarray:
+    """Fingerprint of each round's values: total, +/-, rating and every hole's score and par.
+
+    Copies of a round with the same values get the same fingerprint whatever
+    upload they come from, so cumulative exports share one stored version.
+    """
+    def row_hashes(frame: pd.DataFrame) -> pd.Series:
+        numbers = frame.apply(pd.to_numeric, errors='coerce').astype(float)
+        return pd.util.hash_pandas_object(numbers, index=False)
+
+    # Each hole's hash covers its number, so the (wrapping) sum does not depend on row order
+    hole_hashes = row_hashes(hole_scores[['Hole', 'Score', 'Par']]).groupby(
+        [hole_scores[column] for column in round_columns], sort=False
+    ).sum()
+    positions = hole_hashes.index.get_indexer(pd.MultiIndex.from_frame(rounds[round_columns]))
+    hole_sums = np.where(positions >= 0, hole_hashes.to_numpy()[positions], np.uint64(0))
+    versions = row_hashes(rounds[['Total', '+/-', 'RoundRating', 'RatingEstimated']]).to_numpy() + hole_sums
+    # SQLite integers are signed 64-bit
+    return versions.astype(np.int64)
+
+
+def stage_rounds(df: pd.DataFrame) -> StagedRounds:
+    """Rows for the round, hole score, event and streak staging tables of a cleaned frame.
+
+    Pure pandas work, so writers can do it before taking the database write lock.
+    """
+    rounds = df[df['PlayerName'] != 'Par']
+    holes = [c for c in df.columns if c.startswith('Hole')]
+
+    # Par per hole comes from the 'Par' row of the same scorecard
+    key_columns = ['CourseName', 'LayoutName', 'StartDate']
+    par_scores = df[df['PlayerName'] == 'Par'].drop_duplicates(subset=key_columns).melt(
+        id_vars=key_columns, value_vars=holes, var_name='HoleName', value_name='Par'
+    ).dropna(subset=['Par'])
+    hole_scores = rounds.melt(
+        id_vars=['PlayerName'] + key_columns, value_vars=holes, var_name='HoleName', value_name='Score'
+    ).dropna(subset=['Score'])
+    hole_scores = hole_scores.merge(par_scores, on=key_columns + ['HoleName'], how='left')
+    hole_scores['Hole'] = hole_scores['HoleName'].str[4:].astype(int)
+
+    round_columns = ['PlayerName'] + key_columns
+    if 'RatingEstimated' not in rounds.columns:
+        rounds = rounds.assign(RatingEstimated=None)
+    rounds = rounds.assign(Version=_round_versions(rounds, hole_scores, round_columns))
+    hole_scores = hole_scores.merge(
+        rounds[round_columns + ['Version']].drop_duplicates(round_columns), on=round_columns, how='left'
+    )
+    round_columns = round_columns + ['Version']
+    round_rows = list(
+        _none_for_nan(rounds[
+            round_columns + ['Total', '+/-', 'RoundRating', 'RatingEstimated']
+        ]).itertuples(index=False, name=None)
+    )
+    hole_rows = list(
+        _none_for_nan(hole_scores[round_columns + ['Hole', 'Score', 'Par']])
+        .itertuples(index=False, name=None)
+    )
+    event_rows = list(_score_events(hole_scores)[round_columns + ['Hole', 'Kind']].itertuples(index=False, name=None))
+    streak_rows = list(
+        _under_par_streaks(hole_scores, round_columns)[round_columns + ['Hole', 'Length']]
+        .itertuples(index=False, name=None)
+    )
+    return round_rows, hole_rows, event_rows, streak_rows
+
+
+def ingest_rounds(
+    connection: sqlite3.Connection,
+    upload_id: int,
+    df: pd.DataFrame,
+    staged: Optional[StagedRounds] = None,
+) -> int:
+    """Insert the rounds and hole scores of a cleaned frame into the normalized tables.
+
+    Rows are bulk-loaded with `executemany` into temporary staging tables and
+    upserted with two set-based statements, all inside the caller's transaction.
+    A round already stored with the same values (same player, course, layout,
+    start date and version) is shared; a changed round is stored as a new
+    version, so uploads saved earlier keep their values. Every round is listed
+    in `upload_rounds` under `upload_id`. `staged` takes rows
+    already built by `stage_rounds`. Returns the number of player rounds ingested.
+    """
+    round_rows, hole_rows, event_rows, streak_rows = staged if staged is not None else stage_rounds(df)
+
+    # Plain execute() calls: executescript() would commit the caller's transaction
+    connection.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS staging_rounds (
+            player TEXT, course TEXT, layout TEXT, start_date TEXT, version INTEGER,
+            total INTEGER, plus_minus INTEGER, rating REAL, rating_estimated INTEGER
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS staging_hole_scores (
+            player TEXT, course TEXT, layout TEXT, start_date TEXT, version INTEGER,
+            hole INTEGER, score INTEGER, par INTEGER
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS staging_events (
+            player TEXT, course TEXT, layout TEXT, start_date TEXT, version INTEGER, hole INTEGER, kind TEXT
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS staging_streaks (
+            player TEXT, course TEXT, layout TEXT, start_date TEXT, version INTEGER,
+            start_hole INTEGER, length INTEGER
+        )
+        """
+    )
+    for table in ("staging_rounds", "staging_hole_scores", "staging_events", "staging_streaks"):
+        connection.execute(f"DELETE FROM {table}")
+    connection.executemany("INSERT INTO staging_rounds VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", round_rows)
+    connection.executemany("INSERT INTO staging_hole_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", hole_rows)
+    connection.executemany("INSERT INTO staging_events VALUES (?, ?, ?, ?, ?, ?, ?)", event_rows)
+    connection.executemany("INSERT INTO staging_streaks VALUES (?, ?, ?, ?, ?, ?, ?)", streak_rows)
+    # A version's values never change; only the latest upload containing it is recorded
+    connection.execute(
+        """
+        INSERT INTO rounds (
+            upload_id, player, course, layout, start_date, version, total, plus_minus, rating, rating_estimated
+        )
+        SELECT ?, player, course, layout, start_date, version, total, plus_minus, rating, rating_estimated
+        FROM staging_rounds WHERE true
+        ON CONFLICT (player, course, layout, start_date, version) DO UPDATE SET upload_id = excluded.upload_id
+        """,
+        (upload_id,),
+    )
+    connection.execute(
+        """
+        INSERT OR IGNORE INTO upload_rounds (upload_id, round_id)
+        SELECT ?, r.id
+        FROM staging_rounds AS s
+        JOIN rounds AS r
+            ON r.player = s.player AND r.course = s.course
+            AND r.layout = s.layout AND r.start_date = s.start_date AND r.version = s.version
+        """,
+        (upload_id,),
+    )
+    connection.execute(
+        """
+        INSERT INTO hole_scores (round_id, hole, score, par)
+        SELECT r.id, s.hole, s.score, s.par
+        FROM staging_hole_scores AS s
+        JOIN rounds AS r
+            ON r.player = s.player AND r.course = s.course
+            AND r.layout = s.layout AND r.start_date = s.start_date AND r.version = s.version
+        WHERE true
+        ON CONFLICT (round_id, hole) DO NOTHING
+        """
+    )
+    _replace_events(connection)
+    _update_records(connection, upload_id)
+    return len(round_rows)
+
+
+def _replace_events(connection: sqlite3.Connection) -> None:
+    """Replace the score events and streaks of every round in the staged batch."""
+    batch_rounds = """
+        SELECT r.id FROM staging_rounds AS s
+        JOIN rounds AS r
+            ON r.player = s.player AND r.course = s.course
+            AND r.layout = s.layout AND r.start_date = s.start_date AND r.version = s.version
+    """
+    connection.execute(f"DELETE FROM score_events WHERE round_id IN ({batch_rounds})")
+    connection.execute(f"DELETE FROM under_par_streaks WHERE round_id IN ({batch_rounds})")
+    connection.execute(
+        """
+        INSERT OR REPLACE INTO score_events (round_id, hole, kind, player, start_date)
+        SELECT r.id, s.hole, s.kind, r.player, r.start_date
+        FROM staging_events AS s
+        JOIN rounds AS r
+            ON r.player = s.player AND r.course = s.course
+            AND r.layout = s.layout AND r.start_date = s.start_date AND r.version = s.version
+        """
+    )
+    connection.execute(
+        """
+        INSERT OR REPLACE INTO under_par_streaks (round_id, start_hole, length, player, start_date)
+        SELECT r.id, s.start_hole, s.length, r.player, r.start_date
+        FROM staging_streaks AS s
+        JOIN rounds AS r
+            ON r.player = s.player AND r.course = s.course
+            AND r.layout = s.layout AND r.start_date = s.start_date AND r.version = s.version
+        """
+    )
+
+
+def _records_sql(round_ids: str) -> str:
+    """Best and worst round per (player, course, layout) among the rounds selected by `round_ids`.
+
+    Ties go to the round stored first.
+    """
+    return f"""
+        WITH batch AS (
+            SELECT id, player, course, layout, start_date, total, plus_minus, rating
+            FROM rounds
+            WHERE id IN ({round_ids}) AND total IS NOT NULL
+        ),
+        ranked AS (
+            SELECT *,
+                row_number() OVER (PARTITION BY player, course, layout ORDER BY total ASC, id) AS best_rank,
+                row_number() OVER (PARTITION BY player, course, layout ORDER BY total DESC, id) AS worst_rank
+            FROM batch
+        )
+        SELECT
+            b.player, b.course, b.layout,
+            b.id AS best_round_id, b.total AS best_total, b.plus_minus AS best_plus_minus,
+            b.rating AS best_rating, b.start_date AS best_date,
+            w.id AS worst_round_id, w.total AS worst_total, w.plus_minus AS worst_plus_minus,
+            w.rating AS worst_rating, w.start_date AS worst_date
+        FROM ranked AS b
+        JOIN ranked AS w
+            ON w.player = b.player AND w.course = b.course AND w.layout = b.layout AND w.worst_rank = 1
+        WHERE b.best_rank = 1
+    """
+
+
+def _hole_bests_sql(round_ids: str) -> str:
+    """Best score per (player, course, layout, hole) among the rounds selected by `round_ids`.
+
+    Aces and zero scores are ignored, like UdiscStats.get_best_score_per_hole.
+    """
+    return f"""
+        SELECT r.player, r.course, r.layout, h.hole, min(h.score) AS best_score
+        FROM rounds AS r
+        JOIN hole_scores AS h ON h.round_id = r.id
+        WHERE r.id IN ({round_ids}) AND h.score NOT IN (0, 1)
+        GROUP BY r.player, r.course, r.layout, h.hole
+    """
+
+
+def _update_records(connection: sqlite3.Connection, upload_id: int) -> None:
+    """Rebuild one upload's round_records and hole_bests from its rounds.
+
+    The versions of the rounds an upload contains never change, so its records
+    stay valid until the upload is deleted.
+    """
+    upload_round_ids = "SELECT round_id FROM upload_rounds WHERE upload_id = :upload_id"
+    connection.execute("DELETE FROM round_records WHERE upload_id = ?", (upload_id,))
+    connection.execute("DELETE FROM hole_bests WHERE upload_id = ?", (upload_id,))
+    connection.execute(
+        f"""
+        INSERT INTO round_records (
+            upload_id, player, course, layout,
+            best_round_id, best_total, best_plus_minus, best_rating, best_date,
+            worst_round_id, worst_total, worst_plus_minus, worst_rating, worst_date
+        )
+        SELECT :upload_id, * FROM ({_records_sql(upload_round_ids)})
+        """,
+        {"upload_id": upload_id},
+    )
+    connection.execute(
+        f"""
+        INSERT INTO hole_bests (upload_id, player, course, layout, hole, best_score)
+        SELECT :upload_id, * FROM ({_hole_bests_sql(upload_round_ids)})
+        """,
+        {"upload_id": upload_id},
+    )
+    connection.execute(
+        """
+        UPDATE round_records
+        SET theoretical_best = (
+            SELECT sum(h.best_score) FROM hole_bests AS h
+            WHERE h.upload_id = round_records.upload_id
+                AND h.player = round_records.player
+                AND h.course = round_records.course
+                AND h.layout = round_records.layout
+        )
+        WHERE upload_id = ?
+        """,
+        (upload_id,),
+    )
+
+
+def reindex_rounds() -> int:
+    """Rebuild the normalized round tables from every saved upload, oldest first."""
+    initialize_database()
+    with _connect() as connection:
+        for table in (
+            "under_par_streaks", "score_events", "hole_bests", "round_records", "upload_rounds", "hole_scores", "rounds"
+        ):
+            connection.execute(f"DELETE FROM {table}")
+
+    total = 0
+    for record in reversed(list_uploads()):
+        if not record.parquet_path.exists():
+            continue
+        df = pd.read_parquet(record.parquet_path)
+        with _connect() as connection:
+            total += ingest_rounds(connection, record.id, df)
+    return total
+
+
+def estimate_missing_ratings() -> int:
+    """Estimate blank ratings in uploads saved before ratings were estimated at ingest.
+
+    Their Parquet files are rewritten in place; call `reindex_rounds` afterwards
+    to refresh the round tables. Returns the number of uploads updated.
+    """
+    from analytics import estimate_round_ratings
+
+    updated = 0
+    for record in list_uploads():
+        if not record.parquet_path.exists():
+            continue
+        df = pd.read_parquet(record.parquet_path)
+        if 'RatingEstimated' in df.columns:
+            continue
+        _write_parquet(estimate_round_ratings(df), record.parquet_path)
+        updated += 1
+    return updated
+
+
+def _in_list(values: Sequence) -> str:
+    return ", ".join("?" * len(values))
+
+
+def _scoped_round_ids(upload_ids: Sequence[int], player: Optional[str] = None) -> Tuple[str, list]:
+    """Subquery (and parameters) selecting the ids of the rounds in the given uploads.
+
+    A round contained in several of the uploads is selected once, in the
+    version of the most recent of them, like UploadUnion. `player` narrows
+    the rounds looked at; callers still filter by player themselves.
+    """
+    if len(set(upload_ids)) == 1:
+        # An upload holds one version of each of its rounds
+        return "SELECT round_id FROM upload_rounds WHERE upload_id = ?", [upload_ids[0]]
+    sql = f"""
+        SELECT round_id FROM (
+            SELECT u.round_id, row_number() OVER (
+                PARTITION BY r.player, r.course, r.layout, r.start_date ORDER BY u.upload_id DESC
+            ) AS rank
+            FROM upload_rounds AS u
+            JOIN rounds AS r ON r.id = u.round_id
+            WHERE u.upload_id IN ({_in_list(upload_ids)}){" AND r.player = ?" if player is not None else ""}
+        )
+        WHERE rank = 1
+    """
+    return sql, [*upload_ids, *([player] if player is not None else [])]
+
+
+def query_rounds(
+    player: str, upload_ids: Sequence[int], course: Optional[str] = None, layout: Optional[str] = None
+) -> pd.DataFrame:
+    """Return a player's rounds in the given uploads, optionally on one course/layout, via the composite index.
+
+    A round contained in several of the uploads is returned once, with the
+    values of the most recent of them.
+    """
+    initialize_database()
+    scoped, scoped_params = _scoped_round_ids(upload_ids, player)
+    sql = f"SELECT * FROM rounds WHERE player = ? AND id IN ({scoped})"
+    params: list = [player, *scoped_params]
+    if course is not None:
+        sql += " AND course = ?"
+        params.append(course)
+        if layout is not None:
+            sql += " AND layout = ?"
+            params.append(layout)
+    with _connect() as connection:
+        return pd.read_sql_query(sql + " ORDER BY start_date", connection, params=params)
+
+
+def query_layout_records(player: str, upload_ids: Sequence[int]) -> pd.DataFrame:
+    """A player's best, worst and theoretical best round per layout over the given uploads.
+
+    Combines the uploads' stored records: the lowest and highest totals win
+    (ties to the round stored first), and the theoretical best sums the best
+    score per hole across them. When the uploads hold different versions of
+    one of the player's rounds, the records are computed from the rounds
+    instead, so only the most recent upload's version counts (like
+    `query_rounds`). One row per (course, layout), sorted by both.
+    """
+    initialize_database()
+    uploads = _in_list(upload_ids)
+    scoped, scoped_params = _scoped_round_ids(upload_ids, player)
+    with _connect() as connection:
+        superseded = connection.execute(
+            f"""
+            SELECT 1 FROM upload_rounds AS u
+            JOIN rounds AS r ON r.id = u.round_id
+            WHERE r.player = ? AND u.upload_id IN ({uploads}) AND u.round_id NOT IN ({scoped})
+            LIMIT 1
+            """,
+            [player, *upload_ids, *scoped_params],
+        ).fetchone() is not None
+        if superseded:
+            round_ids = f"SELECT id FROM rounds WHERE player = ? AND id IN ({scoped})"
+            params = [player, *scoped_params]
+            records = pd.read_sql_query(_records_sql(round_ids), connection, params=params)
+            theoretical = pd.read_sql_query(
+                f"""
+                SELECT course, layout, sum(best_score) AS theoretical_best
+                FROM ({_hole_bests_sql(round_ids)})
+                GROUP BY course, layout
                 """,
-                (
-                    filename,
-                    file_hash,
-                    uploaded_at,
-                    int(cleaned_df.shape[0]),
-                    int(cleaned_df.shape[1]),
-                ),
-            )
-            upload_id = int(cursor.lastrowid)
-            record = UploadRecord(
-                id=upload_id,
-                filename=filename,
-                file_hash=file_hash,
-                uploaded_at=uploaded_at,
-                num_rows=int(cleaned_df.shape[0]),
-                num_cols=int(cleaned_df.shape[1]),
+                connection,
+                params=params,
             )
         else:
-            record = _row_to_upload_record(existing)
+            records = pd.read_sql_query(
+                f"""
+                SELECT * FROM round_records
+                WHERE player = ? AND upload_id IN ({uploads}) AND best_total IS NOT NULL
+                """,
+                connection,
+                params=[player, *upload_ids],
+            )
+            theoretical = pd.read_sql_query(
+                f"""
+                SELECT course, layout, sum(best_score) AS theoretical_best
+                FROM (
+                    SELECT course, layout, hole, min(best_score) AS best_score FROM hole_bests
+                    WHERE player = ? AND upload_id IN ({uploads})
+                    GROUP BY course, layout, hole
+                )
+                GROUP BY course, layout
+                """,
+                connection,
+                params=[player, *upload_ids],
+            )
+
+    layout = ['course', 'layout']
+    best_columns = ['best_total', 'best_plus_minus', 'best_rating', 'best_date']
+    worst_columns = ['worst_total', 'worst_plus_minus', 'worst_rating', 'worst_date']
+    best = records.sort_values(['best_total', 'best_round_id']).drop_duplicates(layout)
+    worst = records.assign(order=-records['worst_total']).sort_values(['order', 'worst_round_id']).drop_duplicates(layout)
+    return (
+        best[layout + best_columns]
+        .merge(worst[layout + worst_columns], on=layout)
+        .merge(theoretical, on=layout, how='left')
+        .sort_values(layout, ignore_index=True)
+    )
+
+
+def _round_scope(
+    alias: str,
+    upload_ids: Sequence[int],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    player: Optional[str] = None,
+) -> Tuple[str, list]:
+    """SQL condition and parameters keeping rows of `alias` whose round is in the uploads and date window.
+
+    A semi-join on the uploads' rounds (see `_scoped_round_ids`), so a round
+    contained in several of the uploads is counted once. The window covers
+    whole days, like TimeIndex.
+    """
+    scoped, params = _scoped_round_ids(upload_ids, player)
+    sql = f"{alias}.round_id IN ({scoped})"
+    if start is not None:
+        sql += f" AND {alias}.start_date >= ?"
+        params.append(start.isoformat())
+    if end is not None:
+        sql += f" AND {alias}.start_date < ?"
+        params.append((end + timedelta(days=1)).isoformat())
+    return sql, params
+
+
+def query_score_events(
+    player: str,
+    upload_ids: Sequence[int],
+    kind: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> pd.DataFrame:
+    """A player's aces, eagles and birdies (or one kind of them) in the uploads and date window, newest first."""
+    initialize_database()
+    scope, params = _round_scope("e", upload_ids, start, end, player)
+    sql = f"""
+        SELECT e.round_id, e.start_date, r.course, r.layout, e.hole, e.kind
+        FROM score_events AS e
+        JOIN rounds AS r ON r.id = e.round_id
+        WHERE e.player = ? AND {scope}
+    """
+    params = [player, *params]
+    if kind is not None:
+        sql += " AND e.kind = ?"
+        params.append(kind)
+    with _connect() as connection:
+        return pd.read_sql_query(sql + " ORDER BY e.start_date DESC, e.hole", connection, params=params)
+
+
+def score_event_counts(
+    upload_ids: Sequence[int],
+    player: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> pd.DataFrame:
+    """Aces, eagles and birdies per player (columns ace, eagle, birdie) in the uploads and date window."""
+    initialize_database()
+    scope, params = _round_scope("e", upload_ids, start, end, player)
+    sql = f"SELECT e.player, e.kind, count(*) AS events FROM score_events AS e WHERE {scope}"
+    if player is not None:
+        sql += " AND e.player = ?"
+        params.append(player)
+    with _connect() as connection:
+        counts = pd.read_sql_query(sql + " GROUP BY e.player, e.kind", connection, params=params)
+    return counts.pivot(index='player', columns='kind', values='events').reindex(
+        columns=['ace', 'eagle', 'birdie']
+    ).fillna(0).astype(int)
+
+
+def longest_streaks(
+    upload_ids: Sequence[int],
+    player: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> pd.DataFrame:
+    """Longest run of consecutive under-par holes per player in the uploads and date window.
+
+    Returns where and when each streak started; ties go to the earliest round.
+    """
+    initialize_database()
+    scope, params = _round_scope("s", upload_ids, start, end, player)
+    if player is not None:
+        scope += " AND s.player = ?"
+        params.append(player)
+    sql = f"""
+        WITH ranked AS (
+            SELECT s.*, row_number() OVER (
+                PARTITION BY s.player ORDER BY s.length DESC, s.start_date
+            ) AS rank
+            FROM under_par_streaks AS s
+            WHERE {scope}
+        )
+        SELECT s.player, s.length, s.start_date, r.course, r.layout, s.start_hole
+        FROM ranked AS s
+        JOIN rounds AS r ON r.id = s.round_id
+        WHERE s.rank = 1
+        ORDER BY s.length DESC, s.player
+    """
+    with _connect() as connection:
+        return pd.read_sql_query(sql, connection, params=params)
+
+
+@_retry_when_locked
+def save_compacted_dataset(
+    filename: str, df: pd.DataFrame, merged_ids: Sequence[int] = ()
+) -> Tuple[UploadRecord, List[int], int]:
+    """Publish a dataset produced by compaction (no original CSV bytes exist).
+
+    In the same transaction that inserts the new record, whose rounds are
+    indexed like an upload's:
+    - regular uploads in `merged_ids` are marked as superseded by it,
+    - earlier compacted datasets are removed, and uploads they superseded point
+      at the new one instead,
+    - rounds of all of these point at the new record, and a pin moves to it.
+
+    The record is keyed by a hash of the DataFrame contents, so compacting an
+    unchanged set of uploads returns the existing record. Returns the record,
+    the ids of the compacted datasets removed and the bytes their files freed.
+    """
+    initialize_database()
+
+    content_hash = _compute_sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    with _connect() as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        record, created = _get_or_insert_upload(connection, filename, content_hash, df, kind="compacted")
+        if created:
+            ingest_rounds(connection, record.id, df)
+            _write_parquet(df, record.parquet_path, index=False)
+
+        retired = [
+            _row_to_upload_record(row)
+            for row in connection.execute(
+                "SELECT * FROM uploads WHERE kind = 'compacted' AND id <> ?", (record.id,)
+            ).fetchall()
+        ]
+        retired_ids = [old.id for old in retired]
+        replaced_ids = list({*merged_ids, *retired_ids} - {record.id})
+        if replaced_ids:
+            replaced = ", ".join("?" * len(replaced_ids))
+            connection.execute(
+                f"""
+                UPDATE uploads SET superseded_by = ?
+                WHERE kind = 'upload' AND (id IN ({replaced}) OR superseded_by IN ({replaced}))
+                """,
+                (record.id, *replaced_ids, *replaced_ids),
+            )
+            connection.execute(
+                f"UPDATE rounds SET upload_id = ? WHERE upload_id IN ({replaced})", (record.id, *replaced_ids)
+            )
+        if retired_ids:
+            retired_list = ", ".join("?" * len(retired_ids))
+            connection.execute(
+                f"""
+                UPDATE uploads SET pinned = 1
+                WHERE id = ? AND EXISTS (SELECT 1 FROM uploads WHERE pinned = 1 AND id IN ({retired_list}))
+                """,
+                (record.id, *retired_ids),
+            )
+            _forget_uploads(connection, retired_ids)
+            connection.execute(f"DELETE FROM uploads WHERE id IN ({retired_list})", tuple(retired_ids))
 
-    # Ensure files exist on disk (idempotent writes)
-    record.parquet_path.parent.mkdir(parents=True, exist_ok=True)
     if not record.parquet_path.exists():
-        cleaned_df.to_parquet(record.parquet_path)
-    if not record.csv_path.exists():
-        with open(record.csv_path, "wb") as csv_file:
-            csv_file.write(file_bytes)
+        _write_parquet(df, record.parquet_path, index=False)
+    # Files go after the commit, so no reader is pointed at a file being deleted
+    freed = sum(_delete_upload_files(old) for old in retired)
+    return get_upload(record.id), retired_ids, freed
+
+
+def _forget_uploads(connection: sqlite3.Connection, upload_ids: Sequence[int]) -> None:
+    """Drop the round memberships and records of uploads being deleted; the rounds themselves stay."""
+    for table in ("upload_rounds", "round_records", "hole_bests"):
+        connection.execute(f"DELETE FROM {table} WHERE upload_id IN ({_in_list(upload_ids)})", tuple(upload_ids))
+
+
+def _delete_upload_files(record: UploadRecord) -> int:
+    freed = 0
+    for path in (record.parquet_path, record.csv_path):
+        if path.exists():
+            freed += path.stat().st_size
+            path.unlink()
+    return freed
 
-    return record
+
+@_retry_when_locked
+def delete_upload(upload_id: int) -> int:
+    """Remove an upload record and its stored files. Returns the bytes freed.
+
+    A pin, and the rounds last seen in this upload, move to the compacted
+    dataset that superseded it. Original CSV blobs are left in place; see
+    `blob_store.collect_garbage`.
+    """
+    record = get_upload(upload_id)
+    if record is None:
+        return 0
+
+    # Remove the row first so no reader is pointed at files that are being deleted
+    with _connect() as connection:
+        if record.superseded_by is not None:
+            connection.execute(
+                "UPDATE uploads SET pinned = 1 WHERE id = ? AND ?", (record.superseded_by, record.pinned)
+            )
+            connection.execute(
+                "UPDATE rounds SET upload_id = ? WHERE upload_id = ?", (record.superseded_by, upload_id)
+            )
+        _forget_uploads(connection, [upload_id])
+        connection.execute("DELETE FROM uploads WHERE id = ?", (upload_id,))
+
+    return _delete_upload_files(record)
 
 
 def load_upload_df(upload_id: int) -> pd.DataFrame:
@@ -179,3 +1166,15 @@ def load_upload_df(upload_id: int) -> pd.DataFrame:
             f"Stored parquet not found at {record.parquet_path}. The upload may be corrupted."
         )
     return pd.read_parquet(record.parquet_path)
+
+
+def load_upload_bytes(upload_id: int) -> bytes:
+    """Return the original CSV bytes of a saved upload."""
+    record = get_upload(upload_id)
+    if record is None:
+        raise ValueError(f"No upload found with id {upload_id}")
+    if blob_exists(record.file_hash):
+        return read_blob(record.file_hash)
+    if record.csv_path.exists():
+        return record.csv_path.read_bytes()
+    raise FileNotFoundError(f"Original bytes for upload {upload_id} were not found.")
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import io
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+
+from analytics import course_performance_table, player_overall_summary
+
+# Default location for generated export files
+EXPORTS_DIR = Path("data/exports")
+
+
+@dataclass
+class PlayerSummaries:
+    overall: pd.DataFrame
+    courses: pd.DataFrame
+
+    def to_csv_bundle(self) -> bytes:
+        """Return a zip archive containing `overall.csv` and `courses.csv`."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr("overall.csv", self.overall.to_csv())
+            bundle.writestr("courses.csv", self.courses.to_csv())
+        return buffer.getvalue()
+
+    def to_table(self) -> pd.DataFrame:
+        """Both tables in one frame: a row per player and course, with the player's overall columns prefixed 'Overall '."""
+        return self.courses.join(self.overall.add_prefix("Overall "), on="PlayerName")
+
+
+def build_player_summaries(df: pd.DataFrame) -> PlayerSummaries:
+    """Compute overall and per-course summaries for every player in the dataset."""
+    return PlayerSummaries(
+        overall=player_overall_summary(df),
+        courses=course_performance_table(df),
+    )
+
+
+def export_player_summaries(
+    df: pd.DataFrame,
+    output_dir: Path = EXPORTS_DIR,
+    stem: str = "player_summaries",
+) -> Tuple[Path, Path]:
+    """Write all player summaries to disk.
+
+    - Saves both tables (one row per player and course, with the player's overall
+      summary alongside) to `<output_dir>/<stem>.parquet`.
+    - Saves `overall.csv` and `courses.csv` as a zip bundle to `<output_dir>/<stem>.zip`.
+    - Returns the (parquet_path, bundle_path) pair.
+    """
+    summaries = build_player_summaries(df)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    parquet_path = output_dir / f"{stem}.parquet"
+    bundle_path = output_dir / f"{stem}.zip"
+
+    summaries.to_table().to_parquet(parquet_path)
+    bundle_path.write_bytes(summaries.to_csv_bundle())
+
+    return parquet_path, bundle_path
@@ -1,12 +1,23 @@
 import streamlit as st
 import pandas as pd
-from io import StringIO
 from db import (
+    get_default_upload,
+    get_upload,
     initialize_database,
     list_uploads,
-    load_upload_df,
+    pin_upload,
     save_upload,
 )
+from analytics import dataset_summary
+from cleaning import clean_udisc_data
+from prefetch import PREFETCH_ON_START, load_dataset, prefetch, share_dataset
+from memory_budget import enforce_budgets
+from parquet_pages import PAGE_ROWS, frame_page, page_bounds, page_count, parquet_layout, read_page
+from result_cache import dataset_fingerprint
+from udisc_stats import TimeIndex
+from validation import ValidationError, read_validated_csv
+from date_window import active_dataset_hash, get_time_index
+from warmup import start_warmup
 
 # Configure the page
 st.set_page_config(
@@ -16,28 +27,79 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def clean_udisc_data(df):
-    """Clean and standardize UDisc CSV data."""
-    # Remove rows with all zeros in score columns (incomplete rounds)
-    df = df.loc[~(df.iloc[:, 3:] == 0).any(axis=1)]
-
-    # Standardize course names
-    course_name_mapping = {
-        'Indian Riffle Park/Kettering': 'Indian Riffle Disc Golf Course',
-        'Belmont Park': 'Belmont Park Disc Golf Course',
-        'Karohl Park': 'Karohl Park Disc Golf Course',
-        'Sycamore Trails Park': 'Reazin Family DGC @ Sycamore Trails Park',
-    }
-    df['CourseName'] = df['CourseName'].replace(course_name_mapping)
-
-    # Standardize layout names
-    layout_name_mapping = {
-        '2018 Redesign': 'Main 18 Hole Layout',
-        'Belmont': 'Short Tees with Long 16'
-    }
-    df['LayoutName'] = df['LayoutName'].replace(layout_name_mapping)
-    
-    return df
+def set_current_dataset(df, file_name, upload_id=None, source_upload_ids=None, prefetched=None):
+    """Make `df` the session's dataset and precompute page results in the background.
+    
+    `source_upload_ids` lists the saved uploads the dataset was built from, which
+    lets pages run their aggregations as SQL over the stored Parquet files.
+    `prefetched` (a PrefetchedDataset) supplies the hash, summary and time index
+    already computed by a background load.
+    """
+    st.session_state.df = df
+    st.session_state.uploaded_file_name = file_name
+    st.session_state.last_saved_upload_id = upload_id
+    st.session_state.source_upload_ids = source_upload_ids or ([upload_id] if upload_id is not None else None)
+    if prefetched is not None:
+        st.session_state.dataset_hash = prefetched.dataset_hash
+        st.session_state.dataset_summary = prefetched.summary
+        st.session_state.time_index = (prefetched.dataset_hash, prefetched.time_index)
+    else:
+        st.session_state.dataset_hash = dataset_fingerprint(df)
+        st.session_state.dataset_summary = dataset_summary(df)
+        # Sorted once here so the pages' date windows are binary searches
+        st.session_state.time_index = (st.session_state.dataset_hash, TimeIndex(df))
+    st.session_state.pop('course_view_cache', None)
+    st.session_state.pop('preview_page', None)
+    st.session_state.pop('active_date_window', None)
+    # A dataset chosen by the user replaces any background load still pending
+    st.session_state.prefetch_record = None
+    start_warmup(df, st.session_state.dataset_hash)
+
+def attach_prefetched_dataset():
+    """Attach the session's background-loaded dataset if it is ready.
+    
+    Returns True when the session's data changed (or the load failed) and the
+    page should rerun.
+    """
+    record = st.session_state.get('prefetch_record')
+    if record is None:
+        return False
+    future = prefetch(record)
+    if not future.done():
+        return False
+    
+    st.session_state.prefetch_record = None
+    try:
+        dataset = future.result()
+    except Exception as e:
+        st.session_state.prefetch_error = f"Couldn't load '{record.filename}' automatically: {e}"
+        return True
+    set_current_dataset(dataset.df, record.filename, record.id, prefetched=dataset)
+    return True
+
+@st.experimental_fragment(run_every=0.5)
+def display_prefetch_status():
+    """Poll the background load and rerun the page once the dataset is attached."""
+    record = st.session_state.get('prefetch_record')
+    if attach_prefetched_dataset():
+        st.rerun()
+    if record is not None:
+        st.info(f"⏳ Loading your {'pinned' if record.pinned else 'most recent'} dataset '{record.filename}' in the background...")
+
+def get_dataset_summary():
+    """Summary metrics of the current dataset, computed once and kept in the session."""
+    if st.session_state.get('dataset_summary') is None:
+        st.session_state.dataset_summary = dataset_summary(st.session_state.df)
+    return st.session_state.dataset_summary
+
+def display_dataset_metrics():
+    """Show the headline metrics of the current dataset."""
+    summary = get_dataset_summary()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Rounds", summary['total_rounds'])
+    col2.metric("Players", summary['players'])
+    col3.metric("Courses", summary['courses'])
+    col4.metric("Date Range", summary['date_range'])
 
 def display_upload_instructions():
     """Display instructions for exporting CSV from UDisc."""
@@ -63,7 +125,7 @@ def display_saved_uploads():
         
         # Create readable labels for saved uploads
         option_labels = [
-            f"ID {rec.id}: {rec.filename} ({rec.num_rows} rounds, {rec.uploaded_at[:10]})"
+            f"{'📌 ' if rec.pinned else ''}ID {rec.id}: {rec.filename} ({rec.num_rows} rounds, {rec.uploaded_at[:10]})"
             for rec in saved_uploads
         ]
         
@@ -81,16 +143,68 @@ def display_saved_uploads():
             selected_record = saved_uploads[selected_index]
             
             try:
-                df_loaded = load_upload_df(selected_record.id)
-                st.session_state.df = df_loaded
-                st.session_state.uploaded_file_name = selected_record.filename
-                st.session_state.last_saved_upload_id = selected_record.id
+                # Through the prefetch cache, so sessions loading the same upload share one frame
+                dataset = prefetch(selected_record).result()
+                set_current_dataset(dataset.df, selected_record.filename, selected_record.id, prefetched=dataset)
                 
                 st.success(f"✅ Loaded '{selected_record.filename}' ({selected_record.num_rows} rounds)")
                 st.rerun()
                 
             except Exception as e:
                 st.error(f"❌ Failed to load dataset: {e}")
+        
+        # The pinned dataset is loaded automatically when a new session starts
+        selected_record = saved_uploads[option_labels.index(selected_label)]
+        if selected_record.pinned:
+            if col2.button("📌 Unpin", help="New sessions will start with the most recent dataset"):
+                pin_upload(None)
+                st.rerun()
+        elif col2.button("📌 Pin as Default", help="New sessions will start with this dataset"):
+            pin_upload(selected_record.id)
+            st.rerun()
+        
+        # Combine several saved uploads (e.g. exports from different club members)
+        if len(saved_uploads) > 1:
+            st.markdown("**🔗 Combine several datasets**")
+            combined_labels = st.multiselect(
+                "Choose datasets to combine (duplicate rounds are counted once):",
+                option_labels,
+                key="combined_upload_selector"
+            )
+            
+            if st.button("📥 Load Combined View", disabled=len(combined_labels) < 2):
+                selected_records = [saved_uploads[option_labels.index(label)] for label in combined_labels]
+                
+                try:
+                    # Through the prefetch cache, so sessions combining the same uploads share one frame
+                    dataset = load_dataset(selected_records).result()
+                    combined_name = " + ".join(rec.filename for rec in selected_records)
+                    set_current_dataset(
+                        dataset.df, combined_name,
+                        source_upload_ids=[rec.id for rec in selected_records], prefetched=dataset
+                    )
+                    
+                    st.success(f"✅ Combined {len(selected_records)} datasets ({len(dataset.df)} rounds)")
+                    st.rerun()
+                    
+                except Exception as e:
+                    st.error(f"❌ Failed to combine datasets: {e}")
+
+def display_validation_report(report, expanded=False):
+    """Show the column statistics and row anomalies found while reading a CSV."""
+    anomaly_total = sum(report['anomaly_counts'].values())
+    title = f"🧪 Validation report ({report['rows']} rows, {anomaly_total} anomalies, {report['elapsed_ms']:.0f} ms)"
+    with st.expander(title, expanded=expanded):
+        for error in report['errors']:
+            st.error(error)
+        if report['anomaly_counts']:
+            st.write("**Anomalies:** " + ", ".join(
+                f"{kind.replace('_', ' ')} × {count}" for kind, count in report['anomaly_counts'].items()
+            ))
+            st.dataframe(pd.DataFrame(report['anomalies']), use_container_width=True, hide_index=True)
+        columns = pd.DataFrame.from_dict(report['columns'], orient='index')
+        columns.index.name = 'Column'
+        st.dataframe(columns, use_container_width=True)
 
 def handle_file_upload():
     """Handle CSV file upload and processing."""
@@ -113,31 +227,37 @@ def handle_file_upload():
     try:
         with st.spinner("Processing CSV file..."):
             bytes_data = uploaded_file.getvalue()
-            stringio = StringIO(bytes_data.decode('utf-8'))
-            df = pd.read_csv(stringio)
+            # Header and schema are checked before the rows are parsed; bad files stop early
+            df, report = read_validated_csv(bytes_data)
+            report = report.to_dict()
             
             # Clean and standardize the data
             df = clean_udisc_data(df)
             
-            # Store in session state
-            st.session_state.df = df
-            st.session_state.uploaded_file_name = uploaded_file.name
-            
             # Save to database for future use
             try:
-                record = save_upload(uploaded_file.name, bytes_data, df)
-                st.session_state.last_saved_upload_id = record.id
+                record = save_upload(uploaded_file.name, bytes_data, df, validation_report=report)
+                # Shared with other sessions; an upload already loaded elsewhere is reused
+                dataset = share_dataset(record, df)
+                set_current_dataset(dataset.df, uploaded_file.name, record.id, prefetched=dataset)
                 
                 st.success(
                     f"✅ Successfully processed '{uploaded_file.name}'\n\n"
                     f"📊 **{record.num_rows}** rounds loaded\n\n"
                     f"💾 Saved as dataset ID {record.id}"
                 )
+                display_validation_report(report)
                 
             except Exception as e:
+                set_current_dataset(df, uploaded_file.name)
                 st.warning(f"⚠️ File processed but couldn't save for later use: {e}")
                 st.success(f"✅ Successfully processed '{uploaded_file.name}'")
     
+    except ValidationError as e:
+        st.error(f"❌ '{uploaded_file.name}' is not a valid UDisc CSV export: {e}")
+        # Rejected before anything was loaded or saved, so the current dataset stays
+        display_validation_report(e.report.to_dict(), expanded=True)
+    
     except Exception as e:
         st.error(f"❌ Error processing file: {e}")
         st.error("Please ensure you've uploaded a valid UDisc CSV file.")
@@ -145,6 +265,47 @@ def handle_file_upload():
         # Clear potentially corrupted data
         st.session_state.df = None
         st.session_state.uploaded_file_name = None
+        st.session_state.dataset_hash = None
+        st.session_state.source_upload_ids = None
+        st.session_state.dataset_summary = None
+
+def _preview_parquet_path():
+    """Stored Parquet file holding exactly the session's dataset, if there is one."""
+    upload_id = st.session_state.get('last_saved_upload_id')
+    if upload_id is None or st.session_state.get('source_upload_ids') != [upload_id]:
+        return None
+    record = get_upload(upload_id)
+    if record is None or not record.parquet_path.exists():
+        return None
+    if parquet_layout(record.parquet_path).num_rows != len(st.session_state.df):
+        return None
+    return record.parquet_path
+
+def display_paged_preview():
+    """Show one page of the dataset, read from its Parquet row groups when it is a saved upload."""
+    total_rows = len(st.session_state.df)
+    pages = page_count(total_rows, PAGE_ROWS)
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key="preview_page") - 1
+    start, end = page_bounds(total_rows, page, PAGE_ROWS)
+    
+    parquet_path = _preview_parquet_path()
+    rows = read_page(parquet_path, page, PAGE_ROWS) if parquet_path else frame_page(st.session_state.df, page, PAGE_ROWS)
+    st.dataframe(rows, use_container_width=True, height=300)
+    st.caption(f"Rows {start + 1:,}–{end:,} of {total_rows:,}")
+    
+    if parquet_path:
+        with st.expander("📋 Column Summary", expanded=False):
+            st.dataframe(parquet_layout(parquet_path).column_summary, use_container_width=True, hide_index=True)
+
+def _export_frame():
+    """Rounds to export, in the date range chosen on the analysis pages, and their cache key."""
+    df = st.session_state.df
+    if st.session_state.get('dataset_hash') is None:
+        st.session_state.dataset_hash = dataset_fingerprint(df)
+    window = st.session_state.get('active_date_window')
+    if window is not None:
+        df = get_time_index(df).window(df, *window)
+    return df, active_dataset_hash()
 
 def display_data_preview():
     """Display preview of currently loaded data."""
@@ -154,32 +315,76 @@ def display_data_preview():
     st.subheader("📊 Data Preview")
     
     # Show summary statistics
-    col1, col2, col3, col4 = st.columns(4)
+    display_dataset_metrics()
     
-    total_rounds = len(st.session_state.df)
-    unique_players = len(st.session_state.df['PlayerName'].unique()) - 1  # Exclude 'Par'
-    unique_courses = len(st.session_state.df['CourseName'].unique())
-    date_range = f"{st.session_state.df['StartDate'].min()[:10]} to {st.session_state.df['StartDate'].max()[:10]}"
-    
-    col1.metric("Total Rounds", total_rounds)
-    col2.metric("Players", unique_players)
-    col3.metric("Courses", unique_courses)
-    col4.metric("Date Range", date_range)
-    
-    # Show data preview
-    st.dataframe(
-        st.session_state.df.head(10),
-        use_container_width=True,
-        height=300
-    )
+    # Show data preview, one page at a time
+    display_paged_preview()
+    
+    # Bulk export of every player's summaries (computed once per dataset and date range)
+    export_df, export_key = _export_frame()
+    window = st.session_state.get('active_date_window')
+    if window is not None:
+        st.caption(f"The export covers rounds from {window[0]:%b %d, %Y} to {window[1]:%b %d, %Y}, the date range chosen on the analysis pages.")
+    export_bundle = st.session_state.get('export_bundle')
+    if export_bundle is None or export_bundle[0] != export_key:
+        if st.button("📦 Prepare Player Summaries Export"):
+            from exports import build_player_summaries
+            bundle_bytes = build_player_summaries(export_df).to_csv_bundle()
+            st.session_state.export_bundle = (export_key, bundle_bytes)
+            st.rerun()
+    else:
+        st.download_button(
+            "📦 Download All Player Summaries (CSV bundle)",
+            data=export_bundle[1],
+            file_name="player_summaries.zip",
+            mime="application/zip",
+        )
     
     # Clear data button
     if st.button("🗑️ Clear Data", type="secondary"):
         st.session_state.df = None
         st.session_state.uploaded_file_name = None
+        st.session_state.dataset_hash = None
+        st.session_state.source_upload_ids = None
+        st.session_state.dataset_summary = None
+        st.session_state.time_index = None
+        st.session_state.prefetch_record = None
+        st.session_state.pop('course_view_cache', None)
         st.success("Data cleared successfully!")
         st.rerun()
 
+def _format_bytes(size):
+    return f"{size / (1024 * 1024):,.1f} MB"
+
+def display_memory_usage(usage):
+    """Show what this session holds against its budget, and the process total."""
+    if not usage:
+        return
+    
+    with st.expander("🧠 Memory Usage", expanded=False):
+        session = usage['session']
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("This Session", _format_bytes(session.total),
+                      help=f"Budget {_format_bytes(usage['session_budget'])}")
+        with col2:
+            st.metric("All Sessions", _format_bytes(usage['process_bytes']),
+                      help=f"Budget {_format_bytes(usage['global_budget'])}; shared data counted once")
+        with col3:
+            st.metric("Active Sessions", usage['sessions'])
+        
+        entries = pd.DataFrame(
+            sorted(session.entries.items(), key=lambda item: item[1], reverse=True),
+            columns=['Entry', 'Bytes']
+        )
+        st.dataframe(entries[entries['Bytes'] > 0], use_container_width=True, hide_index=True)
+        shared = usage['process_bytes_unshared'] - usage['process_bytes']
+        if shared > 0:
+            st.caption(f"{_format_bytes(shared)} saved by sessions sharing the same loaded datasets.")
+        if usage['evicted']:
+            st.caption(f"Freed {_format_bytes(usage['evicted'])} of cached views, exports and preloaded datasets to stay within budget; they are rebuilt when needed.")
+        st.caption("Budgets bound data that can be rebuilt; loaded datasets are counted but never dropped.")
+
 # Initialize session state
 if 'df' not in st.session_state:
     st.session_state.df = None
@@ -187,25 +392,38 @@ if 'uploaded_file_name' not in st.session_state:
     st.session_state.uploaded_file_name = None
 if 'last_saved_upload_id' not in st.session_state:
     st.session_state.last_saved_upload_id = None
+if 'dataset_hash' not in st.session_state:
+    st.session_state.dataset_hash = None
+if 'source_upload_ids' not in st.session_state:
+    st.session_state.source_upload_ids = None
+if 'dataset_summary' not in st.session_state:
+    st.session_state.dataset_summary = None
 
-# Initialize database
+# Initialize database (only does work on the first run in this process)
 initialize_database()
 
+# A new session starts loading its default dataset in the background
+if 'prefetch_record' not in st.session_state:
+    st.session_state.prefetch_record = None
+    if PREFETCH_ON_START and st.session_state.df is None:
+        default_record = get_default_upload()
+        if default_record is not None:
+            prefetch(default_record)
+            st.session_state.prefetch_record = default_record
+# Already loaded (e.g. by another session): attach before rendering anything
+attach_prefetched_dataset()
+
 st.title("🥏 UDisc Stats App")
 
+if st.session_state.get('prefetch_error'):
+    st.warning(f"⚠️ {st.session_state.pop('prefetch_error')}")
+
 # Show current data status
-if st.session_state.df is not None:
+if st.session_state.df is None and st.session_state.prefetch_record is not None:
+    display_prefetch_status()
+elif st.session_state.df is not None:
     st.success(f"✅ **Current Dataset:** {st.session_state.uploaded_file_name}")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_rounds = len(st.session_state.df)
-    unique_players = len(st.session_state.df['PlayerName'].unique()) - 1  # Exclude 'Par'
-    unique_courses = len(st.session_state.df['CourseName'].unique())
-    
-    col1.metric("Total Rounds", total_rounds)
-    col2.metric("Players", unique_players)
-    col3.metric("Courses", unique_courses)
-    col4.metric("Date Range", f"{st.session_state.df['StartDate'].min()[:10]} to {st.session_state.df['StartDate'].max()[:10]}")
+    display_dataset_metrics()
     
     st.info("🎯 Use the sidebar to navigate to analysis pages, or upload a new file below to replace the current data.")
 
@@ -219,6 +437,7 @@ you'll need to manually export your scorecard data as CSV files from the UDisc m
 - **🎯 Hole Breakdown**: Complete course analysis with player comparisons, heatmaps, and detailed hole statistics
 - **👤 Player Statistics**: Comprehensive individual player analytics and trends
 - **⛳ Course Difficulty**: Personalized course difficulty rankings based on your performance
+- **🤝 Head to Head**: Win/loss/tie records and per-hole stroke differentials against players you shared a card with
 """)
 
 # Display upload instructions
@@ -234,5 +453,8 @@ handle_file_upload()
 # Display data preview if available
 if st.session_state.df is not None:
     display_data_preview()
-else:
-    st.info("👆 Upload a CSV file to begin analyzing your disc golf data!")
\ No newline at end of file
+elif st.session_state.prefetch_record is None:
+    st.info("👆 Upload a CSV file to begin analyzing your disc golf data!")
+
+# Drop rebuildable session data when over the memory budgets
+display_memory_usage(enforce_budgets())
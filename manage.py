@@ -0,0 +1,200 @@
+"""Command line maintenance tasks for the UDisc Stats data directory.
+
+Usage:
+    python manage.py export [--upload-id ID] [--output-dir DIR]
+    python manage.py original [--upload-id ID] [--output FILE]
+    python manage.py compact [--retention-days N] [--keep-latest N] [--dry-run]
+    python manage.py warmup [--upload-id ID] [--workers N]
+    python manage.py reindex
+    python manage.py estimate-ratings
+    python manage.py bench-startup [--runs N] [--reruns N] [--upload-id ID]
+    python manage.py stress-uploads [--uploaders N] [--uploads-each N] [--upload-id ID]
+    python manage.py load-test [--sessions N] [--concurrency N] [--upload-id ID]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from compaction import DEFAULT_KEEP_LATEST, DEFAULT_RETENTION_DAYS, compact_uploads
+from db import estimate_missing_ratings, list_uploads, load_upload_bytes, load_upload_df, reindex_rounds
+from exports import EXPORTS_DIR, export_player_summaries
+from warmup import warm_dataset
+
+
+def _resolve_upload_id(upload_id):
+    """Default to the most recent saved upload when no id is given."""
+    if upload_id is not None:
+        return upload_id
+    uploads = list_uploads()
+    if not uploads:
+        raise SystemExit("No saved uploads found. Upload a CSV in the app first.")
+    return uploads[0].id
+
+
+def _export(args: argparse.Namespace) -> None:
+    upload_id = _resolve_upload_id(args.upload_id)
+    df = load_upload_df(upload_id)
+    for path in export_player_summaries(df, output_dir=args.output_dir, stem=f"player_summaries_{upload_id}"):
+        print(f"Wrote {path}")
+
+
+def _original(args: argparse.Namespace) -> None:
+    data = load_upload_bytes(_resolve_upload_id(args.upload_id))
+    if args.output is None:
+        sys.stdout.buffer.write(data)
+        return
+    args.output.write_bytes(data)
+    print(f"Wrote {args.output} ({len(data):,} bytes)")
+
+
+def _compact(args: argparse.Namespace) -> None:
+    result = compact_uploads(
+        retention_days=args.retention_days,
+        keep_latest=args.keep_latest,
+        dry_run=args.dry_run,
+    )
+    if result.canonical is not None:
+        print(f"Canonical dataset: ID {result.canonical.id} ({result.canonical.num_rows} rounds)")
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"{action} {len(result.removed_upload_ids)} superseded uploads: {result.removed_upload_ids}")
+    if not args.dry_run:
+        print(f"Freed {result.freed_bytes / 1024:.1f} KiB")
+
+
+def _warmup(args: argparse.Namespace) -> None:
+    upload_id = _resolve_upload_id(args.upload_id)
+    computed = warm_dataset(load_upload_df(upload_id), max_workers=args.workers)
+    print(f"Precomputed {computed} results for upload {upload_id}")
+
+
+def _reindex(args: argparse.Namespace) -> None:
+    print(f"Indexed {reindex_rounds()} rounds from saved uploads")
+
+
+def _estimate_ratings(args: argparse.Namespace) -> None:
+    updated = estimate_missing_ratings()
+    print(f"Estimated missing ratings in {updated} saved uploads")
+    if updated:
+        print(f"Indexed {reindex_rounds()} rounds from saved uploads")
+
+
+def _bench_startup(args: argparse.Namespace) -> None:
+    from benchmarks import bench_startup
+
+    results = bench_startup(runs=args.runs, reruns=args.reruns, upload_id=args.upload_id)
+    for name, summary in results.items():
+        print(
+            f"{name:<11} runs={summary['runs']:<3} median={summary['median_ms']:.0f} ms  "
+            f"p95={summary['p95_ms']:.0f} ms  max={summary['max_ms']:.0f} ms"
+        )
+
+
+def _stress_uploads(args: argparse.Namespace) -> None:
+    from benchmarks import stress_uploads
+
+    upload_id = _resolve_upload_id(args.upload_id)
+    result = stress_uploads(
+        load_upload_df(upload_id), uploaders=args.uploaders, uploads_each=args.uploads_each
+    )
+    latency = result["latency"]
+    print(
+        f"{result['uploads']} uploads in {result['seconds']:.1f} s "
+        f"({result['uploads_per_second']:.1f}/s), latency median={latency['median_ms']:.0f} ms "
+        f"p95={latency['p95_ms']:.0f} ms max={latency['max_ms']:.0f} ms"
+    )
+    for problem in result["problems"]:
+        print(f"PROBLEM: {problem}")
+    if result["problems"]:
+        raise SystemExit(1)
+    print("All stored uploads read back intact")
+
+
+def _load_test(args: argparse.Namespace) -> None:
+    from benchmarks import load_test
+
+    upload_id = _resolve_upload_id(args.upload_id)
+    result = load_test(load_upload_bytes(upload_id), sessions=args.sessions, concurrency=args.concurrency)
+    print(
+        f"{result['sessions']} sessions ({result['concurrency']} at a time) in {result['seconds']:.1f} s: "
+        f"{result['sessions_per_second']:.2f} sessions/s, {result['script_runs_per_second']:.1f} script runs/s"
+    )
+    for step, latency in result["latency"].items():
+        print(
+            f"  {step:<18} runs={latency['runs']:<4} median={latency['median_ms']:.0f} ms "
+            f"p95={latency['p95_ms']:.0f} ms max={latency['max_ms']:.0f} ms"
+        )
+    print(
+        f"Memory: peak worker {result['peak_worker_rss_mb']:.0f} MB, "
+        f"median growth per session {result['median_session_growth_mb']:+.0f} MB"
+    )
+    for error in result["errors"]:
+        print(f"ERROR: {error}")
+    if result["errors"]:
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export summaries for every player")
+    export_parser.add_argument("--upload-id", type=int, default=None, help="Saved upload to export (default: latest)")
+    export_parser.add_argument("--output-dir", type=Path, default=EXPORTS_DIR)
+    export_parser.set_defaults(func=_export)
+
+    original_parser = subparsers.add_parser("original", help="Write the original CSV of a saved upload")
+    original_parser.add_argument("--upload-id", type=int, default=None, help="Saved upload (default: latest)")
+    original_parser.add_argument("--output", type=Path, default=None, help="Output file (default: stdout)")
+    original_parser.set_defaults(func=_original)
+
+    compact_parser = subparsers.add_parser("compact", help="Merge uploads and apply the retention policy")
+    compact_parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS)
+    compact_parser.add_argument("--keep-latest", type=int, default=DEFAULT_KEEP_LATEST)
+    compact_parser.add_argument("--dry-run", action="store_true", help="Report what would be removed")
+    compact_parser.set_defaults(func=_compact)
+
+    warmup_parser = subparsers.add_parser("warmup", help="Precompute every page's results for an upload")
+    warmup_parser.add_argument("--upload-id", type=int, default=None, help="Saved upload to warm (default: latest)")
+    warmup_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: WARMUP_WORKERS)")
+    warmup_parser.set_defaults(func=_warmup)
+
+    reindex_parser = subparsers.add_parser("reindex", help="Rebuild the normalized rounds tables")
+    reindex_parser.set_defaults(func=_reindex)
+
+    estimate_parser = subparsers.add_parser(
+        "estimate-ratings", help="Fill blank round ratings in uploads saved before estimates were added"
+    )
+    estimate_parser.set_defaults(func=_estimate_ratings)
+
+    bench_parser = subparsers.add_parser("bench-startup", help="Time home page cold start and reruns")
+    bench_parser.add_argument("--runs", type=int, default=5, help="Cold starts, each in a new process")
+    bench_parser.add_argument("--reruns", type=int, default=20, help="Reruns with a dataset loaded")
+    bench_parser.add_argument("--upload-id", type=int, default=None, help="Dataset for reruns (default: latest)")
+    bench_parser.set_defaults(func=_bench_startup)
+
+    stress_parser = subparsers.add_parser(
+        "stress-uploads", help="Save uploads from many processes at once into a scratch directory"
+    )
+    stress_parser.add_argument("--uploaders", type=int, default=8, help="Concurrent uploader processes")
+    stress_parser.add_argument("--uploads-each", type=int, default=10, help="Uploads per process")
+    stress_parser.add_argument("--upload-id", type=int, default=None, help="Source dataset (default: latest)")
+    stress_parser.set_defaults(func=_stress_uploads)
+
+    load_parser = subparsers.add_parser(
+        "load-test", help="Run simulated user sessions concurrently against a scratch data directory"
+    )
+    load_parser.add_argument("--sessions", type=int, default=8, help="Simulated user sessions")
+    load_parser.add_argument("--concurrency", type=int, default=4, help="Sessions running at the same time")
+    load_parser.add_argument(
+        "--upload-id", type=int, default=None, help="Upload whose original CSV is replayed (default: latest)"
+    )
+    load_parser.set_defaults(func=_load_test)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Memory accounting for sessions, with per-session and process-wide budgets.
+
+Every page run measures what its own session state holds and reports it to the
+process. Objects referenced by several sessions (e.g. a saved dataset loaded
+through the shared prefetch cache) are counted once in the process total.
+
+A run only ever changes its own session's state. Data that can be rebuilt is
+dropped: cached course views first (oldest first), then the export bundle and
+the time index. When the process total is over budget, the datasets the
+prefetch cache keeps for future sessions are released first; if that is not
+enough, every session gives up its rebuildable data on its next run. The datasets sessions have loaded are counted
+but never dropped, so the budgets bound rebuildable data, not the whole total.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MB = 1024 * 1024
+# Set UDISC_SESSION_MEMORY_MB / UDISC_GLOBAL_MEMORY_MB to change the budgets
+SESSION_BUDGET_BYTES = int(os.environ.get("UDISC_SESSION_MEMORY_MB", 256)) * MB
+GLOBAL_BUDGET_BYTES = int(os.environ.get("UDISC_GLOBAL_MEMORY_MB", 2048)) * MB
+# Reports of sessions that have not run for this long no longer count
+REPORT_TTL_SECONDS = 30 * 60
+
+# Session state entries that can be rebuilt, in the order they are given up
+DERIVED_KEYS = ['course_view_cache', 'export_bundle', 'time_index']
+
+_lock = threading.Lock()
+# Live session states by session id, only to notice closed sessions; never modified here
+_sessions: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+# Latest usage reported by each session's own run
+_reports: Dict[str, Tuple[float, "SessionUsage"]] = {}
+# Measured sizes by object id, kept while the object is alive
+_sizes: Dict[int, Tuple[weakref.ref, int]] = {}
+
+
+def object_bytes(value: Any) -> int:
+    """Approximate bytes held by a value: exact for frames and arrays, recursive for containers.
+
+    Sizes of frames, arrays and figures are memoized per object, since they are
+    measured again on every run.
+    """
+    cached = _sizes.get(id(value))
+    if cached is not None and cached[0]() is value:
+        return cached[1]
+
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        size = int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) \
+            else int(value.memory_usage(deep=True))
+    elif isinstance(value, np.ndarray):
+        size = value.nbytes
+    elif isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    elif isinstance(value, dict):
+        return sys.getsizeof(value) + sum(object_bytes(k) + object_bytes(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(object_bytes(item) for item in value)
+    elif hasattr(value, 'to_plotly_json'):
+        size = object_bytes(value.to_plotly_json())
+    elif hasattr(value, '__dict__'):
+        size = sys.getsizeof(value) + object_bytes(vars(value))
+    else:
+        return sys.getsizeof(value)
+
+    try:
+        _sizes[id(value)] = (weakref.ref(value, lambda _, key=id(value): _sizes.pop(key, None)), size)
+    except TypeError:  # Not weak-referenceable; measured again next time
+        pass
+    return size
+
+
+def _held_objects(value: Any) -> List[Any]:
+    """The large objects a session state entry refers to, for counting shared ones once."""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, bytes)):
+        return [value]
+    if isinstance(value, dict):
+        return [item for entry in value.values() for item in _held_objects(entry)]
+    if isinstance(value, (list, tuple)):
+        return [item for entry in value for item in _held_objects(entry)]
+    return [value] if hasattr(value, '__dict__') else []
+
+
+@dataclass
+class SessionUsage:
+    session_id: str
+    # Bytes per session state entry
+    entries: Dict[str, int] = field(default_factory=dict)
+    # Bytes of the large objects the entries refer to, by object id
+    held: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.entries.values())
+
+    @property
+    def derived(self) -> int:
+        return sum(size for key, size in self.entries.items() if key in DERIVED_KEYS)
+
+
+def session_usage(session_id: str, state: Any) -> SessionUsage:
+    """Bytes held by every entry of the running session's state (`st.session_state`)."""
+    usage = SessionUsage(session_id)
+    for key in list(state.keys()):
+        try:
+            value = state[key]
+        except KeyError:  # Removed by a widget callback meanwhile
+            continue
+        usage.entries[key] = object_bytes(value)
+        for item in _held_objects(value):
+            usage.held[id(item)] = object_bytes(item)
+    return usage
+
+
+def process_usage() -> Tuple[int, int, List[SessionUsage]]:
+    """Bytes held by all live sessions and the prefetch cache, without and with double-counting.
+
+    Uses the usage each session reported on its last run. Returns (unique
+    bytes, summed bytes, per-session usage).
+    """
+    from prefetch import loaded_datasets
+
+    now = time.time()
+    with _lock:
+        for session_id, (reported_at, _) in list(_reports.items()):
+            if session_id not in _sessions or now - reported_at > REPORT_TTL_SECONDS:
+                del _reports[session_id]
+        usages = [usage for _, usage in _reports.values()]
+
+    seen, shared = set(), 0
+    for usage in usages:
+        for object_id, size in usage.held.items():
+            if object_id in seen:
+                shared += size
+            seen.add(object_id)
+    summed = sum(usage.total for usage in usages)
+    # Datasets kept only by the cache, for sessions that have not opened them yet
+    cached = sum(object_bytes(dataset.df) for dataset in loaded_datasets() if id(dataset.df) not in seen)
+    return summed - shared + cached, summed + cached, usages
+
+
+def _evict(state: Any, bytes_to_free: int) -> int:
+    """Drop derived entries of the running session until `bytes_to_free` is reached; returns bytes freed."""
+    freed = 0
+    for key in DERIVED_KEYS:
+        if freed >= bytes_to_free:
+            break
+        try:
+            value = state[key]
+        except KeyError:
+            continue
+        if key == 'course_view_cache' and value:
+            # Oldest views first; the cache is an OrderedDict in LRU order
+            while value and freed < bytes_to_free:
+                _, view = value.popitem(last=False)
+                freed += object_bytes(view)
+        else:
+            freed += object_bytes(value)
+            del state[key]
+    return freed
+
+
+def _evict_prefetched(usages: List[SessionUsage]) -> int:
+    """Release the datasets the prefetch cache keeps; returns the bytes no session still refers to."""
+    from prefetch import drop_loaded
+
+    in_use = {object_id for usage in usages for object_id in usage.held}
+    return sum(object_bytes(dataset.df) for dataset in drop_loaded() if id(dataset.df) not in in_use)
+
+
+def enforce_budgets(
+    session_budget: Optional[int] = None, global_budget: Optional[int] = None
+) -> Dict[str, Any]:
+    """Measure and report the running session, then evict derived data over the budgets.
+
+    The running session trims its own derived data when it is over its budget,
+    or when the process is still over budget after the prefetched datasets
+    were released. Other sessions are never touched; they trim on their next run.
+    Returns the figures for display.
+    """
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    session_budget = SESSION_BUDGET_BYTES if session_budget is None else session_budget
+    global_budget = GLOBAL_BUDGET_BYTES if global_budget is None else global_budget
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return {}
+
+    def report() -> SessionUsage:
+        usage = session_usage(ctx.session_id, st.session_state)
+        with _lock:
+            _sessions[ctx.session_id] = ctx.session_state
+            _reports[ctx.session_id] = (time.time(), usage)
+        return usage
+
+    usage = report()
+    evicted = 0
+    if usage.total > session_budget:
+        evicted += _evict(st.session_state, usage.total - session_budget)
+        usage = report()
+
+    unique, summed, usages = process_usage()
+    if unique > global_budget:
+        evicted += _evict_prefetched(usages)
+        unique, summed, usages = process_usage()
+    if unique > global_budget and usage.derived:
+        evicted += _evict(st.session_state, unique - global_budget)
+        usage = report()
+        unique, summed, usages = process_usage()
+
+    return {
+        'session': usage,
+        'session_budget': session_budget,
+        'process_bytes': unique,
+        'process_bytes_unshared': summed,
+        'global_budget': global_budget,
+        'sessions': len(usages),
+        'evicted': evicted,
+    }
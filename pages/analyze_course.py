@@ -1,10 +1,28 @@
 import streamlit as st
 import numpy as np
+from collections import OrderedDict
 from udisc_stats import UdiscStats
+from memory_budget import enforce_budgets
+from analytics import (
+    PLAYER_ORDERS,
+    SCORE_TYPES,
+    comparison_vectors,
+    histogram_summary,
+    hole_histograms,
+    pairwise_win_probabilities,
+    hole_statistics,
+    merge_histograms,
+    order_players,
+    relative_to_par_matrix,
+    simulate_rounds,
+    simulation_summary,
+)
+from result_cache import cached_result
+from parquet_pages import frame_page, page_count
+from date_window import active_dataset_hash, active_upload_ids, select_date_window
+import query_engine
+from warmup import comparison_vectors_key, hole_histograms_key, hole_statistics_key, layout_pars_key
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 
 
 # Page configuration is handled in main.py
@@ -67,7 +85,11 @@ def hole_breakdown(df):
         return
     
     try:
-        pars = stats.get_pars_of_specific_course(selected_course, layout)
+        pars = cached_result(
+            active_dataset_hash(),
+            layout_pars_key(selected_course, layout),
+            lambda: stats.get_pars_of_specific_course(selected_course, layout),
+        )
     except (ValueError, KeyError) as e:
         st.error(f"Error getting par data: {str(e)}")
         return
@@ -117,61 +139,146 @@ def _create_complete_course_analysis(stats, selected_players, selected_course, l
     """Create comprehensive analysis showing all holes at once."""
     st.subheader(f"📍 {selected_course} - {layout}")
     
-    # Create tabs for different views
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🗺️ Course Overview", "🔥 Performance Heatmap", "📊 Detailed Stats", "🎯 Individual Holes", "📈 Plot Stats"])
-    
-    with tab1:
-        _create_course_overview_grid(stats, selected_players, selected_course, layout, holes, pars)
-    
-    with tab2:
-        _create_performance_heatmap(stats, selected_players, selected_course, layout, holes, pars)
+    # Only the selected view is computed and rendered; st.tabs would run all five on every rerun
+    views = {
+        "🗺️ Course Overview": _create_course_overview_grid,
+        "🔥 Performance Heatmap": _create_performance_heatmap,
+        "📊 Detailed Stats": _create_detailed_stats_table,
+        "🎯 Individual Holes": _create_individual_hole_cards,
+        "📈 Plot Stats": _create_player_comparison_tab,
+        "🎲 Simulator": _create_round_simulator,
+    }
+    selected_view = st.radio(
+        "Choose a view",
+        list(views),
+        horizontal=True,
+        key="course_breakdown_view",
+        label_visibility="collapsed"
+    )
     
-    with tab3:
-        _create_detailed_stats_table(stats, selected_players, selected_course, layout, holes, pars)
+    views[selected_view](stats, selected_players, selected_course, layout, holes, pars)
+
+
+# Most recent view results kept per session
+VIEW_CACHE_SIZE = 32
+
+
+def _cached_view(name, selected_players, selected_course, layout, compute):
+    """Return a view's data or figure for the current selection, computing it at most once.
+
+    Entries are keyed by (view, dataset, players, course, layout); without a dataset
+    hash the result is computed on every call.
+    """
+    dataset_hash = active_dataset_hash()
+    if dataset_hash is None:
+        return compute()
     
-    with tab4:
-        _create_individual_hole_cards(stats, selected_players, selected_course, layout, holes, pars)
+    cache = st.session_state.setdefault('course_view_cache', OrderedDict())
+    key = (name, dataset_hash, tuple(selected_players), selected_course, layout)
+    if key in cache:
+        cache.move_to_end(key)
+    else:
+        cache[key] = compute()
+        while len(cache) > VIEW_CACHE_SIZE:
+            cache.popitem(last=False)
+    return cache[key]
+
+
+def _compute_hole_statistics(df, selected_course, layout):
+    """Run the per-hole aggregation as SQL over the saved uploads when possible."""
+    upload_ids = active_upload_ids()
+    if upload_ids and query_engine.is_available():
+        return query_engine.hole_statistics(upload_ids, selected_course, layout)
+    return hole_statistics(df, selected_course, layout)
+
+
+def _get_hole_statistics(stats, selected_players, selected_course, layout):
+    """Per-hole statistics of the selected players indexed by (Hole, PlayerName).
+
+    Read from the shared result cache when the dataset has been warmed up.
+    """
+    def compute():
+        hole_stats = cached_result(
+            active_dataset_hash(),
+            hole_statistics_key(selected_course, layout),
+            lambda: _compute_hole_statistics(stats.raw_df, selected_course, layout),
+        )
+        hole_stats = hole_stats[hole_stats['PlayerName'].isin(selected_players)]
+        return hole_stats.set_index(['Hole', 'PlayerName'])
     
-    with tab5:
-        _create_player_comparison_tab(stats, selected_players, selected_course, layout, holes, pars)
+    return _cached_view('hole_statistics', selected_players, selected_course, layout, compute)
 
 
-def _create_course_overview_grid(stats, selected_players, selected_course, layout, holes, pars):
-    """Create a grid overview of all holes with key metrics."""
-    st.subheader("🗺️ Course Overview - All Holes at a Glance")
-    
+def _get_layout_histograms(stats, selected_course, layout):
+    """Per (player, hole, month) score histograms of a layout from the shared result cache."""
+    return cached_result(
+        active_dataset_hash(),
+        hole_histograms_key(selected_course, layout),
+        lambda: hole_histograms(stats.raw_df, selected_course, layout),
+    )
+
 
+def _get_hole_distributions(stats, selected_players, selected_course, layout):
+    """Score distribution summaries (median, p90, variance) of the selected players.
+
+    Returns one frame indexed by (Hole, PlayerName) and one indexed by Hole that
+    merges all selected players. Both are summed from the stored per-month score
+    histograms, so their cost does not grow with the number of rounds.
+    """
+    def compute():
+        histograms = _get_layout_histograms(stats, selected_course, layout)
+        selected = histograms[histograms.index.get_level_values('PlayerName').isin(selected_players)]
+        per_player = histogram_summary(merge_histograms(selected, ['Hole', 'PlayerName']))
+        field = histogram_summary(merge_histograms(selected, ['Hole']))
+        return per_player, field
     
-    # Calculate metrics for all holes
+    return _cached_view('hole_distributions', selected_players, selected_course, layout, compute)
+
+
+def _build_overview_data(stats, selected_players, selected_course, layout, holes, pars):
+    """Collect per-hole averages, percentiles and under-par percentages for the overview grid."""
+    hole_stats = _get_hole_statistics(stats, selected_players, selected_course, layout)
+    distributions, field = _get_hole_distributions(stats, selected_players, selected_course, layout)
     hole_data = []
     
     for i, hole in enumerate(holes, 1):
         hole_name = f'Hole{i}'
         par = int(pars[hole_name]) if hole_name in pars else 3
-        hole_stats = {
+        hole_info = {
             'hole': i,
             'par': par,
-            'players': {}
+            'players': {},
+            'field': field.loc[i].to_dict() if i in field.index else None
         }
         
         for player in selected_players:
-            player_stats = UdiscStats(stats.raw_df)
-            player_stats.filter_df_by_player([player])
-            player_stats.filter_df_by_course(selected_course)
-            player_stats.filter_df_by_layout(layout)
-            
-            if not player_stats.df.empty and hole_name in player_stats.df.columns:
-                hole_scores = player_stats.df[hole_name].dropna()
-                if len(hole_scores) > 0:
-                    avg_score = hole_scores.mean()
-                    under_par_pct = (len(hole_scores[hole_scores < par]) / len(hole_scores)) * 100
-                    hole_stats['players'][player] = {
-                        'avg': avg_score,
-                        'under_par_pct': under_par_pct,
-                        'rounds': len(hole_scores)
-                    }
+            if (i, player) in hole_stats.index:
+                player_hole = hole_stats.loc[(i, player)]
+                player_distribution = distributions.loc[(i, player)]
+                hole_info['players'][player] = {
+                    'avg': player_hole['Avg'],
+                    'median': player_distribution['Median'],
+                    'p90': player_distribution['P90'],
+                    'under_par_pct': player_hole['UnderParPct'],
+                    'rounds': int(player_hole['Rounds'])
+                }
         
-        hole_data.append(hole_stats)
+        hole_data.append(hole_info)
+    
+    return hole_data
+
+
+def _create_course_overview_grid(stats, selected_players, selected_course, layout, holes, pars):
+    """Create a grid overview of all holes with key metrics."""
+    st.subheader("🗺️ Course Overview - All Holes at a Glance")
+    
+
+    
+    # Calculate metrics for all holes
+    hole_data = _cached_view(
+        'overview', selected_players, selected_course, layout,
+        lambda: _build_overview_data(stats, selected_players, selected_course, layout, holes, pars)
+    )
     
     # Create grid layout
     # Use a more responsive grid layout
@@ -214,42 +321,33 @@ def _create_hole_card(hole_info):
             st.markdown(f"**Status:** <span style='color: red;'>{status}</span>", unsafe_allow_html=True)
         else:
             st.markdown(f"**Status:** {status}")
+        
+        field = hole_info.get('field')
+        if field is not None:
+            st.caption(f"All selected: median {field['Median']:.0f} · p90 {field['P90']:.0f} · var {field['Variance']:.2f}")
     
     for player, p_stats in hole_info['players'].items():
         avg_score = p_stats['avg']
         relative_score = avg_score - par
         
-        st.markdown(f"**{player}:** {avg_score:.2f} ({relative_score:+.2f})")
+        st.markdown(f"**{player}:** {avg_score:.2f} ({relative_score:+.2f}) · med {p_stats['median']:.0f} · p90 {p_stats['p90']:.0f}")
 
 
-def _create_performance_heatmap(stats, selected_players, selected_course, layout, holes, pars):
-    """Create a heatmap showing performance across all holes."""
-    st.subheader("🔥 Performance Heatmap")
-    st.write("Darker colors indicate better performance (lower scores relative to par)")
-    
-    # Prepare data for heatmap
-    heatmap_data = pd.DataFrame(index=[f"Hole {i}" for i in range(1, len(holes) + 1)], columns=selected_players)
+def _build_performance_heatmap(stats, selected_players, selected_course, layout, holes, player_order):
+    """Build the heatmap figure of average score relative to par per hole and player."""
+    import plotly.express as px
     
-    for player in selected_players:
-        player_stats = UdiscStats(stats.raw_df)
-        player_stats.filter_df_by_player([player])
-        player_stats.filter_df_by_course(selected_course)
-        player_stats.filter_df_by_layout(layout)
-        
-        for i, hole in enumerate(holes, 1):
-            hole_name = f'Hole{i}'
-            par = int(pars.get(hole_name, 3))
-            
-            if not player_stats.df.empty and hole_name in player_stats.df.columns:
-                hole_scores = player_stats.df[hole_name].dropna()
-                if not hole_scores.empty:
-                    avg_score = hole_scores.mean()
-                    heatmap_data.loc[f"Hole {i}", player] = avg_score - par
+    # One pivot of the per-hole statistics; pars missing from the data count as 3
+    hole_stats = _get_hole_statistics(stats, selected_players, selected_course, layout).reset_index()
+    matrix = relative_to_par_matrix(hole_stats, list(range(1, len(holes) + 1)))
+    matrix = matrix.reindex(columns=order_players(matrix, player_order, selected_players))
+    matrix.index = [f"Hole {i}" for i in matrix.index]
     
-    # Create heatmap
+    # Cell labels stop being readable long before the color scale does
+    show_values = matrix.size <= 600
     fig = px.imshow(
-        heatmap_data,
-        text_auto=".2f",
+        matrix,
+        text_auto=".2f" if show_values else False,
         aspect="auto",
         color_continuous_scale='RdYlGn_r',
         color_continuous_midpoint=0,
@@ -264,57 +362,95 @@ def _create_performance_heatmap(stats, selected_players, selected_course, layout
         yaxis=dict(autorange='reversed')  # Hole 1 at top
     )
     
+    return fig
+
+
+def _create_performance_heatmap(stats, selected_players, selected_course, layout, holes, pars):
+    """Create a heatmap showing performance across all holes."""
+    st.subheader("🔥 Performance Heatmap")
+    st.write("Darker colors indicate better performance (lower scores relative to par)")
+    
+    player_order = st.radio(
+        "Order players by",
+        PLAYER_ORDERS,
+        horizontal=True,
+        key="heatmap_player_order",
+        help="Similarity places players who do well and poorly on the same holes next to each other"
+    )
+    
+    fig = _cached_view(
+        f'heatmap:{player_order}', selected_players, selected_course, layout,
+        lambda: _build_performance_heatmap(stats, selected_players, selected_course, layout, holes, player_order)
+    )
+    
     st.plotly_chart(fig, use_container_width=True)
 
 
+# Per-player columns of the detailed table and how they are shown
+DETAIL_COLUMNS = {
+    'Avg': st.column_config.NumberColumn(format="%.2f"),
+    'Best': st.column_config.NumberColumn(format="%d"),
+    'Under%': st.column_config.NumberColumn(format="%.0f%%"),
+    'Median': st.column_config.NumberColumn(format="%d"),
+    'P90': st.column_config.NumberColumn(format="%d"),
+    'Var': st.column_config.NumberColumn(format="%.2f"),
+}
+# Players per page of the detailed table
+DETAIL_TABLE_PLAYERS = 8
+
+
+def _build_detailed_stats_table(stats, selected_players, selected_course, layout, holes, pars):
+    """Build the per-hole table of averages, bests, percentiles and under-par percentages.
+
+    Numeric columns are named '<player>_<stat>'; holes a player never scored are empty.
+    """
+    hole_stats = _get_hole_statistics(stats, selected_players, selected_course, layout)
+    distributions, _ = _get_hole_distributions(stats, selected_players, selected_course, layout)
+    
+    metrics = pd.concat([
+        hole_stats[['Avg', 'Best', 'UnderParPct']].rename(columns={'UnderParPct': 'Under%'}),
+        distributions[['Median', 'P90', 'Variance']].rename(columns={'Variance': 'Var'}),
+    ], axis=1)
+    wide = metrics.unstack('PlayerName')
+    hole_numbers = list(range(1, len(holes) + 1))
+    columns = [(stat, player) for player in selected_players for stat in DETAIL_COLUMNS]
+    wide = wide.reindex(index=hole_numbers, columns=pd.MultiIndex.from_tuples(columns))
+    wide.columns = [f'{player}_{stat}' for stat, player in columns]
+    
+    table = pd.DataFrame({
+        'Hole': hole_numbers,
+        'Par': [int(pars.get(f'Hole{i}', 3)) for i in hole_numbers],
+    })
+    return pd.concat([table, wide.reset_index(drop=True)], axis=1)
+
+
 def _create_detailed_stats_table(stats, selected_players, selected_course, layout, holes, pars):
     """Create a detailed statistics table for all holes."""
     st.subheader("📊 Detailed Statistics Table")
     
-    # Prepare data for table
-    table_data = []
-    
-    for i, hole in enumerate(holes, 1):
-        hole_name = f'Hole{i}'
-        par = int(pars[hole_name]) if hole_name in pars else 3
-        
-        row = {'Hole': i, 'Par': par}
-        
-        for player in selected_players:
-            player_stats = UdiscStats(stats.raw_df)
-            player_stats.filter_df_by_player([player])
-            player_stats.filter_df_by_course(selected_course)
-            player_stats.filter_df_by_layout(layout)
-            
-            if not player_stats.df.empty and hole_name in player_stats.df.columns:
-                hole_scores = player_stats.df[hole_name].dropna()
-                if len(hole_scores) > 0:
-                    avg_score = hole_scores.mean()
-                    under_par_count = len(hole_scores[hole_scores < par])
-                    under_par_pct = (under_par_count / len(hole_scores)) * 100
-                    best_score = hole_scores.min()
-                    
-                    row[f'{player}_Avg'] = f"{avg_score:.2f}"
-                    row[f'{player}_Best'] = int(best_score)
-                    row[f'{player}_Under%'] = f"{under_par_pct:.0f}%"
-                else:
-                    row[f'{player}_Avg'] = "N/A"
-                    row[f'{player}_Best'] = "N/A"
-                    row[f'{player}_Under%'] = "N/A"
-            else:
-                row[f'{player}_Avg'] = "N/A"
-                row[f'{player}_Best'] = "N/A"
-                row[f'{player}_Under%'] = "N/A"
-        
-        table_data.append(row)
+    df_table = _cached_view(
+        'detailed_table', selected_players, selected_course, layout,
+        lambda: _build_detailed_stats_table(stats, selected_players, selected_course, layout, holes, pars)
+    )
     
-    df_table = pd.DataFrame(table_data)
+    # Only one page of players is sent to the browser
+    pages = page_count(len(selected_players), DETAIL_TABLE_PLAYERS)
+    page = 0
+    if pages > 1:
+        page = st.number_input(
+            f"Players page (of {pages})", min_value=1, max_value=pages, value=1, key="detail_table_page"
+        ) - 1
+    page_players = list(frame_page(pd.Series(selected_players), page, DETAIL_TABLE_PLAYERS))
+    page_columns = [f'{player}_{stat}' for player in page_players for stat in DETAIL_COLUMNS]
     
-    # Style the dataframe
     st.dataframe(
-        df_table,
+        df_table[['Hole', 'Par'] + page_columns],
         use_container_width=True,
-        height=min(600, len(holes) * 35 + 100)
+        height=min(600, len(holes) * 35 + 100),
+        hide_index=True,
+        column_config={
+            f'{player}_{stat}': config for player in page_players for stat, config in DETAIL_COLUMNS.items()
+        }
     )
 
 
@@ -323,74 +459,49 @@ def _create_individual_hole_cards(stats, selected_players, selected_course, layo
     st.subheader("🎯 Individual Hole Analysis")
     st.write("Click on any hole to see detailed score breakdown")
     
+    hole_stats = _get_hole_statistics(stats, selected_players, selected_course, layout)
+    
     for i, hole in enumerate(holes, 1):
         hole_name = f'Hole{i}'
         par = int(pars[hole_name]) if hole_name in pars else 3
         
         with st.expander(f"🏌️ Hole {i} (Par {par})", expanded=False):
-            _create_single_hole_analysis(stats, selected_players, selected_course, layout, i, par, pars)
+            _create_single_hole_analysis(hole_stats, selected_players, selected_course, layout, i, par)
 
 
-def _create_single_hole_analysis(stats, selected_players, selected_course, layout, hole_number, par, pars):
+def _create_single_hole_analysis(hole_stats, selected_players, selected_course, layout, hole_number, par):
     """Create detailed analysis for a single hole."""
-    # Initialize score breakdown dataframe
-    scores_df = pd.DataFrame(columns=['Player', 'Aces', 'Eagles', 'Birdies', 'Pars', 'Bogeys', 'DoubleBogeysOrWorse'])
+    # Collect statistics for each player that has scores on this hole
+    players = [player for player in selected_players if (hole_number, player) in hole_stats.index]
     
-    # Collect statistics for each player
-    player_stats_summary = []
+    if not players:
+        return
     
-    for player in selected_players:
-        # Create fresh stats object for each player
-        player_stats = UdiscStats(stats.raw_df)
-        player_stats.filter_df_by_player([player])
-        player_stats.filter_df_by_course(selected_course)
-        player_stats.filter_df_by_layout(layout)
-        
-        if player_stats.df.empty:
-            continue
-        
-        # Get scores for the selected hole
-        hole_name = f'Hole{hole_number}'
-        if hole_name not in player_stats.df.columns:
-            continue
-            
-        hole_scores = player_stats.df[hole_name].dropna()
-        
-        if len(hole_scores) == 0:
-            continue
-            
-        # Calculate statistics
-        avg_score = hole_scores.mean()
-        under_par_count = len(hole_scores[hole_scores < par])
-        birdie_pct = (under_par_count / len(hole_scores)) * 100
-        
-        player_stats_summary.append({
-            'player': player,
-            'avg': avg_score,
-            'birdie_pct': birdie_pct,
-            'rounds': len(hole_scores)
-        })
-        
-        # Add to score breakdown
-        scores_df = player_stats.append_scores_to_df(scores_df, player_stats.df, pars, hole_number)
+    hole_rows = hole_stats.loc[[(hole_number, player) for player in players]]
     
     # Display summary statistics
-    if player_stats_summary:
-        cols = st.columns(len(player_stats_summary))
-        for col, stat in zip(cols, player_stats_summary):
-            col.metric(
-                f"{stat['player']}",
-                f"{stat['avg']:.2f} avg",
-                f"{stat['birdie_pct']:.0f}% under par"
-            )
+    cols = st.columns(len(players))
+    for col, player, (_, stat) in zip(cols, players, hole_rows.iterrows()):
+        col.metric(
+            f"{player}",
+            f"{stat['Avg']:.2f} avg",
+            f"{stat['UnderParPct']:.0f}% under par"
+        )
     
     # Create score breakdown chart
-    if not scores_df.empty:
-        _create_mini_score_chart(scores_df, hole_number, par)
+    scores_df = hole_rows[SCORE_TYPES].reset_index(drop=True)
+    scores_df.insert(0, 'Player', players)
+    fig = _cached_view(
+        ('hole_chart', hole_number), selected_players, selected_course, layout,
+        lambda: _build_mini_score_chart(scores_df, hole_number, par)
+    )
+    st.plotly_chart(fig, use_container_width=True)
 
 
-def _create_mini_score_chart(scores_df, hole_number, par):
-    """Create a compact score breakdown chart."""
+def _build_mini_score_chart(scores_df, hole_number, par):
+    """Build a compact score breakdown chart."""
+    import plotly.graph_objects as go
+    
     # Define colors for different score types
     colors = ['#FFD700', '#32CD32', '#90EE90', '#808080', '#FF6347', '#8B0000']
     
@@ -422,7 +533,90 @@ def _create_mini_score_chart(scores_df, hole_number, par):
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
     )
     
+    return fig
+
+
+SIMULATION_COUNTS = [1000, 10000, 100000]
+
+
+def _build_simulation(stats, selected_players, selected_course, layout, holes, simulations, seed):
+    """Simulate rounds for the selected players; returns the totals and how long it took."""
+    import time
+    
+    histograms = merge_histograms(_get_layout_histograms(stats, selected_course, layout), ['PlayerName', 'Hole'])
+    players = [player for player in selected_players if player in histograms.index.get_level_values('PlayerName')]
+    started = time.perf_counter()
+    totals = simulate_rounds(histograms, players, list(range(1, len(holes) + 1)), simulations, seed)
+    return totals, time.perf_counter() - started
+
+
+def _create_round_simulator(stats, selected_players, selected_course, layout, holes, pars):
+    """Simulate rounds from each player's hole score distributions."""
+    import plotly.graph_objects as go
+    
+    st.subheader("🎲 Round Simulator")
+    st.write("Plays thousands of rounds by drawing every hole score from the player's own history on this layout")
+    
+    col1, col2 = st.columns(2)
+    simulations = col1.select_slider(
+        "Simulated rounds", SIMULATION_COUNTS, value=SIMULATION_COUNTS[1], key="simulation_count"
+    )
+    seed = col2.number_input(
+        "Random seed", min_value=0, value=0, step=1, key="simulation_seed",
+        help="The same seed gives the same simulated rounds"
+    )
+    
+    totals, elapsed = _cached_view(
+        f'simulation:{simulations}:{seed}', selected_players, selected_course, layout,
+        lambda: _build_simulation(stats, selected_players, selected_course, layout, holes, simulations, seed)
+    )
+    if totals.empty:
+        st.info("None of the selected players have scores on this layout.")
+        return
+    
+    par_total = sum(int(pars.get(f'Hole{i}', 3)) for i in range(1, len(holes) + 1))
+    summary = simulation_summary(totals, par_total)
+    st.dataframe(
+        summary.reset_index(names='Player'),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Expected': st.column_config.NumberColumn("Expected Score", format="%+.1f"),
+            'P10': st.column_config.NumberColumn("Good Day (P10)", format="%+.0f"),
+            'Median': st.column_config.NumberColumn(format="%+.0f"),
+            'P90': st.column_config.NumberColumn("Bad Day (P90)", format="%+.0f"),
+            'WinPct': st.column_config.NumberColumn(
+                "Win %", format="%.1f%%", help="Share of simulated rounds with the lowest score; ties are shared"
+            ),
+        }
+    )
+    
+    fig = go.Figure()
+    for player in totals.columns:
+        fig.add_trace(go.Histogram(
+            x=totals[player] - par_total,
+            name=player,
+            histnorm='percent',
+            opacity=0.6,
+            xbins=dict(size=1)
+        ))
+    fig.update_layout(
+        title="Simulated Score Distribution",
+        xaxis_title="Score (relative to par)",
+        yaxis_title="% of simulated rounds",
+        barmode='overlay',
+        height=400
+    )
     st.plotly_chart(fig, use_container_width=True)
+    
+    if len(totals.columns) > 2:
+        st.write("**Head to head win probability (row player beats column player)**")
+        st.dataframe(pairwise_win_probabilities(totals).style.format("{:.1f}%", na_rep="—"), use_container_width=True)
+    
+    st.caption(
+        f"{simulations:,} rounds simulated in {elapsed * 1000:.0f} ms. Holes a player has never scored "
+        "use every player's scores on that hole."
+    )
 
 
 def _create_player_comparison_tab(stats, selected_players, selected_course, layout, holes, pars):
@@ -455,79 +649,52 @@ def _create_player_comparison_tab(stats, selected_players, selected_course, layo
 
 def _create_comparison_chart(stats, selected_players, selected_course, layout, par_total, visualization, holes, pars):
     """Create and display the comparison chart."""
+    import plotly.graph_objects as go
+    
     fig = go.Figure()
     
+    # One grouped computation for every selected player and view
+    vectors = _cached_view(
+        'comparison_vectors', selected_players, selected_course, layout,
+        lambda: cached_result(
+            active_dataset_hash(),
+            comparison_vectors_key(selected_players, selected_course, layout),
+            lambda: comparison_vectors(stats.raw_df, selected_players, selected_course, layout, pars),
+        )
+    )
+    vectors = vectors[vectors['View'] == visualization]
+    hole_numbers = sorted(vectors['Hole'].unique().tolist())
+    total_labels = {
+        "Best Per Hole": "Theoretical Best",
+        "Average": "Average",
+        "Last Round": "Last Round",
+        "Best Round": "Best Round",
+    }
+    
     for player in selected_players:
-        # Create a fresh stats object for each player
-        player_stats = UdiscStats(stats.raw_df)
-        player_stats.filter_df_by_player([player])
-        player_stats.filter_df_by_course(selected_course)
-        player_stats.filter_df_by_layout(layout)
+        player_vector = vectors[vectors['PlayerName'] == player]
         
-        if player_stats.df.empty:
+        if player_vector.empty:
             st.warning(f"No data found for {player}")
             continue
-            
-        player_holes = player_stats.get_holes_from_round()
         
-        if not player_holes:
-            st.warning(f"No hole data found for {player}")
-            continue
-            
-        hole_numbers = [int(hole[4:]) for hole in player_holes]
+        total_score = float(player_vector['Total'].iloc[0])
+        st.write(f"**{player}** - {total_labels[visualization]}: {total_score:.1f} ({total_score - par_total:+.1f})")
         
-        try:
-            # Calculate scores based on visualization type
-            if visualization == "Best Per Hole":
-                scores = player_stats.get_best_score_per_hole().values.tolist()
-                total_score = sum(scores)
-                st.write(f"**{player}** - Theoretical Best: {total_score:.1f} ({total_score - par_total:+.1f})")
-                
-            elif visualization == "Average":
-                scores = player_stats.get_average_score_per_hole()
-                avg_total = player_stats.df["Total"].mean()
-                st.write(f"**{player}** - Average: {avg_total:.1f} ({avg_total - par_total:+.1f})")
-                
-            elif visualization == "Last Round":
-                scores = player_stats.get_last_round_scores()
-                total_score = sum(scores)
-                st.write(f"**{player}** - Last Round: {total_score:.1f} ({total_score - par_total:+.1f})")
-                
-            elif visualization == "Best Round":
-                best_round = player_stats.get_best_round()
-                best_score = float(best_round["Total"])
-                scores = best_round[player_holes].values.tolist()
-                st.write(f"**{player}** - Best Round: {best_score:.1f} ({best_score - par_total:+.1f})")
-            
-            # Convert absolute scores to relative scores (score - par for each hole)
-            relative_scores = []
-            for i, hole in enumerate(player_holes):
-                if i < len(scores) and hole in pars:
-                    relative_score = round(scores[i] - pars[hole], 2)
-                    relative_scores.append(relative_score)
-                else:
-                    relative_scores.append(None)  # Handle missing data
-            
-            # Add trace to plot
-            fig.add_trace(
-                go.Scatter(
-                    x=hole_numbers,
-                    y=relative_scores,
-                    name=player,
-                    mode='markers+lines',
-                    marker=dict(size=8),
-                    line=dict(width=2),
-                    customdata=player_stats.df,
-                    hovertemplate='<b>' + player + '</b><br>' +
-                                  'Hole: %{x}<br>' +
-                                  'Relative to Par: %{y:+.2f}<br>' +
-                                  'Date: %{customdata[0]|%Y-%m-%d}<br>' +
-                                  'Rating: %{customdata[1]:.0f}<extra></extra>'
-                )
+        # Add trace to plot
+        fig.add_trace(
+            go.Scatter(
+                x=player_vector['Hole'],
+                y=player_vector['RelativeToPar'],
+                name=player,
+                mode='markers+lines',
+                marker=dict(size=8),
+                line=dict(width=2),
+                hovertemplate='<b>' + player + '</b><br>' +
+                              'Hole: %{x}<br>' +
+                              'Relative to Par: %{y:+.2f}<extra></extra>'
             )
-        except Exception as e:
-            st.error(f"Error processing data for {player}: {str(e)}")
-            continue
+        )
 
     # Add horizontal line at 0 (par line)
     if fig.data:
@@ -547,7 +714,7 @@ def _create_comparison_chart(stats, selected_players, selected_course, layout, p
             yaxis_title='Score Relative to Par',
             xaxis=dict(
                 tickmode='array',
-                tickvals=hole_numbers if 'hole_numbers' in locals() else [],
+                tickvals=hole_numbers,
                 showgrid=True,
             ),
             yaxis=dict(
@@ -567,6 +734,13 @@ def _create_comparison_chart(stats, selected_players, selected_course, layout, p
 
 # Check if data is available and run the app
 if 'df' in st.session_state and st.session_state.df is not None:
-    hole_breakdown(st.session_state.df)
+    windowed_df = select_date_window(st.session_state.df)
+    if windowed_df.empty:
+        st.info("📅 No rounds in the selected date range. Widen the range in the sidebar.")
+    else:
+        hole_breakdown(windowed_df)
 else:
-    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
\ No newline at end of file
+    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
+
+# Drop rebuildable session data when over the memory budgets
+enforce_budgets()
@@ -1,7 +1,19 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
 from udisc_stats import UdiscStats
+from memory_budget import enforce_budgets
+from analytics import course_difficulty_table
+from result_cache import cached_result
+from date_window import active_dataset_hash, active_upload_ids, select_date_window
+import query_engine
+from warmup import COURSE_DIFFICULTY_KEY
+
+def _course_difficulty_table(df):
+    """Difficulty table for all players, run as SQL over the saved uploads when possible."""
+    upload_ids = active_upload_ids()
+    if upload_ids and query_engine.is_available():
+        return query_engine.course_difficulty_table(upload_ids)
+    return course_difficulty_table(df)
 
 def course_difficulty_analysis(df):
     """
@@ -32,12 +44,12 @@ def course_difficulty_analysis(df):
 
     st.subheader(f"Course Difficulty for {selected_player}")
 
-    course_stats = player_data.groupby(['CourseName', 'LayoutName']).agg(
-        Rounds=('CourseName', 'size'),
-        Avg_Score=('+/-', 'mean'),
-        Best_Score=('+/-', 'min'),
-        Worst_Score=('+/-', 'max')
-    ).reset_index()
+    difficulty = cached_result(
+        active_dataset_hash(),
+        COURSE_DIFFICULTY_KEY,
+        lambda: _course_difficulty_table(df),
+    )
+    course_stats = difficulty[difficulty['PlayerName'] == selected_player].drop(columns='PlayerName')
 
     # Add a number input to filter by minimum rounds played
     min_rounds = st.number_input(
@@ -60,6 +72,8 @@ def course_difficulty_analysis(df):
     # filtered_stats = filtered_stats.reset_index(drop=True)
     # filtered_stats.index += 1
 
+    import altair as alt
+    
     chart = alt.Chart(filtered_stats).mark_circle().encode(
         x=alt.X(
             'Avg_Score',
@@ -85,6 +99,13 @@ def course_difficulty_analysis(df):
     st.altair_chart(chart, use_container_width=True)
 
 if 'df' in st.session_state and st.session_state.df is not None:
-    course_difficulty_analysis(st.session_state.df)
+    windowed_df = select_date_window(st.session_state.df)
+    if windowed_df.empty:
+        st.info("📅 No rounds in the selected date range. Widen the range in the sidebar.")
+    else:
+        course_difficulty_analysis(windowed_df)
 else:
-    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
\ No newline at end of file
+    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
+
+# Drop rebuildable session data when over the memory budgets
+enforce_budgets()
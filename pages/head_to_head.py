@@ -0,0 +1,141 @@
+import streamlit as st
+import pandas as pd
+from analytics import head_to_head, head_to_head_holes
+from result_cache import cached_result
+from date_window import active_dataset_hash, select_date_window
+from memory_budget import enforce_budgets
+from warmup import HEAD_TO_HEAD_HOLES_KEY, HEAD_TO_HEAD_KEY
+
+# Page configuration is handled in main.py
+
+# Players shown in the win percentage matrix, most shared rounds first
+MATRIX_PLAYERS = 25
+
+
+def head_to_head_page(df):
+    """Compare players on the rounds they played together."""
+    st.title("🤝 Head to Head")
+
+    if df is None:
+        st.warning("Please upload a CSV file first!")
+        return
+
+    records = cached_result(active_dataset_hash(), HEAD_TO_HEAD_KEY, lambda: head_to_head(df))
+    if records.empty:
+        st.info("No rounds with more than one player found. Head to head records need players on the same card.")
+        return
+
+    players = records.index.get_level_values('Player').unique().tolist()
+    selected_player = st.selectbox("Select a player", players)
+    if not selected_player:
+        return
+
+    _display_player_record(records, selected_player)
+    _display_hole_differentials(df, records, selected_player)
+    _display_win_matrix(records)
+
+
+def _display_player_record(records, player):
+    """Overall record and the table of opponents for one player."""
+    opponents = records.loc[player].sort_values('Rounds', ascending=False)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Shared Rounds", int(opponents['Rounds'].sum()))
+    with col2:
+        st.metric("Record (W-L-T)", f"{opponents['Wins'].sum()}-{opponents['Losses'].sum()}-{opponents['Ties'].sum()}")
+    with col3:
+        total_rounds = opponents['Rounds'].sum()
+        win_pct = (opponents['Wins'].sum() + opponents['Ties'].sum() / 2) / total_rounds * 100
+        st.metric("Win %", f"{win_pct:.1f}%")
+    with col4:
+        st.metric("Opponents", len(opponents))
+
+    st.subheader(f"📋 {player} vs. Opponents")
+    table = opponents.reset_index()
+    table['Record'] = table['Wins'].astype(str) + '-' + table['Losses'].astype(str) + '-' + table['Ties'].astype(str)
+    st.dataframe(
+        table[['Opponent', 'Rounds', 'Record', 'WinPct', 'AvgDiff']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'WinPct': st.column_config.NumberColumn("Win %", format="%.1f%%"),
+            'AvgDiff': st.column_config.NumberColumn(
+                "Avg Strokes vs Opponent", format="%+.2f", help="Negative means fewer strokes than the opponent"
+            ),
+        }
+    )
+
+
+def _display_hole_differentials(df, records, player):
+    """Per-hole stroke differential against one opponent on one layout."""
+    import plotly.graph_objects as go
+
+    st.subheader("🎯 Hole by Hole")
+    opponents = records.loc[player].sort_values('Rounds', ascending=False).index.tolist()
+    opponent = st.selectbox("Opponent", opponents)
+    if not opponent:
+        return
+
+    differentials = cached_result(active_dataset_hash(), HEAD_TO_HEAD_HOLES_KEY, lambda: head_to_head_holes(df))
+    pair = differentials.loc[(player, opponent)].sort_values('Rounds', ascending=False)
+    layouts = [f"{course} - {layout} ({rounds} rounds)" for (course, layout), rounds in pair['Rounds'].items()]
+    selected_layout = st.selectbox("Course layout", layouts)
+
+    row = pair.iloc[layouts.index(selected_layout)]
+    holes = row.drop('Rounds').dropna()
+    colors = ['#2ca02c' if value < 0 else '#d62728' for value in holes.values]
+
+    fig = go.Figure(go.Bar(
+        x=[f"Hole {hole}" for hole in holes.index],
+        y=holes.values,
+        marker_color=colors,
+        hovertemplate='%{x}: %{y:+.2f} strokes<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"{player} vs {opponent} - Average Strokes per Hole",
+        xaxis_title="Hole",
+        yaxis_title="Strokes vs Opponent",
+        height=400
+    )
+    fig.add_hline(y=0, line_color="gray")
+
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Bars below zero are holes where the player averages fewer strokes than the opponent.")
+
+
+def _display_win_matrix(records):
+    """Win percentage of every row player against every column player."""
+    import plotly.express as px
+
+    st.subheader("🏆 Win Percentage Matrix")
+    rounds_played = records.groupby(level='Player')['Rounds'].sum().sort_values(ascending=False)
+    players = rounds_played.index[:MATRIX_PLAYERS].tolist()
+    if len(rounds_played) > MATRIX_PLAYERS:
+        st.caption(f"Showing the {MATRIX_PLAYERS} players with the most shared rounds.")
+
+    matrix = records['WinPct'].unstack('Opponent').reindex(index=players, columns=players)
+    fig = px.imshow(
+        matrix,
+        text_auto=".0f",
+        aspect="auto",
+        color_continuous_scale='RdYlGn',
+        color_continuous_midpoint=50,
+        labels=dict(x="Opponent", y="Player", color="Win %")
+    )
+    fig.update_layout(height=max(400, len(players) * 30))
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+if 'df' in st.session_state and st.session_state.df is not None:
+    windowed_df = select_date_window(st.session_state.df)
+    if windowed_df.empty:
+        st.info("📅 No rounds in the selected date range. Widen the range in the sidebar.")
+    else:
+        head_to_head_page(windowed_df)
+else:
+    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
+
+# Drop rebuildable session data when over the memory budgets
+enforce_budgets()
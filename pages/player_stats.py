@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from udisc_stats import UdiscStats
+from memory_budget import enforce_budgets
+from analytics import course_performance_table, layout_records, player_overall_summary
+from result_cache import cached_result
+from date_window import active_dataset_hash, active_upload_ids, saved_upload_ids, select_date_window
+import query_engine
+from db import longest_streaks, query_layout_records, query_rounds, query_score_events, score_event_counts
+from warmup import COURSE_PERFORMANCE_KEY, PLAYER_SUMMARY_KEY
 
 # Page configuration is handled in main.py
 
@@ -34,64 +39,98 @@ def player_stats(df):
         st.error(f"No data found for {selected_player}")
         return
     
+    # Best and worst rounds per layout, from the records index when the dataset is saved
+    records = _layout_records(stats, selected_player)
+    
     # Display overall statistics
-    _display_overall_stats(stats, selected_player)
+    _display_overall_stats(stats, selected_player, records)
     
     # Display course-specific analysis
     _display_course_analysis(stats, selected_player)
     
+    # Display layout records
+    _display_layout_records(records)
+    _display_score_events(selected_player)
+    
     # Display performance trends
     _display_performance_trends(stats, selected_player)
 
 
-def _display_overall_stats(stats, player_name):
+def _layout_records(stats, player_name):
+    """Per-layout records of the loaded dataset, read from the records index when it is saved."""
+    upload_ids = active_upload_ids()
+    if upload_ids:
+        return query_layout_records(player_name, upload_ids)
+    return layout_records(stats.raw_df, player_name)
+
+
+def _signed(value):
+    """A +/- value for display; blank in the export shows as '-'."""
+    return "-" if pd.isna(value) else f"{int(value):+d}"
+
+
+def _rating(value):
+    return "-" if pd.isna(value) else f"{value:.0f}"
+
+
+def _display_overall_stats(stats, player_name, records):
     """Display overall player statistics."""
     st.subheader(f"📊 Overall Statistics for {player_name}")
     
-    player_data = stats.df
+    summary = cached_result(
+        active_dataset_hash(),
+        PLAYER_SUMMARY_KEY,
+        lambda: player_overall_summary(stats.raw_df),
+    ).loc[player_name]
     
     # Calculate key metrics
-    total_rounds = len(player_data)
-    avg_score_relative = player_data['+/-'].mean()
-    avg_rating = player_data['RoundRating'].mean()
-    best_round = int(player_data['+/-'].min())
-    worst_round = int(player_data['+/-'].max())
+    total_rounds = int(summary['TotalRounds'])
+    avg_score_relative = summary['AvgScore']
+    avg_rating = summary['AvgRating']
+    
+    # Best and worst rounds are the extremes of the per-layout records
+    scored = records.dropna(subset=['best_plus_minus'])
+    best = scored.loc[scored['best_plus_minus'].idxmin()] if not scored.empty else None
+    scored = records.dropna(subset=['worst_plus_minus'])
+    worst = scored.loc[scored['worst_plus_minus'].idxmax()] if not scored.empty else None
     
     # Display metrics in columns
     # Use a more responsive layout for metrics
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Total Rounds", total_rounds)
-        st.metric("Best Round", f"{best_round:+d}")
+        st.metric("Best Round", _signed(None if best is None else best['best_plus_minus']))
     with col2:
-        st.metric("Average Score", f"{avg_score_relative:+.1f}")
-        st.metric("Worst Round", f"{worst_round:+d}")
+        st.metric("Average Score", "-" if pd.isna(avg_score_relative) else f"{avg_score_relative:+.1f}")
+        st.metric("Worst Round", _signed(None if worst is None else worst['worst_plus_minus']))
     
     # Center the average rating
-    st.metric("Average Rating", f"{avg_rating:.0f}")
+    st.metric("Average Rating", _rating(avg_rating))
     
     # Best and worst round details
     st.subheader("🏆 Best & Worst Rounds")
     
     col1, col2 = st.columns(2)
     
-    with col1:
-        st.write("**🥇 Best Round:**")
-        best_round_data = player_data[player_data['+/-'] == best_round].iloc[0]
-        st.write(f"**Course:** {best_round_data['CourseName']}")
-        st.write(f"**Layout:** {best_round_data['LayoutName']}")
-        st.write(f"**Score:** {int(best_round_data['+/-']):+d}")
-        st.write(f"**Rating:** {best_round_data['RoundRating']:.0f}")
-        st.write(f"**Date:** {best_round_data['StartDate'][:10]}")
-    
-    with col2:
-        st.write("**🥴 Worst Round:**")
-        worst_round_data = player_data[player_data['+/-'] == worst_round].iloc[0]
-        st.write(f"**Course:** {worst_round_data['CourseName']}")
-        st.write(f"**Layout:** {worst_round_data['LayoutName']}")
-        st.write(f"**Score:** {int(worst_round_data['+/-']):+d}")
-        st.write(f"**Rating:** {worst_round_data['RoundRating']:.0f}")
-        st.write(f"**Date:** {worst_round_data['StartDate'][:10]}")
+    for column, title, record, prefix in ((col1, "🥇 Best Round", best, 'best'), (col2, "🥴 Worst Round", worst, 'worst')):
+        with column:
+            st.write(f"**{title}:**")
+            if record is None:
+                st.write("No round with a score relative to par.")
+                continue
+            st.write(f"**Course:** {record['course']}")
+            st.write(f"**Layout:** {record['layout']}")
+            st.write(f"**Score:** {_signed(record[f'{prefix}_plus_minus'])}")
+            st.write(f"**Rating:** {_rating(record[f'{prefix}_rating'])}")
+            st.write(f"**Date:** {record[f'{prefix}_date'][:10]}")
+
+
+def _course_performance_table(stats):
+    """Course table for all players, run as SQL over the saved uploads when possible."""
+    upload_ids = active_upload_ids()
+    if upload_ids and query_engine.is_available():
+        return query_engine.course_performance_table(upload_ids)
+    return course_performance_table(stats.raw_df)
 
 
 def _display_course_analysis(stats, player_name):
@@ -105,13 +144,11 @@ def _display_course_analysis(stats, player_name):
         return
     
     # Course performance summary
-    course_stats = player_data.groupby('CourseName').agg({
-        '+/-': ['count', 'mean', 'min'],
-        'RoundRating': 'mean'
-    }).round(2)
-    
-    course_stats.columns = ['Rounds Played', 'Avg Score', 'Best Score', 'Avg Rating']
-    course_stats = course_stats.sort_values('Rounds Played', ascending=False)
+    course_stats = cached_result(
+        active_dataset_hash(),
+        COURSE_PERFORMANCE_KEY,
+        lambda: _course_performance_table(stats),
+    ).loc[player_name]
     
     st.dataframe(course_stats, use_container_width=True)
     
@@ -127,6 +164,8 @@ def _display_course_analysis(stats, player_name):
             if size_values.min() <= 0:
                 size_values = size_values - size_values.min() + 1
             
+            import plotly.express as px
+            
             fig = px.scatter(
                 plot_data,
                 x='Rounds Played',
@@ -156,16 +195,113 @@ def _display_course_analysis(stats, player_name):
             st.info("Not enough data points to create a meaningful scatter plot.")
 
 
+def _display_layout_records(records):
+    """Display best, worst and theoretical best rounds per layout."""
+    if records.empty:
+        return
+    
+    st.subheader("🏅 Layout Records")
+    st.caption("Over the loaded dataset and date range; the theoretical best adds up the best score on every hole.")
+    
+    records_table = pd.DataFrame({
+        'Course': records['course'],
+        'Layout': records['layout'],
+        'Best Round': [
+            f"{total:.0f} ({_signed(plus_minus)})" for total, plus_minus in zip(records['best_total'], records['best_plus_minus'])
+        ],
+        'Best Date': records['best_date'].str[:10],
+        'Worst Round': [
+            f"{total:.0f} ({_signed(plus_minus)})" for total, plus_minus in zip(records['worst_total'], records['worst_plus_minus'])
+        ],
+        'Worst Date': records['worst_date'].str[:10],
+        'Theoretical Best': records['theoretical_best'].astype('Int64'),
+    })
+    
+    st.dataframe(records_table, use_container_width=True, hide_index=True)
+
+
+def _display_score_events(player_name):
+    """Display ace, eagle and birdie counts, the longest birdie streak and the ace log from the event index."""
+    # The index covers saved uploads only; a round in several of them is counted once
+    upload_ids = saved_upload_ids()
+    if not upload_ids:
+        return
+    start, end = st.session_state.get('active_date_window') or (None, None)
+    counts = score_event_counts(upload_ids, player_name, start, end)
+    if counts.empty:
+        return
+    
+    st.subheader("🎯 Aces, Eagles & Streaks")
+    st.caption("Over the loaded dataset and date range.")
+    
+    events = counts.loc[player_name]
+    streak = longest_streaks(upload_ids, player_name, start, end)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Aces", int(events['ace']))
+    col2.metric("Eagles", int(events['eagle']))
+    col3.metric("Birdies", int(events['birdie']))
+    if streak.empty:
+        col4.metric("Longest Streak", "-")
+    else:
+        best = streak.iloc[0]
+        col4.metric(
+            "Longest Streak",
+            f"{best['length']} holes",
+            help=f"Under par from hole {best['start_hole']} at {best['course']} ({best['layout']}) on {best['start_date'][:10]}"
+        )
+    
+    highlights = query_score_events(player_name, upload_ids, 'ace', start, end)
+    if events['eagle']:
+        highlights = pd.concat([highlights, query_score_events(player_name, upload_ids, 'eagle', start, end)]).sort_values(
+            'start_date', ascending=False
+        )
+    if not highlights.empty:
+        highlights = highlights.assign(
+            Date=highlights['start_date'].str[:10],
+            Kind=highlights['kind'].str.title(),
+        ).rename(columns={'course': 'Course', 'layout': 'Layout', 'hole': 'Hole'})
+        st.dataframe(
+            highlights[['Date', 'Kind', 'Course', 'Layout', 'Hole']],
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def _player_rounds(stats, player_name):
+    """The player's rounds, looked up in the rounds index when the dataset is saved."""
+    upload_ids = active_upload_ids()
+    if not upload_ids:
+        return stats.df.copy()
+    rounds = query_rounds(player_name, upload_ids)
+    return pd.DataFrame({
+        'CourseName': rounds['course'],
+        'LayoutName': rounds['layout'],
+        'StartDate': rounds['start_date'],
+        '+/-': rounds['plus_minus'],
+        'RoundRating': rounds['rating'],
+        'RatingEstimated': rounds['rating_estimated'].astype('boolean'),
+    })
+
+
 def _display_performance_trends(stats, player_name):
     """Display performance trends over time."""
     st.subheader("📈 Performance Trends")
     
-    player_data = stats.df.copy()
+    player_data = _player_rounds(stats, player_name)
     
     if player_data.empty:
         st.warning("No data available for trend analysis.")
         return
     
+    # Filtering drops all-empty columns, e.g. when no round in the date range is rated
+    if 'RoundRating' not in player_data.columns:
+        player_data['RoundRating'] = float('nan')
+    # Uploads saved before ratings were estimated at ingest have no flag
+    if 'RatingEstimated' not in player_data.columns:
+        player_data['RatingEstimated'] = False
+    player_data['RatingEstimated'] = player_data['RatingEstimated'].fillna(False).astype(bool)
+    player_data['RatingNote'] = player_data['RatingEstimated'].map({True: ' (estimated)', False: ''})
+    
     try:
         # Convert date and sort
         player_data['Date'] = pd.to_datetime(player_data['StartDate'])
@@ -179,6 +315,8 @@ def _display_performance_trends(stats, player_name):
     player_data['Rolling_Avg_Rating'] = player_data['RoundRating'].rolling(window=5, min_periods=1).mean()
     
     # Create trend charts
+    import plotly.graph_objects as go
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -225,13 +363,17 @@ def _display_performance_trends(stats, player_name):
             y=player_data['RoundRating'],
             mode='markers',
             name='Individual Rounds',
-            marker=dict(size=6, opacity=0.6),
+            marker=dict(
+                size=6,
+                opacity=0.6,
+                symbol=player_data['RatingEstimated'].map({True: 'circle-open', False: 'circle'})
+            ),
             hovertemplate='<b>%{customdata[0]}</b><br>' +
                           'Layout: %{customdata[1]}<br>' +
                           'Score: %{customdata[2]:+d}<br>' +
-                          'Rating: %{y:.0f}<br>' +
+                          'Rating: %{y:.0f}%{customdata[3]}<br>' +
                           'Date: %{x|%Y-%m-%d}<extra></extra>',
-            customdata=player_data[['CourseName', 'LayoutName', '+/-']]
+            customdata=player_data[['CourseName', 'LayoutName', '+/-', 'RatingNote']]
         ))
         
         fig_rating.add_trace(go.Scatter(
@@ -250,10 +392,24 @@ def _display_performance_trends(stats, player_name):
         )
         
         st.plotly_chart(fig_rating, use_container_width=True)
+        
+        estimated_count = int(player_data['RatingEstimated'].sum())
+        if estimated_count:
+            st.caption(
+                f"○ {estimated_count} of {len(player_data)} ratings were blank in the export and are "
+                "estimated from the score on the same layout."
+            )
 
 
 # Check if data is available and run the app
 if 'df' in st.session_state and st.session_state.df is not None:
-    player_stats(st.session_state.df)
+    windowed_df = select_date_window(st.session_state.df)
+    if windowed_df.empty:
+        st.info("📅 No rounds in the selected date range. Widen the range in the sidebar.")
+    else:
+        player_stats(windowed_df)
 else:
-    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
\ No newline at end of file
+    st.warning("⚠️ No data loaded. Please upload a CSV file from the Upload page first.")
+
+# Drop rebuildable session data when over the memory budgets
+enforce_budgets()
@@ -0,0 +1,125 @@
+"""Page-by-page access to stored Parquet files, for previews and large tables.
+
+Uploads are written in row groups of PARQUET_ROW_GROUP_ROWS rows (see
+db._write_parquet), so a page only decodes the row groups it overlaps. File
+metadata (row count, row group offsets, column statistics) is read once per
+file version and cached.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import math
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Rows per row group when saving uploads
+PARQUET_ROW_GROUP_ROWS = 2048
+# Rows per page unless the caller asks for another size
+PAGE_ROWS = 25
+
+
+@dataclass(frozen=True)
+class ParquetLayout:
+    path: str
+    num_rows: int
+    # First row of every row group, plus the total row count at the end
+    row_group_offsets: Tuple[int, ...]
+    columns: Tuple[str, ...]
+    column_summary: pd.DataFrame
+
+    @property
+    def num_row_groups(self) -> int:
+        return len(self.row_group_offsets) - 1
+
+
+def _column_summary(metadata: pq.FileMetaData, columns: Sequence[str]) -> pd.DataFrame:
+    """Type, null count, min and max per column, folded from the row group statistics."""
+    arrow_schema = metadata.schema.to_arrow_schema()
+    rows = []
+    for index in range(metadata.num_columns):
+        name = metadata.schema.column(index).name
+        if name not in columns:
+            continue
+        nulls, low, high = 0, None, None
+        for group in range(metadata.num_row_groups):
+            stats = metadata.row_group(group).column(index).statistics
+            if stats is None:
+                continue
+            nulls += stats.null_count
+            if stats.has_min_max:
+                low = stats.min if low is None else min(low, stats.min)
+                high = stats.max if high is None else max(high, stats.max)
+        rows.append({
+            'Column': name,
+            'Type': str(arrow_schema.field(name).type),
+            'Nulls': nulls,
+            # Text, so columns of different types fit in one table
+            'Min': '' if low is None else str(low),
+            'Max': '' if high is None else str(high),
+        })
+    return pd.DataFrame(rows, columns=['Column', 'Type', 'Nulls', 'Min', 'Max'])
+
+
+@functools.lru_cache(maxsize=64)
+def _read_layout(path: str, mtime_ns: int, size: int) -> ParquetLayout:
+    metadata = pq.read_metadata(path)
+    offsets = [0]
+    for group in range(metadata.num_row_groups):
+        offsets.append(offsets[-1] + metadata.row_group(group).num_rows)
+    # Index columns written by pandas are restored as the index, not shown as data
+    columns = tuple(
+        name for name in metadata.schema.names if not name.startswith('__index_level_')
+    )
+    return ParquetLayout(
+        path=path,
+        num_rows=metadata.num_rows,
+        row_group_offsets=tuple(offsets),
+        columns=columns,
+        column_summary=_column_summary(metadata, columns),
+    )
+
+
+def parquet_layout(path) -> ParquetLayout:
+    """Cached metadata of a Parquet file; a rewritten file is read again."""
+    stat = os.stat(path)
+    return _read_layout(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def page_count(num_rows: int, page_rows: int = PAGE_ROWS) -> int:
+    """Number of pages needed for `num_rows` rows (at least one, for empty data)."""
+    return max(1, math.ceil(num_rows / page_rows))
+
+
+def page_bounds(num_rows: int, page: int, page_rows: int = PAGE_ROWS) -> Tuple[int, int]:
+    """First and one-past-last row of a zero-based page, clamped to the data."""
+    page = min(max(page, 0), page_count(num_rows, page_rows) - 1)
+    start = page * page_rows
+    return start, min(start + page_rows, num_rows)
+
+
+def read_page(
+    path, page: int, page_rows: int = PAGE_ROWS, columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Rows of a zero-based page of a Parquet file, decoding only the row groups it spans."""
+    layout = parquet_layout(path)
+    start, end = page_bounds(layout.num_rows, page, page_rows)
+    if start >= end:
+        return pd.read_parquet(path, columns=columns).iloc[0:0]
+
+    offsets = layout.row_group_offsets
+    first = bisect.bisect_right(offsets, start) - 1
+    last = bisect.bisect_left(offsets, end) - 1
+    parquet_file = pq.ParquetFile(path)
+    table = parquet_file.read_row_groups(range(first, last + 1), columns=columns, use_pandas_metadata=True)
+    return table.slice(start - offsets[first], end - start).to_pandas()
+
+
+def frame_page(df: pd.DataFrame, page: int, page_rows: int = PAGE_ROWS) -> pd.DataFrame:
+    """The same page of an in-memory frame, for data that is not a single stored file."""
+    start, end = page_bounds(len(df), page, page_rows)
+    return df.iloc[start:end]
@@ -0,0 +1,132 @@
+"""Background loading of saved datasets, so new sessions start with data attached.
+
+Loads run in a small thread pool shared by every session of the process. A
+session asks for its default upload when it starts and picks up the result on a
+later rerun, without blocking the first render.
+
+Loaded datasets are kept by upload ids, so sessions on the same saved upload or
+combined view hold one shared frame instead of a copy each.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import pandas as pd
+
+from analytics import dataset_summary
+from db import UploadRecord, load_upload_df
+from result_cache import dataset_fingerprint
+from udisc_stats import TimeIndex
+
+# Set UDISC_PREFETCH=0 to start sessions empty
+PREFETCH_ON_START = os.environ.get("UDISC_PREFETCH", "1") != "0"
+# Loaded datasets kept for other sessions opening the same uploads
+MAX_PREFETCHED = 4
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+_lock = threading.Lock()
+_futures: "OrderedDict[Tuple[int, ...], Future]" = OrderedDict()
+
+
+@dataclass
+class PrefetchedDataset:
+    upload_ids: Tuple[int, ...]
+    df: pd.DataFrame
+    dataset_hash: str
+    summary: dict
+    time_index: TimeIndex
+
+
+def _key(records: Sequence[UploadRecord]) -> Tuple[int, ...]:
+    return tuple(sorted(record.id for record in records))
+
+
+def _build(upload_ids: Tuple[int, ...], df: pd.DataFrame) -> PrefetchedDataset:
+    return PrefetchedDataset(
+        upload_ids=upload_ids,
+        df=df,
+        dataset_hash=dataset_fingerprint(df),
+        summary=dataset_summary(df),
+        time_index=TimeIndex(df),
+    )
+
+
+def _load(records: Sequence[UploadRecord]) -> PrefetchedDataset:
+    if len(records) == 1:
+        df = load_upload_df(records[0].id)
+    else:
+        from union_view import UploadUnion
+        df = UploadUnion(records).to_pandas()
+    return _build(_key(records), df)
+
+
+def _remember(key: Tuple[int, ...], future: Future) -> None:
+    """Keep `future` as the most recent entry; the caller holds the lock."""
+    _futures[key] = future
+    _futures.move_to_end(key)
+    while len(_futures) > MAX_PREFETCHED:
+        _futures.popitem(last=False)
+
+
+def load_dataset(records: Sequence[UploadRecord]) -> Future:
+    """Start loading saved uploads (combined when several), or return the load already running."""
+    key = _key(records)
+    with _lock:
+        future = _futures.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _executor.submit(_load, list(records))
+        _remember(key, future)
+    return future
+
+
+def prefetch(record: UploadRecord) -> Future:
+    """Start loading an upload in the background, or return the load already running."""
+    return load_dataset([record])
+
+
+def share_dataset(record: UploadRecord, df: pd.DataFrame) -> PrefetchedDataset:
+    """Offer a frame just saved as `record` to other sessions.
+
+    If the upload is already loaded (e.g. the same export was saved before), that
+    frame is returned instead, and `df` can be dropped.
+    """
+    key = (record.id,)
+    with _lock:
+        future = _futures.get(key)
+        if future is not None and not (future.done() and future.exception() is not None):
+            _remember(key, future)
+        else:
+            future = None
+    if future is not None:
+        return future.result()
+
+    dataset = _build(key, df)
+    future = Future()
+    future.set_result(dataset)
+    with _lock:
+        _remember(key, future)
+    return dataset
+
+
+def loaded_datasets() -> List[PrefetchedDataset]:
+    """Datasets the cache currently keeps loaded."""
+    with _lock:
+        futures = list(_futures.values())
+    return [future.result() for future in futures if future.done() and future.exception() is None]
+
+
+def drop_loaded() -> List[PrefetchedDataset]:
+    """Forget every finished load, so frames no session uses can be freed; returns them.
+
+    Loads still running stay, since sessions are waiting for them. A dropped
+    dataset is loaded again by the next session that asks for it.
+    """
+    with _lock:
+        done = [key for key, future in _futures.items() if future.done()]
+        futures = [_futures.pop(key) for key in done]
+    return [future.result() for future in futures if future.exception() is None]
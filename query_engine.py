@@ -0,0 +1,194 @@
+"""SQL versions of the page aggregations, run by DuckDB directly over stored Parquet files.
+
+Each function mirrors the pandas function of the same name in `analytics.py` and
+returns the same frame, but only the aggregated rows are materialized in Python.
+When several uploads are given, rounds are deduplicated like `UploadUnion`: the
+copy from the most recent upload wins. Every round carries an `_order` column,
+its position in the frame the pandas path would see, so "first row" choices and
+tie orders match `analytics` exactly.
+"""
+from __future__ import annotations
+
+import importlib.util
+from typing import List, Sequence
+
+import pandas as pd
+
+from analytics import SCORE_TYPES
+from db import get_upload
+from udisc_stats import ROUND_KEY_COLUMNS
+
+SCORE_TYPE_SQL = """
+    CASE
+        WHEN Score = 1 THEN 'Aces'
+        WHEN Score = Par - 2 THEN 'Eagles'
+        WHEN Score = Par - 1 THEN 'Birdies'
+        WHEN Score = Par THEN 'Pars'
+        WHEN Score = Par + 1 THEN 'Bogeys'
+        WHEN Score > Par + 1 THEN 'DoubleBogeysOrWorse'
+    END
+"""
+
+
+def is_available() -> bool:
+    """True when the optional DuckDB dependency is installed (checked without importing it)."""
+    return importlib.util.find_spec("duckdb") is not None
+
+
+def _parquet_paths(upload_ids: Sequence[int]) -> List[str]:
+    paths = []
+    for upload_id in upload_ids:
+        record = get_upload(upload_id)
+        if record is None:
+            raise ValueError(f"No upload found with id {upload_id}")
+        if not record.parquet_path.exists():
+            raise FileNotFoundError(f"Stored parquet not found at {record.parquet_path}")
+        paths.append(str(record.parquet_path))
+    return paths
+
+
+def _rounds_cte(paths: Sequence[str]) -> str:
+    """SQL defining a `rounds` relation over the given Parquet files."""
+    if len(paths) == 1:
+        return """
+            rounds AS (
+                SELECT * EXCLUDE (file_row_number), file_row_number AS _order
+                FROM read_parquet($paths, union_by_name = true, file_row_number = true)
+            )
+        """
+
+    partition = ", ".join(f'"{column}"' for column in ROUND_KEY_COLUMNS)
+    # Frame order of UploadUnion: newest upload first, each file in its own row order
+    return f"""
+        source AS (
+            SELECT *, CAST(regexp_extract(filename, '([0-9]+)\\.parquet$', 1) AS INTEGER) AS _upload_id
+            FROM read_parquet($paths, union_by_name = true, filename = true, file_row_number = true)
+        ),
+        ordered AS (
+            SELECT * EXCLUDE (filename, _upload_id, file_row_number),
+                row_number() OVER (ORDER BY _upload_id DESC, file_row_number) AS _order
+            FROM source
+        ),
+        rounds AS (
+            SELECT * FROM ordered
+            QUALIFY row_number() OVER (PARTITION BY {partition} ORDER BY _order) = 1
+        )
+    """
+
+
+def _query(upload_ids: Sequence[int], body: str, **params) -> pd.DataFrame:
+    """Run `body` after the `rounds` CTE; extra CTEs in `body` must start with a comma."""
+    if not is_available():
+        raise ImportError("duckdb is required for the SQL query engine")
+    import duckdb
+
+    paths = _parquet_paths(upload_ids)
+    sql = f"WITH {_rounds_cte(paths)} {body}"
+    with duckdb.connect() as connection:
+        return connection.execute(sql, {"paths": paths, **params}).df()
+
+
+def course_difficulty_table(upload_ids: Sequence[int]) -> pd.DataFrame:
+    """Rounds, average, best and worst score per (player, course, layout)."""
+    return _query(
+        upload_ids,
+        """
+        SELECT
+            PlayerName, CourseName, LayoutName,
+            count(*) AS Rounds,
+            avg("+/-") AS Avg_Score,
+            min("+/-") AS Best_Score,
+            max("+/-") AS Worst_Score
+        FROM rounds
+        WHERE PlayerName <> 'Par'
+        GROUP BY PlayerName, CourseName, LayoutName
+        ORDER BY PlayerName, CourseName, LayoutName
+        """,
+    )
+
+
+def course_performance_table(upload_ids: Sequence[int]) -> pd.DataFrame:
+    """Per-course performance table for every player, indexed by (PlayerName, CourseName).
+
+    Ties in rounds played keep the order courses first appear in, like the
+    stable sort in pandas, and values are rounded in pandas so halves round the same way.
+    """
+    table = _query(
+        upload_ids,
+        """
+        SELECT
+            PlayerName, CourseName,
+            count("+/-") AS "Rounds Played",
+            avg("+/-") AS "Avg Score",
+            min("+/-") AS "Best Score",
+            avg(RoundRating) AS "Avg Rating"
+        FROM rounds
+        WHERE PlayerName <> 'Par'
+        GROUP BY PlayerName, CourseName
+        ORDER BY PlayerName, "Rounds Played" DESC, min(_order)
+        """,
+    )
+    return table.set_index(['PlayerName', 'CourseName']).round(2)
+
+
+def hole_statistics(upload_ids: Sequence[int], course: str, layout: str) -> pd.DataFrame:
+    """Per-hole statistics for every player on one course layout."""
+    layout_filter = "CourseName = $course AND LayoutName = $layout"
+    pars = _query(
+        upload_ids,
+        f"""
+        , par_round AS (
+            SELECT COLUMNS('^Hole[0-9]+$') FROM rounds
+            WHERE PlayerName = 'Par' AND {layout_filter}
+            ORDER BY _order
+            LIMIT 1
+        )
+        SELECT HoleName, CAST(Score AS INTEGER) AS Par
+        FROM (UNPIVOT par_round ON COLUMNS('^Hole[0-9]+$') INTO NAME HoleName VALUE Score)
+        """,
+        course=course,
+        layout=layout,
+    )
+    if pars.empty:
+        raise ValueError(f"No par data found for course '{course}' and layout '{layout}'")
+
+    par_values = ", ".join(f"('{row.HoleName}', {int(row.Par)})" for row in pars.itertuples())
+    score_counts = ",\n".join(
+        f"count(*) FILTER (WHERE ScoreType = '{name}') AS {name}"
+        for name in SCORE_TYPES
+    )
+    stats = _query(
+        upload_ids,
+        f"""
+        , pars (HoleName, Par) AS (VALUES {par_values}),
+        player_rounds AS (
+            SELECT PlayerName, COLUMNS('^Hole[0-9]+$') FROM rounds
+            WHERE PlayerName <> 'Par' AND {layout_filter}
+        ),
+        scores AS (
+            SELECT
+                s.PlayerName,
+                CAST(substr(s.HoleName, 5) AS INTEGER) AS Hole,
+                s.Score,
+                coalesce(p.Par, 3) AS Par
+            FROM (UNPIVOT player_rounds ON COLUMNS('^Hole[0-9]+$') INTO NAME HoleName VALUE Score) AS s
+            LEFT JOIN pars AS p USING (HoleName)
+        ),
+        typed AS (SELECT *, {SCORE_TYPE_SQL} AS ScoreType FROM scores)
+        SELECT
+            PlayerName, Hole,
+            any_value(Par) AS Par,
+            count(*) AS Rounds,
+            avg(Score) AS Avg,
+            min(Score) AS Best,
+            count(*) FILTER (WHERE Score < Par) AS UnderPar,
+            {score_counts}
+        FROM typed
+        GROUP BY PlayerName, Hole
+        ORDER BY PlayerName, Hole
+        """,
+        course=course,
+        layout=layout,
+    )
+    stats['UnderParPct'] = stats['UnderPar'] / stats['Rounds'] * 100
+    return stats
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import pandas as pd
+
+from atomic_io import atomic_write
+
+# Derived results (aggregates, tables) keyed by the hash of the dataset they came from.
+# The directory is shared by every app and warmup process using the same data/ folder.
+CACHE_DIR = Path("data/cache")
+
+# Total size the cache may grow to before the least recently used entries are removed
+CACHE_MAX_BYTES = int(os.environ.get("UDISC_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# The running size total counts this process's writes; it is resynced from disk
+# this often, and on every eviction, to pick up other processes' writes
+CACHE_RESCAN_SECONDS = 60
+
+_size_lock = threading.Lock()
+_cache_bytes: Optional[int] = None
+_scanned_at = 0.0
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Return a stable hash of a DataFrame's contents and column names."""
+    sha256 = hashlib.sha256()
+    sha256.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    sha256.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return sha256.hexdigest()
+
+
+def _entry_path(dataset_hash: str, key: str) -> Path:
+    # Keys may contain course names with slashes, so hash them into a file name
+    key_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return CACHE_DIR / dataset_hash / f"{key_hash}.pkl"
+
+
+def has_result(dataset_hash: str, key: str) -> bool:
+    return _entry_path(dataset_hash, key).exists()
+
+
+def get_result(dataset_hash: str, key: str, default: Any = None) -> Any:
+    """Return a cached result, or `default` if it has not been computed yet."""
+    path = _entry_path(dataset_hash, key)
+    try:
+        with open(path, "rb") as cache_file:
+            value = pickle.load(cache_file)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return default
+    # Reads refresh the modification time, which eviction uses as the last access time
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return value
+
+
+def _write_entry(path: Path, value: Any) -> int:
+    with atomic_write(path) as tmp_path:
+        with open(tmp_path, "wb") as tmp_file:
+            pickle.dump(value, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        size = tmp_path.stat().st_size
+    return size
+
+
+def _scan() -> List[Tuple[float, int, Path]]:
+    """(modification time, size, path) of every entry on disk."""
+    entries = []
+    for path in CACHE_DIR.glob("*/*.pkl"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def put_result(dataset_hash: str, key: str, value: Any) -> None:
+    """Store a result atomically, evicting old entries once the cache grows past its cap.
+
+    The cache directory is only scanned when the running size total passes the
+    cap (or is due for a resync), not on every write.
+    """
+    global _cache_bytes, _scanned_at
+    path = _entry_path(dataset_hash, key)
+    try:
+        replaced = path.stat().st_size
+    except FileNotFoundError:
+        replaced = 0
+    try:
+        size = _write_entry(path, value)
+    except FileNotFoundError:
+        # Another process's eviction removed the (empty) directory in between
+        size = _write_entry(path, value)
+
+    with _size_lock:
+        if _cache_bytes is None or time.monotonic() - _scanned_at > CACHE_RESCAN_SECONDS:
+            _cache_bytes = sum(entry[1] for entry in _scan())
+            _scanned_at = time.monotonic()
+        else:
+            _cache_bytes += size - replaced
+        over_limit = _cache_bytes > CACHE_MAX_BYTES
+    if over_limit:
+        evict(CACHE_MAX_BYTES)
+
+
+def evict(max_bytes: int = CACHE_MAX_BYTES) -> int:
+    """Remove the least recently used entries until the cache fits in `max_bytes`.
+
+    Safe to run from several processes at once: an entry removed by another
+    process is skipped, and readers holding an open file keep their data.
+    Returns the number of bytes freed.
+    """
+    global _cache_bytes, _scanned_at
+    entries = _scan()
+    total = sum(entry[1] for entry in entries)
+
+    freed = 0
+    if total > max_bytes:
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total - freed <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            freed += size
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass  # Other entries (or a concurrent writer) still use the directory
+
+    with _size_lock:
+        _cache_bytes = total - freed
+        _scanned_at = time.monotonic()
+    return freed
+
+
+def cached_result(dataset_hash: str, key: str, compute: Callable[[], Any]) -> Any:
+    """Return the cached result for `key`, computing and storing it on a miss.
+
+    When `dataset_hash` is None the result is computed without caching.
+    """
+    if dataset_hash is None:
+        return compute()
+    sentinel = object()
+    value = get_result(dataset_hash, key, sentinel)
+    if value is sentinel:
+        value = compute()
+        put_result(dataset_hash, key, value)
+    return value
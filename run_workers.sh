@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+# Run several Streamlit worker processes that share data/ (SQLite database,
+# uploads and the on-disk result cache). Put a load balancer with sticky
+# sessions in front of ports BASE_PORT .. BASE_PORT + WORKERS - 1.
+#
+#   WORKERS=4 BASE_PORT=8501 ./run_workers.sh
+set -euo pipefail
+
+cd "$(dirname "$0")"
+
+WORKERS="${WORKERS:-$(nproc)}"
+BASE_PORT="${BASE_PORT:-8501}"
+
+# Stop every worker when the script exits
+trap 'kill 0' EXIT
+
+# Create the database schema once before the workers start
+python -c "from db import initialize_database; initialize_database()"
+
+for ((i = 0; i < WORKERS; i++)); do
+    port=$((BASE_PORT + i))
+    echo "Starting worker $((i + 1))/$WORKERS on port $port"
+    streamlit run main.py \
+        --server.port="$port" \
+        --server.address=0.0.0.0 \
+        --server.headless=true &
+done
+
+wait
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import db  # noqa: E402
+
+PARS = [3, 4, 3]
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Run against an empty data directory under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(db, "_initialized_db_path", None)
+    return tmp_path
+
+
+def make_round(player, course, layout, start_date, scores, rating=None, pars=PARS):
+    """One export row; 'Par' rows carry the hole pars and no +/- or rating."""
+    row = {
+        "PlayerName": player,
+        "CourseName": course,
+        "LayoutName": layout,
+        "StartDate": start_date,
+        "EndDate": start_date,
+        "Total": sum(scores),
+        "+/-": None if player == "Par" else float(sum(scores) - sum(pars)),
+        "RoundRating": None if player == "Par" else rating,
+    }
+    row.update({f"Hole{number}": float(score) for number, score in enumerate(scores, start=1)})
+    return row
+
+
+def make_frame(rows):
+    return pd.DataFrame(rows).astype({"+/-": float, "RoundRating": float})
+
+
+def save_frame(filename, df):
+    return db.save_upload(filename, df.to_csv(index=False).encode(), df)
@@ -0,0 +1,27 @@
+import warnings
+
+import pandas as pd
+
+from cleaning import clean_udisc_data
+from conftest import make_frame, make_round
+
+
+def _export():
+    return make_frame([
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-01-01 0900", [3, 4, 4], 170),
+        make_round("Ann", "Alpha", "Main", "2022-01-02 0900", [4, 5, 5], 150),
+        make_round("Ann", "Alpha", "Main", "2022-01-03 0900", [3, 5, 4], None),
+        make_round("Ann", "Alpha", "Main", "2022-01-04 0900", [0, 4, 4], 160),
+    ])
+
+
+def test_cleaning_a_cleaned_frame_changes_nothing():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        cleaned = clean_udisc_data(_export())
+
+    # The incomplete round is dropped and the blank rating estimated, once
+    assert len(cleaned) == 4
+    assert cleaned["RatingEstimated"].tolist() == [False, False, False, True]
+    pd.testing.assert_frame_equal(clean_udisc_data(cleaned), cleaned)
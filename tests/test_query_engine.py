@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import analytics
+import query_engine
+from conftest import make_frame, make_round, save_frame
+from union_view import UploadUnion
+
+pytestmark = pytest.mark.skipif(not query_engine.is_available(), reason="duckdb is not installed")
+
+
+def _rounds():
+    rows = [
+        # The first Par row in frame order is the one pandas uses, though it is not the earliest
+        make_round("Par", "Alpha", "Main", "2022-03-01 0900", [3, 4, 3]),
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [4, 4, 4]),
+    ]
+    # Ann's average on Alpha is exactly 3.625, which rounds half to even
+    for day, over in enumerate([3, 3, 4, 4, 3, 4, 4, 4], start=1):
+        rows.append(make_round("Ann", "Alpha", "Main", f"2022-02-{day:02d} 1000", [3, 4, 3 + over], 150 + day))
+    # Gamma appears before Beta, so the tie in rounds played keeps Gamma first
+    for day in (1, 2):
+        rows.append(make_round("Ann", "Gamma", "Short", f"2022-04-{day:02d} 1000", [3, 3, 3], 170))
+        rows.append(make_round("Ann", "Beta", "Long", f"2022-05-{day:02d} 1000", [4, 4, 3], 160 + day))
+    rows.append(make_round("Bob", "Alpha", "Main", "2022-02-01 1000", [2, 4, 3], 200))
+    rows.append(make_round("Bob", "Beta", "Long", "2022-05-01 1000", [5, 4, 3], 140))
+    return make_frame(rows)
+
+
+def test_course_performance_matches_pandas_for_one_upload(storage):
+    df = _rounds()
+    record = save_frame("rounds.csv", df)
+
+    expected = analytics.course_performance_table(df)
+    pd.testing.assert_frame_equal(query_engine.course_performance_table([record.id]), expected)
+    assert expected.loc[("Ann", "Alpha"), "Avg Score"] == 3.62
+
+
+def test_course_performance_matches_pandas_for_overlapping_uploads(storage):
+    df = _rounds()
+    older = save_frame("older.csv", df.iloc[:12])
+    newer = save_frame("newer.csv", df.iloc[6:])
+    combined = UploadUnion([newer, older]).to_pandas()
+
+    expected = analytics.course_performance_table(combined)
+    pd.testing.assert_frame_equal(query_engine.course_performance_table([older.id, newer.id]), expected)
+    assert expected["Rounds Played"].sum() == len(analytics.player_rows(df))
+
+
+def test_hole_statistics_use_first_par_row(storage):
+    df = _rounds()
+    record = save_frame("rounds.csv", df)
+
+    expected = analytics.hole_statistics(df, "Alpha", "Main")
+    actual = query_engine.hole_statistics([record.id], "Alpha", "Main")
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+    assert actual.loc[actual["Hole"] == 1, "Par"].tolist() == [3, 3]
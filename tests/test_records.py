@@ -0,0 +1,58 @@
+import pandas as pd
+
+import analytics
+import db
+from conftest import make_frame, make_round, save_frame
+
+
+def _rounds():
+    return make_frame([
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-01-01 0900", [3, 5, 3], 160),
+        make_round("Ann", "Alpha", "Main", "2022-01-02 0900", [1, 4, 4], 170),
+        make_round("Ann", "Alpha", "Main", "2022-01-03 0900", [4, 6, 2], 120),
+        make_round("Ann", "Beta", "Long", "2022-01-04 0900", [4, 4, 4]),
+        make_round("Bob", "Alpha", "Main", "2022-01-02 0900", [2, 3, 3], 210),
+    ])
+
+
+def test_stored_records_match_pandas(storage):
+    df = _rounds()
+    df.loc[df["LayoutName"] == "Long", "+/-"] = None
+    record = save_frame("rounds.csv", df)
+
+    expected = analytics.layout_records(df, "Ann")
+    pd.testing.assert_frame_equal(db.query_layout_records("Ann", [record.id]), expected, check_dtype=False)
+    assert expected["theoretical_best"].tolist() == [9, 12]
+
+
+def test_records_combine_uploads_and_drop_with_them(storage):
+    df = _rounds()
+    first = save_frame("first.csv", df.iloc[:3])
+    second = save_frame("second.csv", df.iloc[[0, 3, 4]])
+
+    combined = db.query_layout_records("Ann", [first.id, second.id])
+    alpha = combined.set_index("layout").loc["Main"]
+    assert (alpha["best_total"], alpha["worst_total"], alpha["theoretical_best"]) == (9, 12, 9)
+
+    db.delete_upload(first.id)
+    assert db.query_layout_records("Ann", [first.id]).empty
+
+
+def test_corrected_rounds_count_once_in_combined_records(storage):
+    def export(first_scores, first_rating):
+        return make_frame([
+            make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+            make_round("Ann", "Alpha", "Main", "2022-01-01 0900", first_scores, first_rating),
+            make_round("Ann", "Alpha", "Main", "2022-01-02 0900", [3, 4, 4], 150),
+        ])
+
+    # The second export corrects the first round's hole 1 and rating
+    original, corrected = export([2, 4, 3], 185), export([3, 4, 3], 186)
+    first = save_frame("export.csv", original)
+    second = save_frame("export.csv", corrected)
+
+    for upload_ids, df in (([first.id], original), ([first.id, second.id], corrected)):
+        pd.testing.assert_frame_equal(
+            db.query_layout_records("Ann", upload_ids), analytics.layout_records(df, "Ann"), check_dtype=False
+        )
@@ -0,0 +1,20 @@
+import result_cache
+
+
+def test_scans_only_when_over_the_cap(storage, monkeypatch):
+    monkeypatch.setattr(result_cache, "_cache_bytes", None)
+    monkeypatch.setattr(result_cache, "CACHE_MAX_BYTES", 3000)
+    scans = []
+    scan = result_cache._scan
+    monkeypatch.setattr(result_cache, "_scan", lambda: scans.append(1) or scan())
+
+    for number in range(3):
+        result_cache.put_result("dataset", f"key{number}", b"x" * 500)
+    assert len(scans) == 1
+
+    for number in range(3, 8):
+        result_cache.put_result("dataset", f"key{number}", b"x" * 500)
+    assert len(scans) > 1
+    assert sum(entry[1] for entry in scan()) <= 3000
+    assert result_cache.get_result("dataset", "key7") == b"x" * 500
+    assert result_cache.get_result("dataset", "key0") is None
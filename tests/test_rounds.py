@@ -0,0 +1,54 @@
+import pandas as pd
+
+import db
+from cleaning import clean_udisc_data
+from conftest import make_frame, make_round, save_frame
+
+
+def _export(alpha_scores, alpha_rating):
+    return make_frame([
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-01-01 0900", alpha_scores, alpha_rating),
+        make_round("Par", "Alpha", "Main", "2022-02-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-02-01 0900", [3, 4, 3], 150),
+    ])
+
+
+def test_corrected_rounds_leave_earlier_uploads_unchanged(storage):
+    # The second export corrects the first round: a birdie on hole 2 becomes a par
+    first = save_frame("export.csv", _export([3, 3, 3], 170))
+    second = save_frame("export.csv", _export([3, 4, 3], 150))
+
+    assert db.query_rounds("Ann", [first.id])["rating"].tolist() == [170, 150]
+    assert db.query_rounds("Ann", [second.id])["rating"].tolist() == [150, 150]
+    # Both uploads: each round once, as the most recent upload has it
+    assert db.query_rounds("Ann", [first.id, second.id])["rating"].tolist() == [150, 150]
+
+    assert db.score_event_counts([first.id], "Ann").loc["Ann", "birdie"] == 1
+    assert db.score_event_counts([first.id, second.id], "Ann").empty
+
+
+def test_unchanged_rounds_are_stored_once(storage):
+    save_frame("export.csv", _export([3, 3, 3], 170))
+    save_frame("export.csv", _export([3, 3, 3], 170).iloc[::-1])
+
+    with db._connect() as connection:
+        assert connection.execute("SELECT count(*) FROM rounds").fetchone()[0] == 2
+        assert connection.execute("SELECT count(*) FROM upload_rounds").fetchone()[0] == 4
+
+
+def test_estimated_ratings_stay_as_each_upload_has_them(storage):
+    rows = [make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3])]
+    rows += [make_round("Ann", "Alpha", "Main", f"2022-01-0{day} 0900", scores, rating) for day, scores, rating in (
+        (1, [3, 4, 4], None), (2, [3, 5, 4], 180), (3, [4, 5, 5], 150),
+    )]
+    # The second export's extra rated round changes the fit, so the blank rating is estimated differently
+    later = [make_round("Ann", "Alpha", "Main", "2022-01-04 0900", [3, 4, 5], 170)]
+    first = save_frame("export.csv", clean_udisc_data(make_frame(rows)))
+    second = save_frame("export.csv", clean_udisc_data(make_frame(rows + later)))
+
+    for record in (first, second):
+        stored = pd.read_parquet(record.parquet_path).query("PlayerName == 'Ann'")
+        assert db.query_rounds("Ann", [record.id])["rating"].tolist() == stored["RoundRating"].tolist()
+    estimates = [db.query_rounds("Ann", [record.id])["rating"][0] for record in (first, second)]
+    assert estimates[0] != estimates[1]
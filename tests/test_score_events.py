@@ -0,0 +1,41 @@
+from datetime import date
+
+import db
+from conftest import make_frame, make_round, save_frame
+
+
+def _rounds():
+    # Pars 3, 4, 3: an ace and two birdies in January, a birdie in February, an ace in March
+    return make_frame([
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-01-01 0900", [1, 3, 2], 200),
+        make_round("Par", "Alpha", "Main", "2022-02-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-02-01 0900", [2, 4, 3], 180),
+        make_round("Par", "Alpha", "Main", "2022-03-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-03-01 0900", [1, 4, 3], 190),
+    ])
+
+
+def test_overlapping_uploads_count_each_round_once(storage):
+    df = _rounds()
+    # Cumulative exports: the second contains every round of the first
+    first = save_frame("export.csv", df.iloc[:4])
+    second = save_frame("export.csv", df)
+
+    counts = db.score_event_counts([first.id, second.id], "Ann").loc["Ann"]
+    assert counts.to_dict() == {"ace": 2, "eagle": 0, "birdie": 3}
+    assert db.score_event_counts([first.id], "Ann").loc["Ann", "ace"] == 1
+    assert len(db.query_score_events("Ann", [first.id, second.id], "ace")) == 2
+
+    streaks = db.longest_streaks([first.id, second.id])
+    assert streaks[["player", "length", "start_hole"]].values.tolist() == [["Ann", 3, 1]]
+
+
+def test_events_are_limited_to_the_date_window(storage):
+    record = save_frame("export.csv", _rounds())
+
+    counts = db.score_event_counts([record.id], "Ann", date(2022, 2, 1), date(2022, 3, 1)).loc["Ann"]
+    assert counts.to_dict() == {"ace": 1, "eagle": 0, "birdie": 1}
+    assert db.longest_streaks([record.id], "Ann", date(2022, 2, 1), date(2022, 3, 1)).empty
+    aces = db.query_score_events("Ann", [record.id], "ace", end=date(2022, 1, 1))
+    assert aces["start_date"].tolist() == ["2022-01-01 0900"]
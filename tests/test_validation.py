@@ -0,0 +1,37 @@
+import pytest
+
+from conftest import make_frame, make_round
+from validation import ValidationError, read_validated_csv
+
+
+def _csv(rows):
+    return make_frame(rows).to_csv(index=False).encode()
+
+
+def test_pars_are_compared_within_each_layout():
+    data = _csv([
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3], 150),
+        make_round("Par", "Alpha", "Long", "2022-01-02 0900", [4, 5, 4], pars=[4, 5, 4]),
+        make_round("Ann", "Alpha", "Long", "2022-01-02 0900", [4, 5, 4], 150, pars=[4, 5, 4]),
+        make_round("Par", "Alpha", "Main", "2022-01-03 0900", [3, 4, 4]),
+        make_round("Ann", "Alpha", "Main", "2022-01-03 0900", [3, 4, 4], 150),
+    ])
+
+    _, report = read_validated_csv(data, chunk_rows=2)
+
+    assert report.ok
+    assert report.anomaly_counts == {'par_changed': 1}
+    assert report.anomalies[0]['row'] == 6
+
+
+def test_layout_without_par_is_rejected():
+    data = _csv([
+        make_round("Par", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3]),
+        make_round("Ann", "Alpha", "Main", "2022-01-01 0900", [3, 4, 3], 150),
+        make_round("Ann", "Beta", "Main", "2022-01-02 0900", [3, 4, 3], 150),
+    ])
+
+    with pytest.raises(ValidationError, match=r"Beta \(Main\)") as error:
+        read_validated_csv(data)
+    assert error.value.report.anomaly_counts == {'missing_par': 1}
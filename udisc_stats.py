@@ -1,6 +1,51 @@
 import numpy as np
 import pandas as pd
-from typing import List, Union
+from datetime import date
+from typing import List, Optional, Tuple, Union
+
+# Columns that identify a single scorecard row (one player's round)
+ROUND_KEY_COLUMNS = ['PlayerName', 'CourseName', 'LayoutName', 'StartDate']
+
+
+class TimeIndex:
+    """
+    Row positions of a scorecard frame sorted by parsed `StartDate`.
+
+    Built once per dataset; every date window is then found with two binary
+    searches instead of comparing dates across the whole frame. Rows whose
+    start date cannot be parsed are never part of a window.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        timestamps = pd.to_datetime(df['StartDate'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        # NaT sorts last, so the unparseable rows are cut off the end
+        order = np.argsort(timestamps, kind='stable')
+        valid = int((~np.isnat(timestamps)).sum())
+        self.num_rows = len(df)
+        self._order = order[:valid]
+        self._sorted = timestamps[self._order]
+
+    def bounds(self) -> Tuple[Optional[date], Optional[date]]:
+        """First and last start date in the data."""
+        if len(self._sorted) == 0:
+            return None, None
+        return pd.Timestamp(self._sorted[0]).date(), pd.Timestamp(self._sorted[-1]).date()
+
+    def positions(self, start: Optional[date] = None, end: Optional[date] = None) -> np.ndarray:
+        """Row positions with start dates in [start, end] (whole days), in original row order."""
+        low = 0 if start is None else np.searchsorted(
+            self._sorted, np.datetime64(pd.Timestamp(start), 'ns'), side='left'
+        )
+        high = len(self._sorted) if end is None else np.searchsorted(
+            self._sorted, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1), 'ns'), side='left'
+        )
+        return np.sort(self._order[low:high])
+
+    def window(self, df: pd.DataFrame, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Rows of `df` (the frame this index was built from) within the date window."""
+        if len(df) != self.num_rows:
+            raise ValueError("TimeIndex was built from a different DataFrame")
+        return df.iloc[self.positions(start, end)]
 
 
 class UdiscStats:
@@ -10,12 +55,13 @@ class UdiscStats:
     """
     
     def __init__(self, df: pd.DataFrame):
-        self.raw_df = df.copy()
-        self.df = df.copy()
+        # No copies: the frames are never modified in place, filters build new ones
+        self.raw_df = df
+        self.df = df
 
     def reset_filters(self):
         """Reset the dataframe to its original state."""
-        self.df = self.raw_df.copy()
+        self.df = self.raw_df
 
     def get_unique_players_with_par(self) -> np.ndarray:
         """Get all unique player names including 'Par'."""
@@ -62,8 +108,9 @@ class UdiscStats:
     def get_best_score_per_hole(self, data: pd.DataFrame = None) -> pd.Series:
         """Get the best (lowest) score for each hole, excluding aces and invalid scores."""
         df_to_use = data if data is not None else self.df
-        holes = self.get_holes_from_round(df_to_use)
-        return df_to_use[holes].replace(0, np.nan).replace(1, np.nan).min()
+        scores = df_to_use[self.get_holes_from_round(df_to_use)]
+        # Aces and zero (unrecorded) scores are not counted
+        return scores.where(scores > 1).min()
 
     def filter_df_by_player(self, players: Union[str, List[str]]):
         """Filter dataframe by player name(s). Modifies self.df in place."""
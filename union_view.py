@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from db import UploadRecord
+from udisc_stats import ROUND_KEY_COLUMNS
+
+
+def _unified_schema(paths: Sequence[str]) -> pa.Schema:
+    """Merge the schemas of several Parquet files (e.g. 18 and 27 hole exports)."""
+    schemas = [pq.read_schema(path).remove_metadata() for path in paths]
+    unified = pa.unify_schemas(schemas, promote_options="permissive")
+    # Drop pandas index columns written alongside the cleaned frames
+    keep = [name for name in unified.names if not name.startswith("__index_level_")]
+    return pa.schema([unified.field(name) for name in keep])
+
+
+class UploadUnion:
+    """
+    A lazy, deduplicated union of several saved uploads.
+
+    Nothing is read when the view is created; each `scan` streams only the
+    requested columns and rows from the underlying Parquet files. When the same
+    round appears in several uploads, the copy from the most recent one wins.
+    """
+
+    def __init__(self, records: List[UploadRecord]):
+        if not records:
+            raise ValueError("At least one upload is required")
+
+        # Most recent upload first, so its copy of a round is kept
+        self.records = sorted(records, key=lambda record: record.id, reverse=True)
+        missing = [record.id for record in self.records if not record.parquet_path.exists()]
+        if missing:
+            raise FileNotFoundError(f"Stored parquet missing for uploads {missing}")
+
+        self.paths = [str(record.parquet_path) for record in self.records]
+        self.schema = _unified_schema(self.paths)
+        self.dataset = ds.dataset(self.paths, schema=self.schema, format="parquet")
+
+    @property
+    def columns(self) -> List[str]:
+        return self.schema.names
+
+    def scan(
+        self,
+        columns: Optional[List[str]] = None,
+        filter: Optional[ds.Expression] = None,
+    ) -> pd.DataFrame:
+        """Return the deduplicated rows matching `filter`, limited to `columns`.
+
+        Uploads are scanned one at a time, most recent first, with the column
+        projection and filter pushed into the Parquet reader. Only rounds not
+        already returned by a more recent upload are kept, so duplicate rows are
+        dropped as they are read instead of after concatenating every upload.
+        """
+        requested = list(columns) if columns is not None else self.columns
+        projection = requested + [c for c in ROUND_KEY_COLUMNS if c not in requested]
+
+        fragments = {fragment.path: fragment for fragment in self.dataset.get_fragments()}
+        seen = pa.array([], type=pa.string())
+        tables = []
+        for path in self.paths:
+            table = fragments[path].to_table(schema=self.schema, columns=projection, filter=filter)
+            keys = _round_keys(table)
+            # First row of every round in this upload, skipping rounds returned already
+            first_rows = pa.table({'key': keys, 'row': pa.array(range(len(keys)), pa.int64())}).group_by(
+                'key', use_threads=False
+            ).aggregate([('row', 'min')])
+            new = pc.invert(pc.is_in(first_rows['key'], value_set=seen))
+            keep = pc.filter(first_rows['row_min'], new)
+            tables.append(table.take(pc.take(keep, pc.sort_indices(keep))))
+            seen = pa.concat_arrays([seen, pc.filter(first_rows['key'], new).combine_chunks()])
+
+        df = pa.concat_tables(tables).to_pandas()
+        return df[requested]
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Materialize the whole union, dropping columns that are empty everywhere."""
+        return self.scan().dropna(how="all", axis=1)
+
+
+def _round_keys(table: pa.Table) -> pa.ChunkedArray:
+    """One string per row identifying its round (see ROUND_KEY_COLUMNS)."""
+    parts = [pc.fill_null(pc.cast(table[column], pa.string()), "") for column in ROUND_KEY_COLUMNS]
+    return pc.binary_join_element_wise(*parts, "\x1f")
@@ -0,0 +1,262 @@
+"""Single-pass validation of UDisc CSV exports.
+
+The header is checked before any rows are parsed, and the rows are then read in
+chunks: every chunk is checked and summarized as soon as it is parsed, so a bad
+file is rejected at its first bad chunk instead of after a full parse.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = ['PlayerName', 'CourseName', 'LayoutName', 'StartDate', 'EndDate', 'Total', '+/-', 'RoundRating']
+NUMERIC_COLUMNS = ['Total', '+/-', 'RoundRating']
+CHUNK_ROWS = 5000
+# Row-level anomalies kept in the report (all of them are still counted)
+MAX_ANOMALIES = 100
+
+
+class ValidationError(ValueError):
+    """Raised when a file is not a usable UDisc export; carries the partial report."""
+
+    def __init__(self, message: str, report: "ValidationReport"):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass
+class ColumnStats:
+    dtype: str = "empty"
+    values: int = 0
+    nulls: int = 0
+    non_numeric: int = 0
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    def update(self, dtype: str, values: int, nulls: int, non_numeric: int = 0,
+               low: Optional[float] = None, high: Optional[float] = None) -> None:
+        """Fold one chunk's statistics for this column into the totals."""
+        self.values += values
+        self.nulls += nulls
+        self.non_numeric += non_numeric
+        if values:
+            self.dtype = _merge_dtype(self.dtype, dtype)
+        if low is not None and not pd.isna(low):
+            self.min = float(low) if self.min is None else min(self.min, float(low))
+            self.max = float(high) if self.max is None else max(self.max, float(high))
+
+
+@dataclass
+class ValidationReport:
+    rows: int = 0
+    par_rows: int = 0
+    columns: Dict[str, ColumnStats] = field(default_factory=dict)
+    anomaly_counts: Dict[str, int] = field(default_factory=dict)
+    anomalies: List[dict] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def add_anomalies(self, kind: str, row_numbers: pd.Index, message: str) -> None:
+        if len(row_numbers) == 0:
+            return
+        self.anomaly_counts[kind] = self.anomaly_counts.get(kind, 0) + len(row_numbers)
+        room = MAX_ANOMALIES - len(self.anomalies)
+        for row_number in list(row_numbers[:max(room, 0)]):
+            self.anomalies.append({'row': int(row_number), 'kind': kind, 'message': message})
+
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        report['ok'] = self.ok
+        return report
+
+
+def _dtype_name(column: pd.Series) -> str:
+    if pd.api.types.is_integer_dtype(column):
+        return "integer"
+    if pd.api.types.is_float_dtype(column):
+        return "float"
+    return "text"
+
+
+def _merge_dtype(current: str, new: str) -> str:
+    if current in ("empty", new):
+        return new
+    if {current, new} == {"integer", "float"}:
+        return "float"
+    return "text"
+
+
+def _check_header(header: List[str], report: ValidationReport) -> List[str]:
+    """Validate the column names; returns the hole columns."""
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        report.errors.append(f"Missing required columns: {', '.join(missing)}")
+    holes = [column for column in header if column.startswith('Hole') and column[4:].isdigit()]
+    if not holes:
+        report.errors.append("No hole columns (Hole1, Hole2, ...) found")
+    duplicates = sorted({column for column in header if header.count(column) > 1})
+    if duplicates:
+        report.errors.append(f"Duplicate columns: {', '.join(duplicates)}")
+    return holes
+
+
+@dataclass
+class _LayoutPars:
+    """Per (CourseName, LayoutName) state carried across chunks for the Par checks."""
+    # Hole pars of the first Par row of each layout, the one the pages use
+    first: Dict[Tuple[str, str], pd.Series] = field(default_factory=dict)
+    # Line of the first player round on each layout
+    played: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+
+def _check_pars(chunk: pd.DataFrame, scores: pd.DataFrame, is_par: pd.Series, players: pd.Series,
+                row_numbers: pd.Index, layout_pars: _LayoutPars, report: ValidationReport) -> None:
+    """Compare every Par row with the first Par row of its own course layout."""
+    layouts = ['CourseName', 'LayoutName']
+    played = chunk.loc[players, layouts].drop_duplicates()
+    for key, label in zip(played.itertuples(index=False, name=None), played.index):
+        layout_pars.played.setdefault(key, int(label) + 2)
+
+    par_layouts = chunk.loc[is_par, layouts]
+    if par_layouts.empty:
+        return
+    par_scores = scores[is_par.values]
+    first_rows = par_layouts.drop_duplicates()
+    for key, label in zip(first_rows.itertuples(index=False, name=None), first_rows.index):
+        layout_pars.first.setdefault(key, par_scores.loc[label])
+
+    keys = list(par_layouts.itertuples(index=False, name=None))
+    expected = pd.DataFrame(
+        np.vstack([layout_pars.first[key].to_numpy() for key in dict.fromkeys(keys)]),
+        index=pd.MultiIndex.from_tuples(list(dict.fromkeys(keys))), columns=scores.columns,
+    ).reindex(pd.MultiIndex.from_tuples(keys))
+    expected.index = par_scores.index
+    same = (par_scores == expected) | (par_scores.isna() & expected.isna())
+    changed = ~same.all(axis=1)
+    report.add_anomalies(
+        'par_changed', row_numbers[is_par.values][changed.values],
+        "Par differs from the first Par row of this course layout, which the pages use"
+    )
+
+
+def _check_chunk(chunk: pd.DataFrame, holes: List[str], report: ValidationReport,
+                 layout_pars: _LayoutPars) -> None:
+    """Collect column statistics and row anomalies of one chunk; structural problems become errors."""
+    # Line numbers as shown in a text editor (header is line 1)
+    row_numbers = chunk.index + 2
+
+    # Column statistics with one frame-wide operation each
+    numeric_columns = [column for column in chunk.columns if column in NUMERIC_COLUMNS or column in holes]
+    numeric = chunk[numeric_columns].copy()
+    text_columns = [column for column in numeric_columns if _dtype_name(chunk[column]) == "text"]
+    if text_columns:
+        numeric[text_columns] = numeric[text_columns].apply(pd.to_numeric, errors='coerce')
+    values = chunk.notna().sum()
+    non_numeric = (chunk[numeric_columns].notna() & numeric.isna()).sum()
+    lows, highs = numeric.min(), numeric.max()
+    for column in chunk.columns:
+        stats = report.columns.setdefault(column, ColumnStats())
+        if column in numeric.columns:
+            stats.update(_dtype_name(chunk[column]), int(values[column]), len(chunk) - int(values[column]),
+                         int(non_numeric[column]), lows[column], highs[column])
+        else:
+            stats.update(_dtype_name(chunk[column]), int(values[column]), len(chunk) - int(values[column]))
+
+    scores = numeric[holes]
+    bad_scores = (chunk[holes].notna() & scores.isna()).any(axis=1)
+    report.add_anomalies('non_numeric_score', row_numbers[bad_scores.values], "Hole score is not a number")
+    bad_totals = chunk['Total'].notna() & numeric['Total'].isna()
+    report.add_anomalies('non_numeric_total', row_numbers[bad_totals.values], "Total is not a number")
+    if bad_scores.any() or bad_totals.any():
+        report.errors.append("Non-numeric hole scores or totals found")
+
+    missing_names = chunk[['PlayerName', 'CourseName', 'LayoutName']].isna().any(axis=1)
+    report.add_anomalies('missing_name', row_numbers[missing_names.values], "Player, course or layout name is empty")
+    if missing_names.any():
+        report.errors.append("Rows without a player, course or layout name found")
+
+    is_par = chunk['PlayerName'] == 'Par'
+    report.par_rows += int(is_par.sum())
+    players = ~is_par & ~missing_names
+    _check_pars(chunk, scores, is_par & ~missing_names, players, row_numbers, layout_pars, report)
+
+    # Not fatal: these rounds are dropped or shown as-is by the app
+    incomplete = players & (scores == 0).any(axis=1)
+    report.add_anomalies('incomplete_round', row_numbers[incomplete.values], "Round has a zero hole score and will be skipped")
+    negative = (scores < 0).any(axis=1)
+    report.add_anomalies('negative_score', row_numbers[negative.values], "Negative hole score")
+    hole_sum = scores.sum(axis=1, min_count=1)
+    mismatch = players & ~incomplete & numeric['Total'].notna() & hole_sum.notna() & (hole_sum != numeric['Total'])
+    report.add_anomalies('total_mismatch', row_numbers[mismatch.values], "Total does not equal the sum of the hole scores")
+    missing_relative = players & chunk['+/-'].isna()
+    report.add_anomalies('missing_plus_minus', row_numbers[missing_relative.values], "Player round without a +/- score")
+    bad_dates = chunk['StartDate'].notna() & pd.to_datetime(chunk['StartDate'], errors='coerce').isna()
+    report.add_anomalies('bad_start_date', row_numbers[bad_dates.values], "StartDate is not a date")
+
+
+def read_validated_csv(data: bytes, chunk_rows: int = CHUNK_ROWS) -> Tuple[pd.DataFrame, ValidationReport]:
+    """Parse and validate a UDisc CSV export in one pass.
+
+    Returns the parsed frame (as `pd.read_csv` would) and the validation report.
+    Raises ValidationError as soon as the header or a chunk shows the file is unusable.
+    """
+    started = time.perf_counter()
+    report = ValidationReport()
+
+    def fail(message: str):
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+        raise ValidationError(message, report)
+
+    # Header first: a wrong file is rejected without parsing any rows
+    first_line = data[:data.find(b'\n') if b'\n' in data else len(data)]
+    try:
+        header = next(csv.reader([first_line.decode('utf-8-sig')]), [])
+    except UnicodeDecodeError:
+        report.errors.append("File is not UTF-8 encoded text")
+        fail(report.errors[-1])
+    holes = _check_header(header, report)
+    if report.errors:
+        fail("; ".join(report.errors))
+
+    chunks = []
+    layout_pars = _LayoutPars()
+    try:
+        reader = pd.read_csv(io.BytesIO(data), chunksize=chunk_rows, encoding='utf-8-sig')
+        for chunk in reader:
+            _check_chunk(chunk, holes, report, layout_pars)
+            report.rows += len(chunk)
+            if report.errors:
+                fail("; ".join(report.errors))
+            chunks.append(chunk)
+    except (UnicodeDecodeError, pd.errors.ParserError) as error:
+        report.errors.append(f"Could not parse CSV: {error}")
+        fail(report.errors[-1])
+
+    if report.rows == 0:
+        report.errors.append("File has no rows")
+        fail(report.errors[-1])
+    # Pars are needed per course layout, not just somewhere in the file
+    without_par = [key for key in layout_pars.played if key not in layout_pars.first]
+    if without_par:
+        for course, layout in without_par:
+            report.add_anomalies(
+                'missing_par', pd.Index([layout_pars.played[(course, layout)]]),
+                f"No 'Par' row for {course} ({layout})"
+            )
+        names = ", ".join(f"{course} ({layout})" for course, layout in without_par[:5])
+        more = f" and {len(without_par) - 5} more" if len(without_par) > 5 else ""
+        report.errors.append(f"No 'Par' rows found for {names}{more}; pars are needed for every course layout")
+        fail(report.errors[-1])
+
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return pd.concat(chunks, ignore_index=True), report
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from analytics import (
+    course_difficulty_table,
+    course_layouts,
+    course_performance_table,
+    head_to_head,
+    head_to_head_holes,
+    hole_histograms,
+    hole_statistics,
+    player_overall_summary,
+)
+from result_cache import dataset_fingerprint, has_result, put_result
+
+# Cache keys for the results each page reads
+PLAYER_SUMMARY_KEY = "player_overall_summary"
+COURSE_PERFORMANCE_KEY = "course_performance_table"
+COURSE_DIFFICULTY_KEY = "course_difficulty_table"
+HEAD_TO_HEAD_KEY = "head_to_head"
+HEAD_TO_HEAD_HOLES_KEY = "head_to_head_holes"
+
+
+def hole_statistics_key(course: str, layout: str) -> str:
+    return f"hole_statistics\x1f{course}\x1f{layout}"
+
+
+def hole_histograms_key(course: str, layout: str) -> str:
+    return f"hole_histograms\x1f{course}\x1f{layout}"
+
+
+def layout_pars_key(course: str, layout: str) -> str:
+    return f"layout_pars\x1f{course}\x1f{layout}"
+
+
+def comparison_vectors_key(players: List[str], course: str, layout: str) -> str:
+    # The vectors are sorted by player, so the selection order does not matter
+    return "comparison_vectors\x1f" + "\x1e".join(sorted(players)) + f"\x1f{course}\x1f{layout}"
+
+
+Task = Tuple[str, Callable[..., Any], tuple]
+
+# Worker processes shared by every warmup in this process (set UDISC_WARMUP_WORKERS to change)
+WARMUP_WORKERS = int(os.environ.get("UDISC_WARMUP_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Datasets warmed, or being warmed, by this process
+_started: Set[str] = set()
+_started_lock = threading.Lock()
+
+# Dataset of the most recent task in a worker process, reused by the tasks that follow
+_worker_frame: Optional[Tuple[str, pd.DataFrame]] = None
+
+
+def _load_frame(dataset_hash: str, frame_path: str) -> pd.DataFrame:
+    global _worker_frame
+    if _worker_frame is None or _worker_frame[0] != dataset_hash:
+        _worker_frame = (dataset_hash, pd.read_pickle(frame_path))
+    return _worker_frame[1]
+
+
+def _run_task(dataset_hash: str, frame_path: str, task: Task) -> str:
+    key, compute, args = task
+    put_result(dataset_hash, key, compute(_load_frame(dataset_hash, frame_path), *args))
+    return key
+
+
+def _get_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """The shared worker pool, created on first use with `max_workers` (default WARMUP_WORKERS)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers avoid forking the (multi-threaded) Streamlit server process
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers or WARMUP_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the shared worker pool and wait for its workers to exit; the next warmup starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def warmup_tasks(df: pd.DataFrame) -> List[Task]:
+    """Every result the pages need: dataset-wide player tables plus one task per layout."""
+    tasks: List[Task] = [
+        (PLAYER_SUMMARY_KEY, player_overall_summary, ()),
+        (COURSE_PERFORMANCE_KEY, course_performance_table, ()),
+        (COURSE_DIFFICULTY_KEY, course_difficulty_table, ()),
+        (HEAD_TO_HEAD_KEY, head_to_head, ()),
+        (HEAD_TO_HEAD_HOLES_KEY, head_to_head_holes, ()),
+    ]
+    for course, layout in course_layouts(df):
+        tasks.append((hole_statistics_key(course, layout), hole_statistics, (course, layout)))
+        tasks.append((hole_histograms_key(course, layout), hole_histograms, (course, layout)))
+    return tasks
+
+
+def warm_dataset(
+    df: pd.DataFrame,
+    dataset_hash: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> int:
+    """Precompute all page results for a dataset in the shared process pool.
+
+    Results already in the cache are skipped. The frame is handed to the workers
+    through one temporary file rather than with every task. Returns the number
+    of results computed.
+    """
+    dataset_hash = dataset_hash or dataset_fingerprint(df)
+    pending = [task for task in warmup_tasks(df) if not has_result(dataset_hash, task[0])]
+    if not pending:
+        return 0
+
+    global _pool
+    pool = _get_pool(max_workers)
+    with tempfile.TemporaryDirectory(prefix="udisc-warmup-") as tmp_dir:
+        frame_path = os.path.join(tmp_dir, "frame.pkl")
+        df.to_pickle(frame_path)
+        try:
+            for future in [pool.submit(_run_task, dataset_hash, frame_path, task) for task in pending]:
+                future.result()
+        except BrokenProcessPool:
+            # A worker died; the next warmup starts a new pool
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+            raise
+    return len(pending)
+
+
+def _warm_once(df: pd.DataFrame, dataset_hash: str) -> None:
+    try:
+        warm_dataset(df, dataset_hash)
+    except BaseException:
+        # Allow a later load of the same dataset to try again
+        with _started_lock:
+            _started.discard(dataset_hash)
+        raise
+
+
+def start_warmup(df: pd.DataFrame, dataset_hash: str) -> Optional[threading.Thread]:
+    """Run `warm_dataset` in a background thread so the upload returns immediately.
+
+    A dataset is warmed once per process: loading it again, or from several
+    sessions at once, starts nothing and returns None.
+    """
+    with _started_lock:
+        if dataset_hash in _started:
+            return None
+        _started.add(dataset_hash)
+    thread = threading.Thread(
+        target=_warm_once, args=(df, dataset_hash), name=f"warmup-{dataset_hash[:8]}", daemon=True
+    )
+    thread.start()
+    return thread